@@ -0,0 +1,161 @@
+import threading
+from collections import OrderedDict
+
+
+class Frame:
+    # Μία σελίδα στη μνήμη: τα δεδομένα της, πόσοι τη χρησιμοποιούν και αν έχει αλλάξει
+    __slots__ = ('data', 'pin_count', 'dirty')
+
+    def __init__(self, data):
+        self.data = data
+        self.pin_count = 0
+        self.dirty = False
+
+
+class BufferPool:
+    def __init__(self, capacity_bytes=64 * 1024 * 1024):
+        """
+        Κοινή προσωρινή μνήμη (buffer pool) για τις σελίδες του index file και τα blocks του datafile.
+        Οι σελίδες αντικαθίστανται με πολιτική LRU, όσες χρησιμοποιούνται (pinned) δεν αφαιρούνται ποτέ
+        και όσες έχουν αλλάξει (dirty) γράφονται στο αρχείο τους μόνο όταν αφαιρεθούν ή στο flush.
+
+        Κάθε αρχείο που χρησιμοποιεί το buffer pool πρέπει να έχει page_size, read_page(page_id)
+        και write_page(page_id, data). Οι μέθοδοι μπορούν να καλούνται από πολλά νήματα, αφού
+        κάθε πρόσβαση στις σελίδες (και στα αρχεία τους) γίνεται υπό ένα κοινό lock.
+
+        :param capacity_bytes: Το μέγιστο μέγεθος μνήμης για σελίδες (σε bytes).
+        """
+        self.capacity_bytes = capacity_bytes
+        self.used_bytes = 0
+        self.frames = OrderedDict()  # (αρχείο, σελίδα) -> Frame, από τη λιγότερο στην πιο πρόσφατα χρησιμοποιημένη
+        self.lock = threading.RLock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Μηδενισμός των μετρητών.
+        """
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.writes = 0
+
+    def stats(self):
+        """
+        Οι μετρητές του buffer pool, για τη ρύθμιση του μεγέθους του σε σχέση με το φορτίο ερωτημάτων.
+
+        :return: Λεξικό με hits, misses, evictions, writes, hit_rate, pages και used_bytes.
+        """
+        requests = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'writes': self.writes,
+            'hit_rate': self.hits / requests if requests else 0.0,
+            'pages': len(self.frames),
+            'used_bytes': self.used_bytes,
+        }
+
+    def pin(self, paged_file, page_id, load=True):
+        """
+        Δέσμευση μιας σελίδας στη μνήμη. Η σελίδα δεν αφαιρείται μέχρι την αντίστοιχη unpin.
+
+        :param paged_file: Το αρχείο της σελίδας.
+        :param page_id: Ο αριθμός της σελίδας.
+        :param load: False όταν η σελίδα θα γραφτεί ολόκληρη, ώστε να μη διαβαστεί άσκοπα από τον δίσκο.
+        :return: Τα δεδομένα της σελίδας (bytearray που μπορεί να τροποποιηθεί).
+        """
+        with self.lock:
+            key = (paged_file, page_id)
+            frame = self.frames.get(key)
+            if frame is not None:
+                self.hits += 1
+                self.frames.move_to_end(key)
+            else:
+                self.misses += 1
+                self._make_room(paged_file.page_size)
+                if load:
+                    data = bytearray(paged_file.read_page(page_id))
+                else:
+                    data = bytearray(paged_file.page_size)
+                frame = Frame(data)
+                self.frames[key] = frame
+                self.used_bytes += len(data)
+
+            frame.pin_count += 1
+            return frame.data
+
+    def unpin(self, paged_file, page_id, dirty=False):
+        """
+        Αποδέσμευση μιας σελίδας που είχε δεσμευτεί με την pin.
+
+        :param paged_file: Το αρχείο της σελίδας.
+        :param page_id: Ο αριθμός της σελίδας.
+        :param dirty: True αν τα δεδομένα της σελίδας άλλαξαν.
+        """
+        with self.lock:
+            frame = self.frames[(paged_file, page_id)]
+            if frame.pin_count <= 0:
+                raise ValueError(f"Page {page_id} is not pinned")
+            frame.pin_count -= 1
+            if dirty:
+                frame.dirty = True
+
+    def flush(self, paged_file=None):
+        """
+        Εγγραφή όλων των σελίδων που έχουν αλλάξει (μόνο ενός αρχείου, αν δοθεί).
+
+        :param paged_file: Το αρχείο (None για όλα τα αρχεία).
+        """
+        with self.lock:
+            dirty = [
+                (key, frame) for key, frame in self.frames.items()
+                if frame.dirty and (paged_file is None or key[0] is paged_file)
+            ]
+            # Εγγραφή με τη σειρά των σελίδων ώστε η πρόσβαση στον δίσκο να είναι σειριακή
+            dirty.sort(key=lambda item: item[0][1])
+            for (owner, page_id), frame in dirty:
+                self._write_back(owner, page_id, frame)
+
+    def discard(self, paged_file):
+        """
+        Αφαίρεση όλων των σελίδων ενός αρχείου (π.χ. όταν κλείνει), αφού πρώτα γραφτούν όσες άλλαξαν.
+
+        :param paged_file: Το αρχείο.
+        """
+        with self.lock:
+            self.flush(paged_file)
+            for key in [key for key in self.frames if key[0] is paged_file]:
+                frame = self.frames.pop(key)
+                self.used_bytes -= len(frame.data)
+
+    def _make_room(self, size):
+        """
+        Αφαίρεση των λιγότερο πρόσφατα χρησιμοποιημένων σελίδων μέχρι να χωρέσει μια νέα σελίδα.
+        Μια σελίδα που άλλαξε γράφεται εδώ και πριν από το checkpoint του αρχείου της, οπότε τα αρχεία
+        αλλάζουν μόνο σελίδες που δεν βλέπει η μόνιμη σελίδα 0 τους (βλ. IndexFile.checkpoint).
+
+        :param size: Το μέγεθος της νέας σελίδας.
+        """
+        while self.frames and self.used_bytes + size > self.capacity_bytes:
+            victim = next((key for key, frame in self.frames.items() if frame.pin_count == 0), None)
+            if victim is None:
+                raise BufferError("All pages in the buffer pool are pinned")
+            frame = self.frames.pop(victim)
+            if frame.dirty:
+                self._write_back(victim[0], victim[1], frame)
+            self.used_bytes -= len(frame.data)
+            self.evictions += 1
+
+    def _write_back(self, paged_file, page_id, frame):
+        """
+        Εγγραφή μιας σελίδας που άλλαξε στο αρχείο της.
+        """
+        paged_file.write_page(page_id, frame.data)
+        frame.dirty = False
+        self.writes += 1
+
+
+# Το κοινό buffer pool που χρησιμοποιούν το IndexFile και το DataFile όταν δεν δίνεται άλλο
+default_pool = BufferPool()
@@ -0,0 +1,191 @@
+import asyncio
+import itertools
+import json
+import random
+import time
+
+from Server import MAX_LINE
+
+
+class RStarTreeClient:
+    def __init__(self, reader, writer):
+        """
+        Πελάτης του RStarTreeServer. Τα αιτήματα στέλνονται χωρίς αναμονή των προηγούμενων (pipelining)
+        και κάθε απάντηση αντιστοιχίζεται στο αίτημά της από το id. Δημιουργείται με την connect.
+        """
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count(1)
+        self.pending = {}  # id -> future της απάντησης
+        self.receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=8765, path=None):
+        """
+        Σύνδεση σε εξυπηρετητή μέσω TCP (host, port) ή Unix socket (path).
+
+        :return: Ο πελάτης.
+        """
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path, limit=MAX_LINE)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE)
+        return cls(reader, writer)
+
+    async def _receive(self):
+        """
+        Ανάγνωση των απαντήσεων και ολοκλήρωση των αντίστοιχων αιτημάτων.
+        """
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self.pending.pop(response.get('id'), None)
+                if future is None or future.done():
+                    continue
+                if 'error' in response:
+                    future.set_exception(RuntimeError(response['error']))
+                else:
+                    future.set_result(response['result'])
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Connection closed"))
+            self.pending.clear()
+
+    async def request(self, op, **args):
+        """
+        Αποστολή ενός αιτήματος και αναμονή της απάντησης.
+
+        :param op: Η λειτουργία (range, knn, count, insert, delete).
+        :param args: Τα ορίσματα της λειτουργίας.
+        :return: Το αποτέλεσμα.
+        """
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.writer.write(json.dumps({'id': request_id, 'op': op, **args}, separators=(',', ':')).encode() + b'\n')
+        await self.writer.drain()
+        return await future
+
+    async def range_query(self, mbr, limit=None):
+        return await self.request('range', mbr=list(mbr), limit=limit)
+
+    async def k_nearest_neighbors(self, point, k=1):
+        return await self.request('knn', point=list(point), k=k)
+
+    async def range_count(self, mbr):
+        return await self.request('count', mbr=list(mbr))
+
+    async def insert(self, record):
+        return await self.request('insert', mbr=list(record['mbr']), block_id=record['block_id'], slot=record['slot'])
+
+    async def delete(self, mbr, block_id=None, slot=None):
+        return await self.request('delete', mbr=list(mbr), block_id=block_id, slot=slot)
+
+    async def close(self):
+        """
+        Κλείσιμο της σύνδεσης.
+        """
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.receiver.cancel()
+
+
+async def load_test(host='127.0.0.1', port=8765, path=None, connections=4, pipeline=16, requests=10000,
+                    mix=(('range', 0.6), ('knn', 0.3), ('count', 0.1)), bounds=(0.0, 0.0, 1.0, 1.0),
+                    window=0.01, k=10, seed=0):
+    """
+    Γεννήτρια φορτίου: στέλνει τυχαία ερωτήματα από πολλές συνδέσεις, με το πολύ pipeline αιτήματα σε
+    εξέλιξη ανά σύνδεση, και μετρά τη ρυθμαπόδοση (QPS) και τις καθυστερήσεις.
+
+    :param connections: Αριθμός συνδέσεων.
+    :param pipeline: Αιτήματα σε εξέλιξη ανά σύνδεση.
+    :param requests: Συνολικός αριθμός αιτημάτων.
+    :param mix: Ζεύγη (λειτουργία, βάρος) για την επιλογή των ερωτημάτων.
+    :param bounds: Η περιοχή (MBR) από την οποία επιλέγονται τα σημεία των ερωτημάτων.
+    :param window: Πλευρά του παραθύρου των ερωτημάτων περιοχής (ως ποσοστό της περιοχής).
+    :param k: Αριθμός γειτόνων στα ερωτήματα k-NN.
+    :param seed: Σπόρος της γεννήτριας τυχαίων ερωτημάτων.
+    :return: Λεξικό με requests, errors, seconds, qps και καθυστερήσεις p50, p99 και max (σε ms).
+    """
+    rng = random.Random(seed)
+    ops = [op for op, _ in mix]
+    weights = [weight for _, weight in mix]
+    min_x, min_y, max_x, max_y = bounds
+    width = (max_x - min_x) * window
+    height = (max_y - min_y) * window
+
+    def make_request():
+        op = rng.choices(ops, weights)[0]
+        x = min_x + rng.random() * (max_x - min_x - width)
+        y = min_y + rng.random() * (max_y - min_y - height)
+        if op == 'knn':
+            return op, {'point': [x, y], 'k': k}
+        return op, {'mbr': [x, y, x + width, y + height]}
+
+    work = [make_request() for _ in range(requests)]
+    latencies = []
+    errors = 0
+    clients = [await RStarTreeClient.connect(host, port, path) for _ in range(connections)]
+
+    async def worker(client):
+        nonlocal errors
+        while work:
+            op, args = work.pop()
+            start = time.perf_counter()
+            try:
+                await client.request(op, **args)
+            except RuntimeError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(client) for client in clients for _ in range(pipeline)))
+    elapsed = time.perf_counter() - start
+    for client in clients:
+        await client.close()
+
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'seconds': elapsed,
+        'qps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(0.50),
+        'p99_ms': percentile(0.99),
+        'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Γεννήτρια φορτίου για τον εξυπηρετητή του R*-Tree')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--path', default=None, help='Unix socket αντί για TCP')
+    parser.add_argument('--connections', type=int, default=4, help='Αριθμός συνδέσεων')
+    parser.add_argument('--pipeline', type=int, default=16, help='Αιτήματα σε εξέλιξη ανά σύνδεση')
+    parser.add_argument('--requests', type=int, default=10000, help='Συνολικός αριθμός αιτημάτων')
+    parser.add_argument('--bounds', type=float, nargs=4, default=[0.0, 0.0, 1.0, 1.0],
+                        help='Η περιοχή των ερωτημάτων (min_x min_y max_x max_y)')
+    parser.add_argument('--window', type=float, default=0.01, help='Πλευρά του παραθύρου ως ποσοστό της περιοχής')
+    parser.add_argument('--k', type=int, default=10, help='Αριθμός γειτόνων')
+    args = parser.parse_args()
+
+    stats = asyncio.run(load_test(args.host, args.port, args.path, args.connections, args.pipeline, args.requests,
+                                  bounds=tuple(args.bounds), window=args.window, k=args.k))
+    print(f"{stats['requests']} requests ({stats['errors']} errors) in {stats['seconds']:.2f}s: "
+          f"{stats['qps']:.0f} QPS, p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms, "
+          f"max {stats['max_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,185 @@
-import osmread
+import logging
+import mmap
 import struct
 import os
 
+from BufferPool import default_pool
+from WriteAheadLog import WriteAheadLog
+
 # Σταθερό μέγεθος block
 BLOCK_SIZE = 32 * 1024  # 32KB
 
+# Block0: πλήθος εγγραφών, πλήθος blocks, magic, έκδοση, κωδικοποίηση εγγραφών, κλίμακα σταθερής υποδιαστολής.
+# Τα δύο πλήθη μένουν στην αρχή του block, όπως στην πρώτη έκδοση του αρχείου, που δεν είχε magic
+# και αποθήκευε τις συντεταγμένες ως float32.
+BLOCK0_STRUCT = struct.Struct('<II4sH16sI')
+MAGIC = b'RSTD'
+VERSION = 2
+
+# Μορφές εγγραφής (ID, LAT, LON) ανά κωδικοποίηση:
+# float32: 16 bytes, ακρίβεια περίπου ενός μέτρου (η μορφή της πρώτης έκδοσης)
+# float64: 24 bytes, ακριβείς συντεταγμένες
+# fixed: 16 bytes, συντεταγμένες ως int32 σε μονάδες 1/scale μοίρας (με την προεπιλεγμένη κλίμακα 10^7, όπως
+#        στο OpenStreetMap, ακριβείς για τα δεδομένα OSM και με ακρίβεια εκατοστού για οποιοδήποτε σημείο)
+RECORD_LAYOUTS = {'float32': '<Qff', 'float64': '<Qdd', 'fixed': '<Qii'}
+FIXED_SCALE = 10 ** 7
+
+logger = logging.getLogger(__name__)
+
+
+class RecordFormat:
+    def __init__(self, encoding='fixed', scale=FIXED_SCALE):
+        """
+        Η δυαδική μορφή των εγγραφών (id, lat, lon) ενός datafile. Όλες οι εγγραφές έχουν το ίδιο μέγεθος,
+        ώστε κάθε εγγραφή να βρίσκεται απευθείας από τον δείκτη (block_id, slot).
+
+        :param encoding: Η κωδικοποίηση των συντεταγμένων: 'float32', 'float64' ή 'fixed'.
+        :param scale: Οι μονάδες ανά μοίρα της κωδικοποίησης 'fixed'.
+        """
+        if encoding not in RECORD_LAYOUTS:
+            raise ValueError(f"Unknown record encoding: {encoding}")
+        self.encoding = encoding
+        self.scale = scale
+        self.struct = struct.Struct(RECORD_LAYOUTS[encoding])
+        self.size = self.struct.size
+        self.records_per_block = BLOCK_SIZE // self.size
+        self.fixed = encoding == 'fixed'
+
+    def pack_into(self, buffer, offset, record_id, lat, lon):
+        """
+        Εγγραφή μιας εγγραφής σε ένα buffer.
+        """
+        if self.fixed:
+            lat = round(lat * self.scale)
+            lon = round(lon * self.scale)
+        try:
+            self.struct.pack_into(buffer, offset, record_id, lat, lon)
+        except struct.error:
+            raise ValueError(f"Record {record_id} cannot be stored with the '{self.encoding}' encoding") from None
+
+    def pack(self, record_id, lat, lon):
+        buffer = bytearray(self.size)
+        self.pack_into(buffer, 0, record_id, lat, lon)
+        return bytes(buffer)
+
+    def unpack_from(self, buffer, offset=0):
+        """
+        Ανάγνωση μιας εγγραφής από ένα buffer.
+
+        :return: Τριάδα (id, lat, lon).
+        """
+        record_id, lat, lon = self.struct.unpack_from(buffer, offset)
+        if self.fixed:
+            return record_id, lat / self.scale, lon / self.scale
+        return record_id, lat, lon
+
+    def iter_unpack(self, data):
+        """
+        Οι εγγραφές ενός συνεχόμενου τμήματος δεδομένων (π.χ. ενός block), ως τριάδες (id, lat, lon).
+        """
+        if not self.fixed:
+            return self.struct.iter_unpack(data)
+        scale = self.scale
+        return ((record_id, lat / scale, lon / scale) for record_id, lat, lon in self.struct.iter_unpack(data))
+
+
+def pack_block0(record_count, block_count, record_format):
+    """
+    Τα δεδομένα του block0 (χωρίς τη συμπλήρωση μέχρι το BLOCK_SIZE).
+    """
+    return BLOCK0_STRUCT.pack(record_count, block_count, MAGIC, VERSION, record_format.encoding.encode('ascii'),
+                              record_format.scale)
+
+
+def unpack_block0(data):
+    """
+    Ανάγνωση του block0 ενός datafile. Αρχεία της πρώτης έκδοσης (χωρίς magic) διαβάζονται ως float32.
+
+    :param data: Τα δεδομένα του block0 (τουλάχιστον BLOCK0_STRUCT.size bytes).
+    :return: Τριάδα (πλήθος εγγραφών, πλήθος blocks, RecordFormat).
+    """
+    record_count, block_count, magic, version, encoding, scale = BLOCK0_STRUCT.unpack_from(data)
+    if magic != MAGIC:
+        return record_count, block_count, RecordFormat('float32')
+    if version != VERSION:
+        raise ValueError(f"Unsupported datafile format version {version}, expected {VERSION}")
+    return record_count, block_count, RecordFormat(encoding.rstrip(b'\x00').decode('ascii'), scale)
+
+
 class DataFile:
-    def __init__(self, filename):
+    def __init__(self, filename, buffer_pool=None, create=True, wal_filename=None, encoding='fixed',
+                 scale=FIXED_SCALE):
+        """
+        Δημιουργία του datafile. Τα blocks γράφονται μέσω του buffer pool.
+
+        :param filename: Το όνομα του datafile.
+        :param buffer_pool: Το buffer pool για τα blocks (προεπιλογή το κοινό buffer pool).
+        :param create: True για δημιουργία νέου αρχείου, False για άνοιγμα υπάρχοντος ώστε να προστεθούν εγγραφές.
+        :param wal_filename: Το όνομα του write-ahead log (None για λειτουργία χωρίς log). Κάθε εγγραφή
+                             καταγράφεται πριν προστεθεί και η checkpoint ενημερώνει το block0, οπότε μετά από
+                             διακοπή το άνοιγμα με create=False επαναφέρει όσες εγγραφές δεν είχαν αποθηκευτεί.
+        :param encoding: Η κωδικοποίηση των συντεταγμένων (βλ. RECORD_LAYOUTS), μόνο για νέο αρχείο.
+                         Ένα υπάρχον αρχείο διαβάζεται με την κωδικοποίηση του block0 του.
+        :param scale: Οι μονάδες ανά μοίρα της κωδικοποίησης 'fixed' (μόνο για νέο αρχείο).
+        """
         self.filename = filename
-        self.blocks = []
+        self.buffer_pool = buffer_pool if buffer_pool is not None else default_pool
+        self.page_size = BLOCK_SIZE
         self.current_block = bytearray()
         self.block_id = 0
         self.record_count = 0
+        self.format = RecordFormat(encoding, scale)
+        self.wal = WriteAheadLog(wal_filename) if wal_filename is not None else None
 
-        # Δημιουργία του αρχείου και του block0
-        self.create_file()
+        if create:
+            # Δημιουργία του αρχείου και του block0
+            self.create_file()
+            if self.wal is not None:
+                self.wal.checkpoint()
+        else:
+            self.open_file()
+            if self.wal is not None:
+                self.recover()
 
     def create_file(self):
-        with open(self.filename, 'wb') as f:
-            # Δημιουργία block0 για μετα-πληροφορίες
-            block0 = bytearray(BLOCK_SIZE)
-            self.blocks.append(block0)
-            f.write(block0)
-            print(f'Block0 created with size {BLOCK_SIZE} bytes.')
+        self.file = open(self.filename, 'w+b')
+        # Δημιουργία block0 για μετα-πληροφορίες
+        self.file.write(pack_block0(0, 0, self.format).ljust(BLOCK_SIZE, b'\x00'))
+        logger.debug('Block0 created with size %d bytes.', BLOCK_SIZE)
+
+    def open_file(self):
+        """
+        Άνοιγμα ενός υπάρχοντος datafile. Ισχύουν οι εγγραφές που μετράει το block0 (μέχρι το τελευταίο
+        checkpoint ή finalize) και οι επόμενες εγγραφές προστίθενται μετά από αυτές.
+        """
+        self.file = open(self.filename, 'r+b')
+        self.record_count, _, self.format = unpack_block0(self.file.read(BLOCK0_STRUCT.size))
+        self.block_id, partial = divmod(self.record_count, self.format.records_per_block)
+        if partial:
+            # Το τελευταίο block είναι μισογεμάτο και συνεχίζει να γεμίζει
+            page = self.buffer_pool.pin(self, self.block_id + 1)
+            self.current_block = bytearray(page[:partial * self.format.size])
+            self.buffer_pool.unpin(self, self.block_id + 1)
+
+    def recover(self):
+        """
+        Επαναφορά των εγγραφών του write-ahead log που δεν περιέχονται στο block0.
+        Κάθε εγγραφή του log έχει τον αύξοντα αριθμό της, οπότε όσες έχουν ήδη αποθηκευτεί παραλείπονται.
+        """
+        recovered = 0
+        for _, record in self.wal.records():
+            if record['op'] == 'record' and record['index'] == self.record_count:
+                self._append_record(record)
+                recovered += 1
+        if recovered:
+            logger.info('Recovered %d records from %s.', recovered, self.wal.filename)
 
     def add_record(self, record):
+        if self.wal is not None:
+            self.wal.log_record(self.record_count, record)
+        self._append_record(record)
+
+    def _append_record(self, record):
         # Μετατροπή της εγγραφής σε δυαδική μορφή
         record_data = self.serialize_record(record)
         
@@ -38,54 +193,434 @@ class DataFile:
         self.record_count += 1
 
     def serialize_record(self, record):
-        # Παράδειγμα: Απλή αποθήκευση του ID και των συντεταγμένων ως δυαδικά δεδομένα
-        # ID ως string, LAT και LON ως float
-        record_id = record['id']
-        lat = record['lat']
-        lon = record['lon']
-        return struct.pack('Qff', record_id, lat, lon)  # Q = unsigned long long, f = float
+        # Αποθήκευση του ID και των συντεταγμένων με την κωδικοποίηση του αρχείου (βλ. RecordFormat)
+        return self.format.pack(record['id'], record['lat'], record['lon'])
 
     def save_current_block(self):
-        # Αποθήκευση του τρέχοντος block και εκκαθάριση του buffer
-        with open(self.filename, 'ab') as f:
-            padded_block = self.current_block.ljust(BLOCK_SIZE, b'\x00')  # Συμπλήρωση με μηδενικά
-            f.write(padded_block)
-            print(f'Block{self.block_id + 1} saved with size {len(padded_block)} bytes.')
-            self.block_id += 1
+        # Αποθήκευση του τρέχοντος block στο buffer pool και εκκαθάριση του buffer
+        block_id = self.block_id + 1
+        self._write_current_block()
+        logger.debug('Block%d saved with size %d bytes.', block_id, BLOCK_SIZE)
+        self.block_id = block_id
         self.current_block = bytearray()  # Εκκαθάριση για νέο block
 
+    def _write_current_block(self):
+        """
+        Εγγραφή του τρέχοντος (ίσως μισογεμάτου) block στη θέση του μέσω του buffer pool.
+        """
+        block_id = self.block_id + 1
+        page = self.buffer_pool.pin(self, block_id, load=False)
+        page[:len(self.current_block)] = self.current_block
+        page[len(self.current_block):] = bytes(BLOCK_SIZE - len(self.current_block))  # Συμπλήρωση με μηδενικά
+        self.buffer_pool.unpin(self, block_id, dirty=True)
+
     def finalize(self):
         # Αποθήκευση του τελευταίου block
         if self.current_block:
             self.save_current_block()
         # Ενημέρωση του block0 με πληροφορίες
+        self.checkpoint()
+
+    def checkpoint(self):
+        """
+        Μόνιμη αποθήκευση (fsync) όλων των εγγραφών μέχρι τώρα: το μισογεμάτο block γράφεται στη θέση του
+        χωρίς να κλείσει, ενημερώνεται το block0 και, αφού φτάσουν στον δίσκο, αδειάζει το write-ahead log.
+        Τα blocks γίνονται fsync πριν γραφτεί το block0, ώστε μετά από μια διακοπή το block0 στον δίσκο
+        να μη μετράει ποτέ εγγραφές που δεν έφτασαν σε αυτόν (οι υπόλοιπες επανέρχονται από το log).
+        """
+        if self.current_block:
+            self._write_current_block()
+        self.sync()
         self.update_block0()
+        self.sync()
+        if self.wal is not None:
+            self.wal.checkpoint()
 
     def update_block0(self):
-        with open(self.filename, 'r+b') as f:
-            block0_data = struct.pack('II', self.record_count, self.block_id)  # πλήθος εγγραφών, πλήθος blocks
-            f.seek(0)
-            f.write(block0_data)
-            print(f'Block0 updated with {self.record_count} records and {self.block_id} blocks.')
+        block_count = self.block_id + (1 if self.current_block else 0)
+        page = self.buffer_pool.pin(self, 0)
+        page[:BLOCK0_STRUCT.size] = pack_block0(self.record_count, block_count, self.format)
+        self.buffer_pool.unpin(self, 0, dirty=True)
+        logger.debug('Block0 updated with %d records and %d blocks.', self.record_count, block_count)
+
+    def read_record(self, block_id, slot):
+        """
+        Ανάγνωση μιας εγγραφής μέσω του buffer pool.
+
+        :param block_id: Το block της εγγραφής.
+        :param slot: Η θέση της εγγραφής μέσα στο block.
+        :return: Λεξικό με id, lat και lon.
+        """
+        page = self.buffer_pool.pin(self, block_id)
+        try:
+            record_id, lat, lon = self.format.unpack_from(page, slot * self.format.size)
+        finally:
+            self.buffer_pool.unpin(self, block_id)
+        return {'id': record_id, 'lat': lat, 'lon': lon}
+
+    def read_page(self, block_id):
+        """
+        Ανάγνωση ενός block απευθείας από το αρχείο (χρησιμοποιείται από το buffer pool).
+
+        :param block_id: Ο αριθμός του block.
+        """
+        self.file.seek(block_id * BLOCK_SIZE)
+        return self.file.read(BLOCK_SIZE).ljust(BLOCK_SIZE, b'\x00')
+
+    def write_page(self, block_id, data):
+        """
+        Εγγραφή ενός block απευθείας στο αρχείο (χρησιμοποιείται από το buffer pool).
+
+        :param block_id: Ο αριθμός του block.
+        :param data: Τα δεδομένα του block.
+        """
+        self.file.seek(block_id * BLOCK_SIZE)
+        self.file.write(data)
+
+    def flush(self):
+        """
+        Εγγραφή στον δίσκο των blocks που έχουν αλλάξει στο buffer pool.
+        """
+        self.buffer_pool.flush(self)
+        self.file.flush()
+
+    def sync(self):
+        """
+        Εγγραφή των blocks που έχουν αλλάξει και μόνιμη αποθήκευσή τους (fsync).
+        """
+        self.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        """
+        Κλείσιμο του datafile, αφού γραφτούν τα blocks που έχουν αλλάξει.
+        """
+        self.buffer_pool.discard(self)
+        self.file.close()
+        if self.wal is not None:
+            self.wal.close()
+
+class DataFileReader:
+    def __init__(self, filename):
+        """
+        Ανάγνωση εγγραφών από ένα datafile μέσω mmap. Κάθε εγγραφή βρίσκεται σε σταθερή θέση
+        (block_id * BLOCK_SIZE + slot * μέγεθος εγγραφής), οπότε διαβάζεται απευθείας από
+        την απεικόνιση του αρχείου χωρίς αντιγραφή του block.
+
+        :param filename: Το όνομα του datafile.
+        """
+        self.filename = filename
+        self.file = open(filename, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        self.record_count, self.block_count, self.format = unpack_block0(self.view)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.record_count
+
+    def offset(self, block_id, slot):
+        """
+        Η θέση μιας εγγραφής στο αρχείο.
+
+        :param block_id: Το block της εγγραφής (από το 1).
+        :param slot: Η θέση της εγγραφής μέσα στο block.
+        :return: Η θέση σε bytes.
+        """
+        records_per_block = self.format.records_per_block
+        if not 1 <= block_id <= self.block_count or not 0 <= slot < records_per_block:
+            raise IndexError(f"No record at block {block_id}, slot {slot}")
+        if (block_id - 1) * records_per_block + slot >= self.record_count:
+            raise IndexError(f"No record at block {block_id}, slot {slot}")
+        return block_id * BLOCK_SIZE + slot * self.format.size
+
+    def read_record(self, block_id, slot):
+        """
+        Ανάγνωση μιας εγγραφής από τον δείκτη (block_id, slot) ενός φύλλου.
+
+        :param block_id: Το block της εγγραφής.
+        :param slot: Η θέση της εγγραφής μέσα στο block.
+        :return: Λεξικό με id, lat και lon.
+        """
+        record_id, lat, lon = self.format.unpack_from(self.view, self.offset(block_id, slot))
+        return {'id': record_id, 'lat': lat, 'lon': lon}
+
+    def fetch_many(self, pointers):
+        """
+        Ανάγνωση πολλών εγγραφών (π.χ. του αποτελέσματος ενός ερωτήματος περιοχής).
+        Οι δείκτες διαβάζονται ταξινομημένοι κατά block και slot, ώστε η πρόσβαση στο αρχείο
+        να είναι σειριακή, και οι εγγραφές επιστρέφονται με τη σειρά των δεικτών.
+
+        :param pointers: Ζεύγη (block_id, slot) ή εγγραφές φύλλων με κλειδιά 'block_id' και 'slot'.
+        :return: Λίστα με τις εγγραφές.
+        """
+        pointers = [
+            (pointer['block_id'], pointer['slot']) if isinstance(pointer, dict) else tuple(pointer)
+            for pointer in pointers
+        ]
+        unpack_from = self.format.unpack_from
+        view = self.view
+        records = [None] * len(pointers)
+        for i in sorted(range(len(pointers)), key=pointers.__getitem__):
+            record_id, lat, lon = unpack_from(view, self.offset(*pointers[i]))
+            records[i] = {'id': record_id, 'lat': lat, 'lon': lon}
+        return records
+
+    def block(self, block_id):
+        """
+        Οι εγγραφές ενός block ως memoryview πάνω στο αρχείο (χωρίς αντιγραφή), στη μορφή self.format.
+
+        :param block_id: Ο αριθμός του block (από το 1).
+        """
+        if not 1 <= block_id <= self.block_count:
+            raise IndexError(f"No block {block_id}")
+        records_per_block = self.format.records_per_block
+        count = min(self.record_count - (block_id - 1) * records_per_block, records_per_block)
+        start = block_id * BLOCK_SIZE
+        return self.view[start:start + count * self.format.size]
+
+    def close(self):
+        """
+        Κλείσιμο της απεικόνισης και του αρχείου.
+        """
+        self.view.release()
+        self.map.close()
+        self.file.close()
+
+# Μέγεθος του buffer εγγραφής του αρχείου κατά τη ροή (streaming) των εγγραφών
+WRITE_BUFFER_SIZE = 128 * BLOCK_SIZE  # 4MB
+
+
+def iter_osm_nodes(osm_file):
+    """
+    Διαβάζει ένα αρχείο .osm και επιστρέφει ένα προς ένα τα σημεία (nodes) του
+    ως λεξικά με id, lat και lon, χωρίς να κρατά το αρχείο στη μνήμη.
+
+    :param osm_file: Το αρχείο .osm.
+    """
+    import osmread
 
-# Λειτουργία ανάγνωσης του .osm αρχείου και αποθήκευσης σε blocks
-def read_osm_and_store_blocks(osm_file, datafile):
-    # Δημιουργία instance του DataFile
-    df = DataFile(datafile)
-    
-    # Ανάγνωση του αρχείου .osm
     for entity in osmread.parse_file(osm_file):
         if isinstance(entity, osmread.Node):
-            record = {
-                'id': entity.id,
-                'lat': entity.lat,
-                'lon': entity.lon
-            }
-            df.add_record(record)
+            yield {'id': entity.id, 'lat': entity.lat, 'lon': entity.lon}
+
+
+def stream_records(records, datafile, buffer_size=WRITE_BUFFER_SIZE, encoding='fixed', scale=FIXED_SCALE):
+    """
+    Γράφει τις εγγραφές στο datafile καθώς διαβάζονται και επιστρέφει για καθεμία το MBR
+    και τον δείκτη (block_id, slot), όπως η iter_block_records, ώστε με ένα πέρασμα να
+    δημιουργούνται τόσο το datafile όσο και η είσοδος της bulk_load.
+    Κάθε εγγραφή γράφεται με pack_into σε ένα προκατανεμημένο block, και τα γεμάτα blocks
+    γράφονται σε ένα ανοιχτό αρχείο με μεγάλο buffer. Το block0 ενημερώνεται στο τέλος.
+
+    :param records: Εγγραφές με id, lat και lon (π.χ. από την iter_osm_nodes).
+    :param datafile: Το όνομα του datafile.
+    :param buffer_size: Το μέγεθος του buffer εγγραφής του αρχείου (σε bytes).
+    :param encoding: Η κωδικοποίηση των συντεταγμένων (βλ. RecordFormat).
+    :param scale: Οι μονάδες ανά μοίρα της κωδικοποίησης 'fixed'.
+    """
+    record_format = RecordFormat(encoding, scale)
+    pack_into = record_format.pack_into
+    unpack_from = record_format.unpack_from
+    record_size = record_format.size
+    records_per_block = record_format.records_per_block
+    block = bytearray(BLOCK_SIZE)
+    block_id = 1
+    slot = 0
+    record_count = 0
+
+    with open(datafile, 'wb', buffering=buffer_size) as f:
+        f.write(bytes(BLOCK_SIZE))
+        try:
+            for record in records:
+                if slot == records_per_block:
+                    f.write(block)
+                    block_id += 1
+                    slot = 0
+                offset = slot * record_size
+                pack_into(block, offset, record['id'], record['lat'], record['lon'])
+                # Οι συντεταγμένες διαβάζονται πίσω από το block ώστε το MBR να έχει
+                # ακριβώς τις τιμές που αποθηκεύονται στο αρχείο
+                record_id, lat, lon = unpack_from(block, offset)
+                pointer = {'mbr': (lat, lon, lat, lon), 'block_id': block_id, 'slot': slot, 'id': record_id}
+                slot += 1
+                record_count += 1
+                yield pointer
+        finally:
+            # Αποθήκευση του τελευταίου block (και όταν η ροή διακοπεί) και ενημέρωση του block0
+            block_count = 0
+            if record_count:
+                block[slot * record_size:] = bytes(BLOCK_SIZE - slot * record_size)
+                f.write(block)
+                block_count = block_id
+            f.seek(0)
+            f.write(pack_block0(record_count, block_count, record_format))
+            logger.info('Datafile %s written with %d records in %d blocks.', datafile, record_count, block_count)
+
+
+def ingest_osm(osm_file, datafile, encoding='fixed', **kwargs):
+    """
+    Δημιουργία του datafile και μαζική κατασκευή του R*-Tree από ένα αρχείο .osm με ένα πέρασμα.
+
+    :param osm_file: Το αρχείο .osm.
+    :param datafile: Το όνομα του datafile.
+    :param encoding: Η κωδικοποίηση των εγγραφών του datafile.
+    :param kwargs: Παράμετροι που προωθούνται στη RStarTree.bulk_load.
+    :return: Το νέο R*-Tree.
+    """
+    from RStarTree import RStarTree
+
+    return RStarTree.bulk_load(stream_records(iter_osm_nodes(osm_file), datafile, encoding=encoding), **kwargs)
+
+
+# Λειτουργία ανάγνωσης του .osm αρχείου και αποθήκευσης σε blocks
+def read_osm_and_store_blocks(osm_file, datafile, encoding='fixed'):
+    for _ in stream_records(iter_osm_nodes(osm_file), datafile, encoding=encoding):
+        pass
+
+# Ανάγνωση των εγγραφών ενός datafile block προς block
+def iter_block_records(datafile):
+    """
+    Διαβάζει τις εγγραφές ενός datafile και επιστρέφει για καθεμία το MBR της
+    (σημείο lat/lon) και τον δείκτη (block_id, slot) προς τη θέση της στο αρχείο.
+    Τα blocks δεδομένων αριθμούνται από το 1, αφού το block0 κρατά τις μετα-πληροφορίες.
     
-    # Ολοκλήρωση της διαδικασίας αποθήκευσης
-    df.finalize()
+    :param datafile: Το όνομα του datafile.
+    """
+    with open(datafile, 'rb') as f:
+        record_count, block_count, record_format = unpack_block0(f.read(BLOCK_SIZE))
+        remaining = record_count
+        for block_id in range(1, block_count + 1):
+            block = f.read(BLOCK_SIZE)
+            count = min(remaining, record_format.records_per_block)
+            for slot, (record_id, lat, lon) in enumerate(record_format.iter_unpack(block[:count * record_format.size])):
+                yield {'mbr': (lat, lon, lat, lon), 'block_id': block_id, 'slot': slot, 'id': record_id}
+            remaining -= count
+
+def _ingest_shard(osm_file, shard_file, encoding='fixed'):
+    """
+    Εργασία ενός worker της parallel_ingest_osm: γράφει τα σημεία ενός αρχείου .osm στο δικό του datafile.
+
+    :return: Το πλήθος των εγγραφών του shard.
+    """
+    count = 0
+    for _ in stream_records(iter_osm_nodes(osm_file), shard_file, encoding=encoding):
+        count += 1
+    return count
+
+
+def merge_datafiles(shard_files, datafile, buffer_size=WRITE_BUFFER_SIZE):
+    """
+    Συνένωση πολλών datafiles σε ένα. Οι εγγραφές κάθε shard αντιγράφονται ως bytes
+    συνεχόμενα μετά από αυτές του προηγούμενου, οπότε μόνο το τελευταίο block μένει μισογεμάτο
+    και τα block_id/slot αριθμούνται ξανά με τη σειρά των shards. Το block0 γράφεται στο τέλος
+    με τα συνολικά πλήθη. Όλα τα shards πρέπει να έχουν την ίδια κωδικοποίηση εγγραφών.
+
+    :param shard_files: Τα datafiles προς συνένωση, με τη σειρά τους.
+    :param datafile: Το όνομα του τελικού datafile.
+    :param buffer_size: Το μέγεθος του buffer εγγραφής του αρχείου (σε bytes).
+    :return: Ζεύγος (πλήθος εγγραφών, πλήθος blocks).
+    """
+    record_format = None
+    pending = bytearray()
+    record_count = 0
+    block_count = 0
+
+    with open(datafile, 'wb', buffering=buffer_size) as out:
+        out.write(bytes(BLOCK_SIZE))
+        for shard_file in shard_files:
+            with open(shard_file, 'rb') as f:
+                shard_records, shard_blocks, shard_format = unpack_block0(f.read(BLOCK_SIZE))
+                if record_format is None:
+                    record_format = shard_format
+                    block_bytes = record_format.records_per_block * record_format.size
+                elif (shard_format.encoding, shard_format.scale) != (record_format.encoding, record_format.scale):
+                    raise ValueError(f"{shard_file} uses the '{shard_format.encoding}' record encoding, "
+                                     f"expected '{record_format.encoding}'")
+                remaining = shard_records
+                for _ in range(shard_blocks):
+                    count = min(remaining, record_format.records_per_block)
+                    pending += f.read(BLOCK_SIZE)[:count * record_format.size]
+                    remaining -= count
+                    while len(pending) >= block_bytes:
+                        out.write(pending[:block_bytes].ljust(BLOCK_SIZE, b'\x00'))
+                        del pending[:block_bytes]
+                        block_count += 1
+            record_count += shard_records
+
+        if pending:
+            out.write(pending.ljust(BLOCK_SIZE, b'\x00'))
+            block_count += 1
+        out.seek(0)
+        out.write(pack_block0(record_count, block_count, record_format or RecordFormat()))
+
+    logger.info('Datafile %s merged from %d shards with %d records in %d blocks.', datafile, len(shard_files),
+                record_count, block_count)
+    return record_count, block_count
+
+
+def parallel_ingest_osm(osm_files, datafile, workers=None, build_index=True, encoding='fixed', **kwargs):
+    """
+    Παράλληλη δημιουργία του datafile από πολλά αρχεία .osm (π.χ. περιφερειακά αποσπάσματα).
+    Κάθε αρχείο αναλύεται από μια ξεχωριστή διεργασία, που γράφει το δικό της datafile (shard).
+    Τα shards συνενώνονται στο τέλος σε ένα datafile και οι δείκτες του δίνονται στη bulk_load.
+    Ο διαμοιρασμός γίνεται μόνο ανά αρχείο: ένα μεμονωμένο αρχείο .osm δεν χωρίζεται σε τμήματα bytes,
+    αφού η iter_osm_nodes δίνει ολόκληρο το αρχείο στο osmread, οπότε με ένα αρχείο δουλεύει μία μόνο
+    διεργασία και η ingest_osm είναι προτιμότερη.
+
+    :param osm_files: Τα αρχεία .osm.
+    :param datafile: Το όνομα του τελικού datafile.
+    :param workers: Ο αριθμός των διεργασιών (προεπιλογή ο αριθμός των πυρήνων).
+    :param build_index: False για δημιουργία μόνο του datafile.
+    :param encoding: Η κωδικοποίηση των εγγραφών του datafile.
+    :param kwargs: Παράμετροι που προωθούνται στη RStarTree.bulk_load.
+    :return: Το νέο R*-Tree (ή None αν build_index είναι False).
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    shard_files = [f'{datafile}.shard{i}' for i in range(len(osm_files))]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_ingest_shard, osm_files, shard_files, [encoding] * len(osm_files)))
+        merge_datafiles(shard_files, datafile)
+    finally:
+        for shard_file in shard_files:
+            if os.path.exists(shard_file):
+                os.remove(shard_file)
+
+    if not build_index:
+        return None
+    from RStarTree import RStarTree
+
+    return RStarTree.bulk_load(iter_block_records(datafile), **kwargs)
+
+if __name__ == "__main__":
+    import argparse
+
+    from IndexFile import LEAF_ENCODINGS
 
-# Κλήση της λειτουργίας με το αρχείο .osm που έχεις επισυνάψει
-read_osm_and_store_blocks('/mnt/data/Peramos.osm', 'datafile.dat')
+    parser = argparse.ArgumentParser(description='Δημιουργία του datafile (και του indexfile) από αρχεία .osm')
+    parser.add_argument('osm_files', nargs='+', help='Τα αρχεία .osm')
+    parser.add_argument('--datafile', default='datafile.dat', help='Το όνομα του datafile')
+    parser.add_argument('--index', default=None, help='Το όνομα του indexfile (αν δοθεί, κατασκευάζεται και το δέντρο)')
+    parser.add_argument('--workers', type=int, default=None, help='Αριθμός διεργασιών για πολλά αρχεία .osm (μία διεργασία ανά αρχείο)')
+    parser.add_argument('--encoding', default='fixed', choices=sorted(RECORD_LAYOUTS),
+                        help='Η κωδικοποίηση των συντεταγμένων του datafile')
+    parser.add_argument('--leaf-encoding', default='float64', choices=LEAF_ENCODINGS,
+                        help='Η κωδικοποίηση των φύλλων του indexfile')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
 
+    index_kwargs = {'index_filename': args.index, 'leaf_encoding': args.leaf_encoding} if args.index else {}
+    if len(args.osm_files) > 1:
+        parallel_ingest_osm(args.osm_files, args.datafile, workers=args.workers,
+                            build_index=args.index is not None, encoding=args.encoding, **index_kwargs)
+    elif args.index:
+        ingest_osm(args.osm_files[0], args.datafile, encoding=args.encoding, **index_kwargs)
+    else:
+        read_osm_and_store_blocks(args.osm_files[0], args.datafile, encoding=args.encoding)
@@ -1,49 +1,487 @@
+import logging
+import math
+import os
 import struct
+import sys
+from array import array
+
+from BufferPool import default_pool
+from DataFile import FIXED_SCALE
+from Node import Node
+
+# Σελίδα 0: μετα-πληροφορίες του δέντρου
+# (magic, έκδοση, μέγεθος σελίδας, max_entries, σελίδα ρίζας, ύψος, πλήθος σελίδων, στρατηγική διαχωρισμού,
+# LSN του τελευταίου checkpoint του write-ahead log, αριθμός διαστάσεων, μετρική αποστάσεων,
+# κωδικοποίηση των φύλλων, κλίμακα της κωδικοποίησης 'delta')
+HEADER_STRUCT = struct.Struct('<4sHIIIIQ16sQH16s16sI')
+MAGIC = b'RSTI'
+VERSION = 5
+
+# Κεφαλίδα κάθε σελίδας κόμβου: είναι φύλλο, κωδικοποίηση των MBR (θέση στο LEAF_ENCODINGS), πλήθος εγγραφών
+NODE_HEADER = struct.Struct('<BBH')
+
+# Κωδικοποιήσεις των MBR στις σελίδες των φύλλων (οι εσωτερικοί κόμβοι γράφονται πάντα ως float64):
+# float64: 2d double ανά εγγραφή, για οποιαδήποτε MBR
+# point: d double ανά εγγραφή, για σημεία (κάτω όρια ίσα με τα άνω)
+# delta: d uint32 ανά εγγραφή, οι διαφορές των συντεταγμένων ενός σημείου (σε μονάδες 1/scale) από την κάτω
+#        γωνία του MBR του φύλλου, που γράφεται μία φορά ως d int32. Ακριβής για σημεία πάνω στο πλέγμα 1/scale,
+#        όπως αυτά ενός datafile με κωδικοποίηση 'fixed' της ίδιας κλίμακας.
+LEAF_ENCODINGS = ('float64', 'point', 'delta')
+
+
+def entry_size(dims=2):
+    """
+    Μέγεθος εγγραφής σε σελίδα: 2d double για το MBR και δείκτες (block_id, slot) στα φύλλα,
+    ή σελίδα παιδιού, πλήθος εγγραφών και d αθροίσματα κέντρων του υποδέντρου στους εσωτερικούς κόμβους.
+    Επιστρέφεται το μεγαλύτερο από τα δύο.
+
+    :param dims: Ο αριθμός των διαστάσεων.
+    """
+    leaf_entry_size = 2 * dims * 8 + 2 * 4
+    internal_entry_size = 2 * dims * 8 + 2 * 4 + dims * 8
+    return max(leaf_entry_size, internal_entry_size)
+
+
+def leaf_entry_size(leaf_encoding='float64', dims=2):
+    """
+    Μέγεθος εγγραφής φύλλου σε σελίδα με την κωδικοποίηση leaf_encoding (MBR και δείκτες (block_id, slot)).
+
+    :param leaf_encoding: Η κωδικοποίηση των φύλλων (βλ. LEAF_ENCODINGS).
+    :param dims: Ο αριθμός των διαστάσεων.
+    """
+    if leaf_encoding == 'point':
+        return dims * 8 + 2 * 4
+    if leaf_encoding == 'delta':
+        return dims * 4 + 2 * 4
+    return 2 * dims * 8 + 2 * 4
+
+
+# Τα μεγέθη σελίδων στρογγυλοποιούνται σε πολλαπλάσια αυτής της τιμής
+PAGE_ALIGNMENT = 512
+
+logger = logging.getLogger(__name__)
+
+
+def page_size_for(max_entries, dims=2):
+    """
+    Το μέγεθος σελίδας που χωράει έναν κόμβο με max_entries εγγραφές.
+
+    :param max_entries: Μέγιστος αριθμός εγγραφών ανά κόμβο.
+    :param dims: Ο αριθμός των διαστάσεων.
+    """
+    size = max(NODE_HEADER.size + max_entries * entry_size(dims), HEADER_STRUCT.size)
+    return -(-size // PAGE_ALIGNMENT) * PAGE_ALIGNMENT
+
+
+def leaf_capacity_for(page_size, max_entries, leaf_encoding='float64', dims=2):
+    """
+    Ο μέγιστος αριθμός εγγραφών ενός φύλλου. Με τις συμπαγείς κωδικοποιήσεις τα φύλλα γεμίζουν όλη
+    τη σελίδα, που έχει το μέγεθος των εσωτερικών κόμβων, οπότε χωρούν περισσότερες από max_entries εγγραφές.
+
+    :param page_size: Το μέγεθος σελίδας.
+    :param max_entries: Μέγιστος αριθμός εγγραφών ανά εσωτερικό κόμβο.
+    :param leaf_encoding: Η κωδικοποίηση των φύλλων.
+    :param dims: Ο αριθμός των διαστάσεων.
+    """
+    if leaf_encoding == 'float64':
+        return max_entries
+    space = page_size - NODE_HEADER.size - (dims * 4 if leaf_encoding == 'delta' else 0)
+    return max(max_entries, space // leaf_entry_size(leaf_encoding, dims))
+
 
 class IndexFile:
-    def __init__(self, filename):
+    def __init__(self, filename, max_entries=4, create=True, buffer_pool=None, dims=2, metric='euclidean',
+                 leaf_encoding='float64', scale=FIXED_SCALE):
         """
-        Δημιουργία και διαχείριση του indexfile που αποθηκεύει τους δείκτες προς τα δεδομένα.
-        
+        Δημιουργία και διαχείριση του indexfile, όπου κάθε κόμβος του R*-Tree αποθηκεύεται
+        σε μια σελίδα σταθερού μεγέθους με τα MBR και τους δείκτες των εγγραφών του
+        (σελίδες παιδιών, με το πλήθος και το άθροισμα των κέντρων των εγγραφών του υποδέντρου τους,
+        για τους εσωτερικούς κόμβους, (block_id, slot) για τα φύλλα).
+        Η σελίδα 0 κρατά τη ρίζα, το ύψος, τον βαθμό, τις διαστάσεις, τη μετρική και την κωδικοποίηση των
+        φύλλων του δέντρου, καθώς και το LSN του write-ahead log μέχρι το οποίο οι αλλαγές έχουν γραφτεί
+        στις σελίδες (checkpoint_lsn).
+
         :param filename: Το όνομα του αρχείου του καταλόγου (index file).
+        :param max_entries: Μέγιστος αριθμός εγγραφών ανά κόμβο (μόνο για νέο αρχείο).
+        :param create: True για δημιουργία νέου αρχείου, False για άνοιγμα υπάρχοντος.
+        :param buffer_pool: Το buffer pool για τις σελίδες (προεπιλογή το κοινό buffer pool).
+        :param dims: Ο αριθμός των διαστάσεων (μόνο για νέο αρχείο).
+        :param metric: Η μετρική αποστάσεων του δέντρου (μόνο για νέο αρχείο).
+        :param leaf_encoding: Η κωδικοποίηση των φύλλων (βλ. LEAF_ENCODINGS), μόνο για νέο αρχείο.
+        :param scale: Οι μονάδες ανά μονάδα συντεταγμένης της κωδικοποίησης 'delta' (μόνο για νέο αρχείο).
         """
         self.filename = filename
-        self.entries = []
-        self.create_index_file()
+        self.buffer_pool = buffer_pool if buffer_pool is not None else default_pool
+        # Σελίδες που μπορούν να ξαναχρησιμοποιηθούν (None μέχρι να βρεθούν σε ένα υπάρχον αρχείο)
+        self.free_pages = [] if create else None
+        self.pending_free = []  # Σελίδες που ελευθερώθηκαν αλλά τις βλέπει ακόμα η μόνιμη σελίδα 0
+        self.page_reads = 0  # Σελίδες που διαβάστηκαν από τον δίσκο (όχι από το buffer pool)
+        if create:
+            self.max_entries = max_entries
+            self.dims = dims
+            self.metric = metric
+            self.leaf_encoding = leaf_encoding
+            self.scale = scale
+            self.page_size = page_size_for(max_entries, dims)
+            self.leaf_capacity = leaf_capacity_for(self.page_size, max_entries, leaf_encoding, dims)
+            self.root_page = 0
+            self.height = 1
+            self.page_count = 1
+            self.split_policy = 'rstar'
+            self.checkpoint_lsn = 0
+            self.create_index_file()
+        else:
+            self.file = open(self.filename, 'r+b')
+            self.read_header()
 
     def create_index_file(self):
         """
-        Δημιουργία του αρχείου καταλόγου.
+        Δημιουργία του αρχείου καταλόγου με μια κενή σελίδα μετα-πληροφοριών.
+        """
+        self.file = open(self.filename, 'w+b')
+        self.write_header(self.root_page, self.height, self.split_policy)
+        self.flush()
+        logger.info('Index file %s created.', self.filename)
+
+    def read_header(self):
+        """
+        Ανάγνωση της σελίδας μετα-πληροφοριών.
+        """
+        self.file.seek(0)
+        data = self.file.read(HEADER_STRUCT.size)
+        (magic, version, page_size, max_entries, root_page, height, page_count, split_policy,
+         checkpoint_lsn, dims, metric, leaf_encoding, scale) = HEADER_STRUCT.unpack(data)
+        if magic != MAGIC:
+            raise ValueError(f"{self.filename} is not a paged R*-Tree index file")
+        if version != VERSION:
+            raise ValueError(f"{self.filename} has index format version {version}, expected {VERSION}; rebuild it")
+
+        self.page_size = page_size
+        self.max_entries = max_entries
+        self.root_page = root_page
+        self.height = height
+        self.page_count = page_count
+        self.split_policy = split_policy.rstrip(b'\x00').decode('ascii')
+        self.checkpoint_lsn = checkpoint_lsn
+        self.dims = dims
+        self.metric = metric.rstrip(b'\x00').decode('ascii')
+        self.leaf_encoding = leaf_encoding.rstrip(b'\x00').decode('ascii')
+        self.scale = scale
+        self.leaf_capacity = leaf_capacity_for(page_size, max_entries, self.leaf_encoding, dims)
+
+    def write_header(self, root_page, height, split_policy):
+        """
+        Εγγραφή της σελίδας μετα-πληροφοριών.
+
+        :param root_page: Η σελίδα της ρίζας.
+        :param height: Το ύψος του δέντρου.
+        :param split_policy: Η στρατηγική διαχωρισμού του δέντρου.
+        """
+        self.root_page = root_page
+        self.height = height
+        self.split_policy = split_policy
+        page = self.buffer_pool.pin(self, 0, load=False)
+        HEADER_STRUCT.pack_into(page, 0, MAGIC, VERSION, self.page_size, self.max_entries, root_page, height,
+                                self.page_count, split_policy.encode('ascii'), self.checkpoint_lsn, self.dims,
+                                self.metric.encode('ascii'), self.leaf_encoding.encode('ascii'), self.scale)
+        self.buffer_pool.unpin(self, 0, dirty=True)
+
+    def encodable(self, mbr):
+        """
+        Έλεγχος ότι το MBR μιας εγγραφής φύλλου αποθηκεύεται ακριβώς με την κωδικοποίηση των φύλλων:
+        με 'point' και 'delta' πρέπει να είναι σημείο, και με 'delta' οι συντεταγμένες του να είναι
+        πολλαπλάσια του 1/scale μέσα στο εύρος του int32.
+
+        :param mbr: Το MBR.
+        :return: True αν το MBR αποθηκεύεται χωρίς απώλειες.
         """
-        with open(self.filename, 'wb') as f:
-            print(f'Index file {self.filename} created.')
+        if self.leaf_encoding == 'float64':
+            return True
+        dims = self.dims
+        lows = tuple(mbr[:dims])
+        if lows != tuple(mbr[dims:]):
+            return False
+        if self.leaf_encoding == 'delta':
+            scale = self.scale
+            for value in lows:
+                if not math.isfinite(value):
+                    return False
+                cell = round(value * scale)
+                if not -2 ** 31 <= cell < 2 ** 31 or cell / scale != value:
+                    return False
+        return True
 
-    def add_index_entry(self, mbr, block_id, slot):
+    def allocate_page(self):
         """
-        Προσθήκη εγγραφής στον κατάλογο με το MBR και τον δείκτη προς το block στο datafile.
-        
-        :param mbr: Minimum Bounding Rectangle της εγγραφής (τετράδα συντεταγμένων).
-        :param block_id: Το ID του block στο datafile όπου βρίσκεται η εγγραφή.
-        :param slot: Η θέση (slot) στο συγκεκριμένο block.
+        Δέσμευση μιας σελίδας: μιας που έχει ελευθερωθεί πριν από το τελευταίο checkpoint, αλλιώς
+        μιας νέας στο τέλος του αρχείου. Έτσι μια νέα σελίδα δεν ανήκει ποτέ στο δέντρο της μόνιμης σελίδας 0.
+
+        :return: Ο αριθμός της σελίδας.
+        """
+        if self.free_pages is None:
+            self._find_free_pages()
+        if self.free_pages:
+            return self.free_pages.pop()
+        page_id = self.page_count
+        self.page_count += 1
+        return page_id
+
+    def free_page(self, page_id):
         """
-        entry = (mbr, block_id, slot)
-        self.entries.append(entry)
-        self.write_entry_to_file(entry)
+        Αποδέσμευση της σελίδας ενός κόμβου που αφαιρέθηκε ή αντικαταστάθηκε στο δέντρο. Η σελίδα
+        ξαναχρησιμοποιείται μόνο μετά το επόμενο checkpoint, αφού μέχρι τότε μπορεί να ανήκει στο δέντρο
+        που θα βρεθεί στον δίσκο μετά από μια διακοπή. Οι ελεύθερες σελίδες κρατιούνται μόνο στη μνήμη
+        και σε ένα υπάρχον αρχείο βρίσκονται ξανά από τη ρίζα (βλ. _find_free_pages).
 
-    def write_entry_to_file(self, entry):
+        :param page_id: Ο αριθμός της σελίδας.
         """
-        Αποθήκευση της εγγραφής στον κατάλογο σε δυαδική μορφή.
-        
-        :param entry: Η εγγραφή προς αποθήκευση.
+        self.pending_free.append(page_id)
+
+    def _find_free_pages(self):
+        """
+        Εύρεση των ελεύθερων σελίδων ενός υπάρχοντος αρχείου: όσες δεν είναι προσβάσιμες από τη ρίζα
+        της σελίδας 0 στον δίσκο (π.χ. σελίδες που αντικατέστησε μια save ή έμειναν από μια διακοπή).
+        Διαβάζονται μόνο οι εσωτερικοί κόμβοι και γίνεται μία φορά, πριν από την πρώτη δέσμευση σελίδας.
         """
-        with open(self.filename, 'ab') as f:
-            # Παράδειγμα αποθήκευσης του MBR και των δείκτων
-            mbr = entry[0]
-            block_id = entry[1]
-            slot = entry[2]
-            
-            # Γράφουμε το MBR και τους δείκτες ως δυαδικά δεδομένα
-            data = struct.pack('ffffII', *mbr, block_id, slot)
-            f.write(data)
-            print(f'Index entry added for block {block_id}, slot {slot}.')
+        reachable = {0}
+        if self.root_page:
+            reachable.add(self.root_page)
+            level = [self.root_page]
+            for _ in range(self.height - 1):
+                level = [child for page_id in level for child in self._child_pages(page_id)]
+                reachable.update(level)
+        # Με φθίνουσα σειρά, ώστε η allocate_page να δίνει πρώτα τις σελίδες στην αρχή του αρχείου
+        self.free_pages = [page_id for page_id in range(self.page_count - 1, 0, -1) if page_id not in reachable]
 
+    def _child_pages(self, page_id):
+        """
+        Οι σελίδες των παιδιών ενός εσωτερικού κόμβου, χωρίς δημιουργία του κόμβου.
+        """
+        page = self.buffer_pool.pin(self, page_id)
+        try:
+            _, _, count = NODE_HEADER.unpack_from(page)
+            # Οι εσωτερικοί κόμβοι αποθηκεύουν πάντα τα MBR ως float64
+            offset = NODE_HEADER.size + count * self.dims * 16
+            child_pages = array('I')
+            child_pages.frombytes(page[offset:offset + count * 4])
+        finally:
+            self.buffer_pool.unpin(self, page_id)
+        if sys.byteorder == 'big':
+            child_pages.byteswap()
+        return child_pages
+
+    def write_node(self, node):
+        """
+        Αποθήκευση ενός κόμβου στη σελίδα του (node.page_id).
+        Τα MBR γράφονται συνεχόμενα, ακολουθούμενα από τους δείκτες, ώστε να
+        διαβάζονται απευθείας στους πίνακες του κόμβου.
+
+        :param node: Ο κόμβος προς αποθήκευση.
+        """
+        count = len(node)
+        encoding = 0
+        if node.is_leaf:
+            encoding = LEAF_ENCODINGS.index(self.leaf_encoding)
+            pointers = [node.block_ids, node.slots]
+        else:
+            pointers = [array('I', (child if isinstance(child, int) else child.page_id for child in node.children)),
+                        node.counts, node.sums]
+
+        parts = [NODE_HEADER.pack(1 if node.is_leaf else 0, encoding, count)]
+        for values in self._encode_coords(node, encoding) + pointers:
+            if sys.byteorder == 'big':
+                values = array(values.typecode, values)
+                values.byteswap()
+            parts.append(values.tobytes())
+
+        data = b''.join(parts)
+        page = self.buffer_pool.pin(self, node.page_id, load=False)
+        page[:len(data)] = data
+        page[len(data):] = bytes(self.page_size - len(data))
+        self.buffer_pool.unpin(self, node.page_id, dirty=True)
+
+    def _encode_coords(self, node, encoding):
+        """
+        Τα MBR των εγγραφών ενός κόμβου στην κωδικοποίηση της σελίδας του, ως λίστα από arrays.
+        """
+        if encoding == 0:
+            return [node.coords]
+        dims = node.dims
+        stride = 2 * dims
+        coords = node.coords
+        if encoding == 1:
+            points = array('d', bytes(len(coords) * 4))
+            for axis in range(dims):
+                points[axis::dims] = coords[axis::stride]
+            return [points]
+
+        scale = self.scale
+        base = array('i', bytes(dims * 4))
+        deltas = array('I', bytes(len(coords) * 2))
+        for axis in range(dims):
+            cells = [round(value * scale) for value in coords[axis::stride]]
+            if cells:
+                base[axis] = low = min(cells)
+                deltas[axis::dims] = array('I', [cell - low for cell in cells])
+        return [base, deltas]
+
+    def read_node(self, page_id):
+        """
+        Ανάγνωση ενός κόμβου από τη σελίδα του. Τα παιδιά ενός εσωτερικού κόμβου
+        μένουν ως αριθμοί σελίδων και φορτώνονται όταν χρειαστούν (Node.child).
+
+        :param page_id: Ο αριθμός της σελίδας.
+        :return: Ο κόμβος.
+        """
+        page = self.buffer_pool.pin(self, page_id)
+        try:
+            return self._parse_node(page_id, page)
+        finally:
+            self.buffer_pool.unpin(self, page_id)
+
+    def _parse_node(self, page_id, page):
+        """
+        Δημιουργία κόμβου από τα δεδομένα μιας σελίδας.
+        """
+        is_leaf, encoding, count = NODE_HEADER.unpack_from(page)
+
+        dims = self.dims
+        node = Node(is_leaf=bool(is_leaf), max_entries=self.leaf_capacity if is_leaf else self.max_entries,
+                    dims=dims)
+        node.page_id = page_id
+        node.store = self
+
+        offset = NODE_HEADER.size
+        if encoding == 0:
+            node.coords.frombytes(page[offset:offset + count * dims * 16])
+            offset += count * dims * 16
+            if sys.byteorder == 'big':
+                node.coords.byteswap()
+        else:
+            offset = self._decode_coords(node, encoding, count, page, offset)
+        if node.is_leaf:
+            node.block_ids.frombytes(page[offset:offset + count * 4])
+            node.slots.frombytes(page[offset + count * 4:offset + count * 8])
+        else:
+            child_pages = array('I')
+            child_pages.frombytes(page[offset:offset + count * 4])
+            if sys.byteorder == 'big':
+                child_pages.byteswap()
+            node.children = child_pages.tolist()
+            node.counts.frombytes(page[offset + count * 4:offset + count * 8])
+            node.sums.frombytes(page[offset + count * 8:offset + count * (8 + dims * 8)])
+
+        if sys.byteorder == 'big':
+            if node.is_leaf:
+                node.block_ids.byteswap()
+                node.slots.byteswap()
+            else:
+                node.counts.byteswap()
+                node.sums.byteswap()
+
+        node.update_mbr()
+        return node
+
+    def _decode_coords(self, node, encoding, count, page, offset):
+        """
+        Ανάγνωση των σημείων ενός φύλλου με κωδικοποίηση 'point' ή 'delta' στο node.coords.
+
+        :return: Η θέση στη σελίδα μετά τις συντεταγμένες.
+        """
+        dims = node.dims
+        stride = 2 * dims
+        if encoding == 1:
+            points = array('d')
+            points.frombytes(page[offset:offset + count * dims * 8])
+            offset += count * dims * 8
+            if sys.byteorder == 'big':
+                points.byteswap()
+            columns = [points[axis::dims] for axis in range(dims)]
+        else:
+            base = array('i')
+            base.frombytes(page[offset:offset + dims * 4])
+            offset += dims * 4
+            deltas = array('I')
+            deltas.frombytes(page[offset:offset + count * dims * 4])
+            offset += count * dims * 4
+            if sys.byteorder == 'big':
+                base.byteswap()
+                deltas.byteswap()
+            scale = self.scale
+            columns = [array('d', [(low + delta) / scale for delta in deltas[axis::dims]])
+                       for axis, low in enumerate(base)]
+
+        # Κάθε σημείο γίνεται MBR με κάτω όρια ίσα με τα άνω
+        coords = node.coords
+        coords.frombytes(bytes(count * stride * 8))
+        for axis, column in enumerate(columns):
+            coords[axis::stride] = column
+            coords[dims + axis::stride] = column
+        return offset
+
+    def read_page(self, page_id):
+        """
+        Ανάγνωση μιας σελίδας απευθείας από το αρχείο (χρησιμοποιείται από το buffer pool).
+
+        :param page_id: Ο αριθμός της σελίδας.
+        """
+        self.page_reads += 1
+        self.file.seek(page_id * self.page_size)
+        return self.file.read(self.page_size).ljust(self.page_size, b'\x00')
+
+    def write_page(self, page_id, data):
+        """
+        Εγγραφή μιας σελίδας απευθείας στο αρχείο (χρησιμοποιείται από το buffer pool).
+
+        :param page_id: Ο αριθμός της σελίδας.
+        :param data: Τα δεδομένα της σελίδας.
+        """
+        self.file.seek(page_id * self.page_size)
+        self.file.write(data)
+
+    def flush(self):
+        """
+        Εγγραφή στον δίσκο των σελίδων που έχουν αλλάξει στο buffer pool.
+        """
+        self.buffer_pool.flush(self)
+        self.file.flush()
+
+    def sync(self):
+        """
+        Εγγραφή των σελίδων που έχουν αλλάξει και μόνιμη αποθήκευσή τους (fsync), πριν από ένα checkpoint.
+        """
+        self.flush()
+        os.fsync(self.file.fileno())
+
+    def checkpoint(self, root_page, height, split_policy, durable=True):
+        """
+        Ολοκλήρωση μιας αποθήκευσης του δέντρου, του οποίου οι κόμβοι έχουν γραφτεί (write_node) σε
+        σελίδες που δεν βλέπει η σελίδα 0 στον δίσκο. Πρώτα γράφονται (και γίνονται fsync) οι σελίδες
+        των κόμβων και μόνο μετά η σελίδα 0 με τη νέα ρίζα, οπότε μια διακοπή σε οποιοδήποτε σημείο
+        αφήνει στον δίσκο είτε το παλιό είτε το νέο δέντρο ολόκληρο. Οι σελίδες που ελευθερώθηκαν
+        γίνονται διαθέσιμες μόνο αφού η νέα σελίδα 0 γραφτεί.
+
+        :param root_page: Η σελίδα της ρίζας.
+        :param height: Το ύψος του δέντρου.
+        :param split_policy: Η στρατηγική διαχωρισμού του δέντρου.
+        :param durable: True για fsync μετά από κάθε βήμα (όταν ακολουθεί checkpoint του write-ahead log).
+        """
+        if self.free_pages is None:
+            # Οι ελεύθερες σελίδες βρίσκονται από τη ρίζα της σελίδας 0 πριν αυτή αλλάξει
+            self._find_free_pages()
+        write = self.sync if durable else self.flush
+        write()
+        self.write_header(root_page, height, split_policy)
+        write()
+        # Οι σελίδες ελευθερώνονται και από νήματα αναγνωστών (βλ. RStarTree.snapshot), οπότε
+        # μεταφέρονται μόνο όσες υπήρχαν εδώ και όχι όσες προστεθούν στο μεταξύ
+        released = len(self.pending_free)
+        self.free_pages.extend(self.pending_free[:released])
+        del self.pending_free[:released]
+
+    def close(self):
+        """
+        Κλείσιμο του αρχείου καταλόγου, αφού γραφτούν οι σελίδες που έχουν αλλάξει.
+        """
+        self.buffer_pool.discard(self)
+        self.file.close()
@@ -0,0 +1,226 @@
+import bisect
+import functools
+import logging
+import os
+import threading
+import time
+import types
+
+# Οι μετρητές του δέντρου που καταγράφονται ανά λειτουργία (διαφορά πριν και μετά τη λειτουργία)
+COUNTERS = ('node_visits', 'entries_tested', 'splits', 'reinserts', 'page_reads')
+
+# Όρια (σε δευτερόλεπτα) των κάδων του ιστογράμματος χρόνων
+BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0,
+           float('inf'))
+
+
+def instrumented(operation):
+    """
+    Decorator για τις λειτουργίες του R*-Tree: όταν το δέντρο έχει stats sink, μετρά τον χρόνο της
+    λειτουργίας και τη μεταβολή των μετρητών του και τα στέλνει στο sink. Χωρίς sink το μόνο κόστος
+    είναι ένας έλεγχος ανά λειτουργία. Αν η λειτουργία επιστρέφει generator, η καταγραφή γίνεται
+    όταν αυτός εξαντληθεί ή κλείσει, με τον χρόνο από την κλήση μέχρι τότε.
+
+    :param operation: Το όνομα της λειτουργίας (π.χ. 'insert', 'search', 'knn').
+    """
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(tree, *args, **kwargs):
+            sink = tree.stats_sink
+            if sink is None:
+                return method(tree, *args, **kwargs)
+            before = tree.counters()
+            start = time.perf_counter()
+            try:
+                result = method(tree, *args, **kwargs)
+            except BaseException:
+                _record(tree, sink, operation, start, before)
+                raise
+            if isinstance(result, types.GeneratorType):
+                return _record_when_done(result, tree, sink, operation, start, before)
+            _record(tree, sink, operation, start, before)
+            return result
+        return wrapper
+    return decorate
+
+
+def _record(tree, sink, operation, start, before):
+    """
+    Αποστολή στο sink του χρόνου μιας λειτουργίας και της μεταβολής των μετρητών του δέντρου.
+    """
+    seconds = time.perf_counter() - start
+    after = tree.counters()
+    sink.record(operation, seconds, {name: after[name] - before[name] for name in COUNTERS})
+
+
+def _record_when_done(generator, tree, sink, operation, start, before):
+    """
+    Generator που δίνει τα αποτελέσματα μιας λειτουργίας και την καταγράφει όταν ολοκληρωθεί.
+    """
+    try:
+        return (yield from generator)
+    finally:
+        _record(tree, sink, operation, start, before)
+
+
+class StatsSink:
+    """
+    Διεπαφή των stats sinks: δέχονται για κάθε λειτουργία τον χρόνο της και τους μετρητές της.
+    """
+    def record(self, operation, seconds, counters):
+        """
+        Καταγραφή μιας λειτουργίας.
+
+        :param operation: Το όνομα της λειτουργίας.
+        :param seconds: Η διάρκειά της σε δευτερόλεπτα.
+        :param counters: Λεξικό με τη μεταβολή κάθε μετρητή (COUNTERS) κατά τη λειτουργία.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MemorySink(StatsSink):
+    def __init__(self):
+        """
+        Sink που κρατά στη μνήμη, ανά λειτουργία, το πλήθος, τα σύνολα των μετρητών και ιστόγραμμα χρόνων.
+        """
+        self.lock = threading.Lock()
+        self.operations = {}  # Λειτουργία -> {'count', 'seconds', 'buckets', 'counters'}
+
+    def record(self, operation, seconds, counters):
+        with self.lock:
+            stats = self.operations.get(operation)
+            if stats is None:
+                stats = {'count': 0, 'seconds': 0.0, 'buckets': [0] * len(BUCKETS),
+                         'counters': dict.fromkeys(COUNTERS, 0)}
+                self.operations[operation] = stats
+            stats['count'] += 1
+            stats['seconds'] += seconds
+            stats['buckets'][bisect.bisect_left(BUCKETS, seconds)] += 1
+            totals = stats['counters']
+            for name, value in counters.items():
+                totals[name] += value
+
+    def percentile(self, operation, q):
+        """
+        Εκτίμηση ενός ποσοστημορίου του χρόνου μιας λειτουργίας από το ιστόγραμμα (το άνω όριο του κάδου του).
+
+        :param operation: Η λειτουργία.
+        :param q: Το ποσοστημόριο (π.χ. 0.99).
+        :return: Ο χρόνος σε δευτερόλεπτα (None αν η λειτουργία δεν έχει καταγραφεί).
+        """
+        with self.lock:
+            stats = self.operations.get(operation)
+            if stats is None:
+                return None
+            target = q * stats['count']
+            seen = 0
+            for bound, count in zip(BUCKETS, stats['buckets']):
+                seen += count
+                if seen >= target:
+                    return bound
+            return BUCKETS[-1]
+
+    def summary(self):
+        """
+        Σύνοψη ανά λειτουργία: πλήθος, μέσος χρόνος, p50/p99 και μέσοι μετρητές ανά λειτουργία.
+        """
+        with self.lock:
+            operations = list(self.operations.items())
+        summary = {}
+        for operation, stats in operations:
+            count = stats['count']
+            summary[operation] = {
+                'count': count,
+                'mean_seconds': stats['seconds'] / count,
+                'p50_seconds': self.percentile(operation, 0.5),
+                'p99_seconds': self.percentile(operation, 0.99),
+                **{name: value / count for name, value in stats['counters'].items()},
+            }
+        return summary
+
+    def reset(self):
+        with self.lock:
+            self.operations = {}
+
+
+class LoggingSink(StatsSink):
+    def __init__(self, logger=None, level=logging.DEBUG):
+        """
+        Sink που γράφει μία γραμμή ανά λειτουργία στο logging.
+
+        :param logger: Ο logger (προεπιλογή ο logger 'rstar.stats').
+        :param level: Το επίπεδο των μηνυμάτων.
+        """
+        self.logger = logger if logger is not None else logging.getLogger('rstar.stats')
+        self.level = level
+
+    def record(self, operation, seconds, counters):
+        if self.logger.isEnabledFor(self.level):
+            details = ' '.join(f'{name}={value}' for name, value in counters.items())
+            self.logger.log(self.level, '%s %.1fus %s', operation, seconds * 1e6, details)
+
+
+class PrometheusSink(MemorySink):
+    def __init__(self, filename, write_every=1000, prefix='rstar'):
+        """
+        Sink που γράφει τα στατιστικά σε αρχείο κειμένου μορφής Prometheus (π.χ. για τον textfile collector
+        του node exporter): ιστόγραμμα χρόνων και σύνολα μετρητών ανά λειτουργία.
+        Το αρχείο ξαναγράφεται ατομικά κάθε write_every λειτουργίες και στην close.
+
+        :param filename: Το αρχείο .prom.
+        :param write_every: Αριθμός λειτουργιών ανάμεσα στις εγγραφές του αρχείου.
+        :param prefix: Πρόθεμα των ονομάτων των μετρικών.
+        """
+        super().__init__()
+        self.filename = filename
+        self.write_every = write_every
+        self.prefix = prefix
+        self.unwritten = 0
+        self.write_lock = threading.Lock()  # Ένα νήμα τη φορά γράφει το αρχείο
+
+    def record(self, operation, seconds, counters):
+        super().record(operation, seconds, counters)
+        # Μόνο το νήμα που συμπληρώνει τις write_every λειτουργίες γράφει το αρχείο
+        with self.lock:
+            self.unwritten += 1
+            due = self.unwritten >= self.write_every
+            if due:
+                self.unwritten = 0
+        if due:
+            self.write()
+
+    def write(self):
+        """
+        Εγγραφή των στατιστικών στο αρχείο.
+        """
+        with self.write_lock:
+            self._write()
+
+    def _write(self):
+        with self.lock:
+            self.unwritten = 0
+            operations = sorted(self.operations.items())
+            lines = [f'# TYPE {self.prefix}_operation_seconds histogram']
+            for operation, stats in operations:
+                cumulative = 0
+                for bound, count in zip(BUCKETS, stats['buckets']):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{self.prefix}_operation_seconds_bucket{{op="{operation}",le="{le}"}} {cumulative}')
+                lines.append(f'{self.prefix}_operation_seconds_sum{{op="{operation}"}} {stats["seconds"]!r}')
+                lines.append(f'{self.prefix}_operation_seconds_count{{op="{operation}"}} {stats["count"]}')
+            for name in COUNTERS:
+                lines.append(f'# TYPE {self.prefix}_{name}_total counter')
+                for operation, stats in operations:
+                    lines.append(f'{self.prefix}_{name}_total{{op="{operation}"}} {stats["counters"][name]}')
+
+        temp_filename = self.filename + '.tmp'
+        with open(temp_filename, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(temp_filename, self.filename)
+
+    def close(self):
+        self.write()
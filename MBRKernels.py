@@ -0,0 +1,563 @@
+import math
+
+# Οι συναρτήσεις αυτού του module εκτελούν τους γεωμετρικούς ελέγχους του R*-Tree για όλες
+# τις εγγραφές ενός κόμβου μαζί, πάνω στον συνεχή πίνακα coords του κόμβου
+# (min_x, min_y, max_x, max_y ανά εγγραφή). Αν υπάρχει το NumPy, ο πίνακας διαβάζεται
+# χωρίς αντιγραφή ως πίνακας n x 4, αλλιώς χρησιμοποιείται υλοποίηση σε καθαρή Python.
+# Για δέντρα d διαστάσεων (dims != 2) κάθε εγγραφή έχει 2d συντεταγμένες (τα d κάτω όρια
+# και στη συνέχεια τα d άνω όρια) και χρησιμοποιούνται οι γενικές υλοποιήσεις στο τέλος του module.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Κάτω από αυτό το πλήθος εγγραφών το σταθερό κόστος μιας κλήσης NumPy είναι μεγαλύτερο από το όφελος
+NUMPY_MIN_ENTRIES = 24
+
+# Μέση ακτίνα της Γης (σε km) για τις γεωδαισιακές αποστάσεις
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _use_numpy(coords, stride=4):
+    """
+    Επιστρέφει True αν ο κόμβος είναι αρκετά μεγάλος ώστε να συμφέρει το NumPy.
+    """
+    return np is not None and len(coords) >= NUMPY_MIN_ENTRIES * stride
+
+
+def _matrix(coords):
+    """
+    Προβολή (χωρίς αντιγραφή) του πίνακα coords ως πίνακα NumPy n x 4.
+    """
+    return np.frombuffer(coords, dtype=np.float64).reshape(-1, 4)
+
+
+def _columns(coords):
+    """
+    Οι τέσσερις συντεταγμένες κάθε εγγραφής ως πλειάδες (min_x, min_y, max_x, max_y).
+    """
+    return zip(coords[0::4], coords[1::4], coords[2::4], coords[3::4])
+
+
+def bounding_box(coords, dims=2):
+    """
+    Το MBR που περικλείει όλες τις εγγραφές.
+
+    :param coords: Ο πίνακας συντεταγμένων του κόμβου.
+    :param dims: Ο αριθμός των διαστάσεων.
+    :return: Το MBR ή None αν δεν υπάρχουν εγγραφές.
+    """
+    if dims != 2:
+        return _nd_bounding_box(coords, dims)
+    if not coords:
+        return None
+    if _use_numpy(coords):
+        matrix = _matrix(coords)
+        lower = matrix[:, :2].min(axis=0)
+        upper = matrix[:, 2:].max(axis=0)
+        return (float(lower[0]), float(lower[1]), float(upper[0]), float(upper[1]))
+    return (min(coords[0::4]), min(coords[1::4]), max(coords[2::4]), max(coords[3::4]))
+
+
+def intersecting(coords, mbr, dims=2):
+    """
+    Οι θέσεις των εγγραφών που αλληλοεπικαλύπτονται με το MBR (και όταν απλώς εφάπτονται).
+
+    :param coords: Ο πίνακας συντεταγμένων του κόμβου.
+    :param mbr: Το MBR του ερωτήματος.
+    :param dims: Ο αριθμός των διαστάσεων.
+    :return: Λίστα με θέσεις εγγραφών.
+    """
+    if dims != 2:
+        return _nd_intersecting(coords, mbr, dims)
+    min_x, min_y, max_x, max_y = mbr
+    if _use_numpy(coords):
+        matrix = _matrix(coords)
+        mask = (matrix[:, 0] <= max_x) & (matrix[:, 2] >= min_x) & (matrix[:, 1] <= max_y) & (matrix[:, 3] >= min_y)
+        return np.flatnonzero(mask).tolist()
+    return [
+        i for i, (x1, y1, x2, y2) in enumerate(_columns(coords))
+        if x1 <= max_x and x2 >= min_x and y1 <= max_y and y2 >= min_y
+    ]
+
+
+def containing(coords, mbr, dims=2):
+    """
+    Οι θέσεις των εγγραφών που περιέχουν ολόκληρο το MBR.
+
+    :param coords: Ο πίνακας συντεταγμένων του κόμβου.
+    :param mbr: Το MBR που εξετάζεται.
+    :param dims: Ο αριθμός των διαστάσεων.
+    :return: Λίστα με θέσεις εγγραφών.
+    """
+    if dims != 2:
+        return _nd_containing(coords, mbr, dims)
+    min_x, min_y, max_x, max_y = mbr
+    if _use_numpy(coords):
+        matrix = _matrix(coords)
+        mask = (matrix[:, 0] <= min_x) & (matrix[:, 1] <= min_y) & (matrix[:, 2] >= max_x) & (matrix[:, 3] >= max_y)
+        return np.flatnonzero(mask).tolist()
+    return [
+        i for i, (x1, y1, x2, y2) in enumerate(_columns(coords))
+        if x1 <= min_x and y1 <= min_y and x2 >= max_x and y2 >= max_y
+    ]
+
+
+def within(coords, mbr, dims=2):
+    """
+    Οι θέσεις των εγγραφών που περιέχονται ολόκληρες μέσα στο MBR.
+
+    :param coords: Ο πίνακας συντεταγμένων του κόμβου.
+    :param mbr: Το MBR που εξετάζεται.
+    :param dims: Ο αριθμός των διαστάσεων.
+    :return: Λίστα με θέσεις εγγραφών.
+    """
+    if dims != 2:
+        return _nd_within(coords, mbr, dims)
+    min_x, min_y, max_x, max_y = mbr
+    if _use_numpy(coords):
+        matrix = _matrix(coords)
+        mask = (matrix[:, 0] >= min_x) & (matrix[:, 1] >= min_y) & (matrix[:, 2] <= max_x) & (matrix[:, 3] <= max_y)
+        return np.flatnonzero(mask).tolist()
+    return [
+        i for i, (x1, y1, x2, y2) in enumerate(_columns(coords))
+        if x1 >= min_x and y1 >= min_y and x2 <= max_x and y2 <= max_y
+    ]
+
+
+def areas(coords, dims=2):
+    """
+    Το εμβαδόν κάθε εγγραφής.
+
+    :param coords: Ο πίνακας συντεταγμένων του κόμβου.
+    :param dims: Ο αριθμός των διαστάσεων.
+    :return: Λίστα με εμβαδά.
+    """
+    if dims != 2:
+        return _nd_areas(coords, dims)
+    if _use_numpy(coords):
+        matrix = _matrix(coords)
+        return ((matrix[:, 2] - matrix[:, 0]) * (matrix[:, 3] - matrix[:, 1])).tolist()
+    return [(x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in _columns(coords)]
+
+
+def enlargements(coords, mbr, dims=2):
+    """
+    Η αύξηση εμβαδού κάθε εγγραφής αν επεκταθεί ώστε να περιέχει το MBR.
+
+    :param coords: Ο πίνακας συντεταγμένων του κόμβου.
+    :param mbr: Το MBR της νέας εγγραφής.
+    :param dims: Ο αριθμός των διαστάσεων.
+    :return: Λίστα με τις αυξήσεις εμβαδού.
+    """
+    if dims != 2:
+        return _nd_enlargements(coords, mbr, dims)
+    min_x, min_y, max_x, max_y = mbr
+    if _use_numpy(coords):
+        matrix = _matrix(coords)
+        area = (matrix[:, 2] - matrix[:, 0]) * (matrix[:, 3] - matrix[:, 1])
+        width = np.maximum(matrix[:, 2], max_x) - np.minimum(matrix[:, 0], min_x)
+        height = np.maximum(matrix[:, 3], max_y) - np.minimum(matrix[:, 1], min_y)
+        return (width * height - area).tolist()
+    return [
+        (max(x2, max_x) - min(x1, min_x)) * (max(y2, max_y) - min(y1, min_y)) - (x2 - x1) * (y2 - y1)
+        for x1, y1, x2, y2 in _columns(coords)
+    ]
+
+
+def overlap_sum(coords, mbr, dims=2):
+    """
+    Το άθροισμα των εμβαδών τομής του MBR με όλες τις εγγραφές.
+
+    :param coords: Ο πίνακας συντεταγμένων του κόμβου.
+    :param mbr: Το MBR που εξετάζεται.
+    :param dims: Ο αριθμός των διαστάσεων.
+    :return: Το συνολικό εμβαδόν επικάλυψης.
+    """
+    if dims != 2:
+        return _nd_overlap_sum(coords, mbr, dims)
+    min_x, min_y, max_x, max_y = mbr
+    if _use_numpy(coords):
+        matrix = _matrix(coords)
+        dx = np.minimum(matrix[:, 2], max_x) - np.maximum(matrix[:, 0], min_x)
+        dy = np.minimum(matrix[:, 3], max_y) - np.maximum(matrix[:, 1], min_y)
+        return float(np.sum(np.where((dx > 0) & (dy > 0), dx * dy, 0.0)))
+    total = 0.0
+    for x1, y1, x2, y2 in _columns(coords):
+        dx = (x2 if x2 < max_x else max_x) - (x1 if x1 > min_x else min_x)
+        if dx <= 0:
+            continue
+        dy = (y2 if y2 < max_y else max_y) - (y1 if y1 > min_y else min_y)
+        if dy > 0:
+            total += dx * dy
+    return total
+
+
+def min_distances(coords, point, dims=2):
+    """
+    Η ελάχιστη ευκλείδια απόσταση (MINDIST) του σημείου από κάθε εγγραφή.
+
+    :param coords: Ο πίνακας συντεταγμένων του κόμβου.
+    :param point: Το σημείο του ερωτήματος.
+    :param dims: Ο αριθμός των διαστάσεων.
+    :return: Λίστα με αποστάσεις.
+    """
+    if dims != 2:
+        return _nd_min_distances(coords, point, dims)
+    px, py = point
+    if _use_numpy(coords):
+        matrix = _matrix(coords)
+        dx = np.maximum(np.maximum(matrix[:, 0] - px, px - matrix[:, 2]), 0.0)
+        dy = np.maximum(np.maximum(matrix[:, 1] - py, py - matrix[:, 3]), 0.0)
+        return np.sqrt(dx * dx + dy * dy).tolist()
+    result = []
+    for x1, y1, x2, y2 in _columns(coords):
+        dx = x1 - px if px < x1 else (px - x2 if px > x2 else 0.0)
+        dy = y1 - py if py < y1 else (py - y2 if py > y2 else 0.0)
+        result.append(math.sqrt(dx * dx + dy * dy))
+    return result
+
+
+def minmax_distances(coords, point, dims=2):
+    """
+    Το MINMAXDIST του σημείου από κάθε εγγραφή: άνω φράγμα της απόστασης μέχρι
+    το πλησιέστερο αντικείμενο που περιέχεται σε αυτήν.
+
+    :param coords: Ο πίνακας συντεταγμένων του κόμβου.
+    :param point: Το σημείο του ερωτήματος.
+    :param dims: Ο αριθμός των διαστάσεων.
+    :return: Λίστα με αποστάσεις.
+    """
+    if dims != 2:
+        return _nd_minmax_distances(coords, point, dims)
+    px, py = point
+    if _use_numpy(coords):
+        matrix = _matrix(coords)
+        center_x = (matrix[:, 0] + matrix[:, 2]) / 2
+        center_y = (matrix[:, 1] + matrix[:, 3]) / 2
+        near_x = np.where(px <= center_x, matrix[:, 0], matrix[:, 2])
+        near_y = np.where(py <= center_y, matrix[:, 1], matrix[:, 3])
+        far_x = np.where(px >= center_x, matrix[:, 0], matrix[:, 2])
+        far_y = np.where(py >= center_y, matrix[:, 1], matrix[:, 3])
+        along_x = (px - near_x) ** 2 + (py - far_y) ** 2
+        along_y = (py - near_y) ** 2 + (px - far_x) ** 2
+        return np.sqrt(np.minimum(along_x, along_y)).tolist()
+    result = []
+    for x1, y1, x2, y2 in _columns(coords):
+        center_x = (x1 + x2) / 2
+        center_y = (y1 + y2) / 2
+        near_x = x1 if px <= center_x else x2
+        near_y = y1 if py <= center_y else y2
+        far_x = x1 if px >= center_x else x2
+        far_y = y1 if py >= center_y else y2
+        along_x = (px - near_x) ** 2 + (py - far_y) ** 2
+        along_y = (py - near_y) ** 2 + (px - far_x) ** 2
+        result.append(math.sqrt(min(along_x, along_y)))
+    return result
+
+
+def nearest_entries(coords, point, k, dims=2):
+    """
+    Οι k εγγραφές με τη μικρότερη MINDIST από το σημείο (χωρίς συγκεκριμένη σειρά).
+
+    :param coords: Ο πίνακας συντεταγμένων του κόμβου.
+    :param point: Το σημείο του ερωτήματος.
+    :param k: Ο αριθμός των εγγραφών.
+    :param dims: Ο αριθμός των διαστάσεων.
+    :return: Λίστα από ζεύγη (θέση, απόσταση).
+    """
+    if dims != 2:
+        return _nd_nearest_entries(coords, point, k, dims)
+    count = len(coords) >> 2
+    if k >= count:
+        return list(enumerate(min_distances(coords, point)))
+    if _use_numpy(coords):
+        px, py = point
+        matrix = _matrix(coords)
+        dx = np.maximum(np.maximum(matrix[:, 0] - px, px - matrix[:, 2]), 0.0)
+        dy = np.maximum(np.maximum(matrix[:, 1] - py, py - matrix[:, 3]), 0.0)
+        distances = np.sqrt(dx * dx + dy * dy)
+        indices = np.argpartition(distances, k - 1)[:k]
+        return list(zip(indices.tolist(), distances[indices].tolist()))
+    distances = min_distances(coords, point)
+    return [(i, distances[i]) for i in sorted(range(count), key=distances.__getitem__)[:k]]
+
+
+def intersecting_pairs(coords, mbrs, dims=2):
+    """
+    Όλα τα ζεύγη (ερώτημα, εγγραφή) που αλληλοεπικαλύπτονται, για πολλά MBR ερωτημάτων μαζί.
+
+    :param coords: Ο πίνακας συντεταγμένων του κόμβου.
+    :param mbrs: Τα MBR των ερωτημάτων.
+    :param dims: Ο αριθμός των διαστάσεων.
+    :return: Λίστα από ζεύγη (θέση ερωτήματος, θέση εγγραφής), ταξινομημένα κατά ερώτημα.
+    """
+    if dims != 2:
+        return _nd_intersecting_pairs(coords, mbrs, dims)
+    if _use_numpy(coords) and len(mbrs) > 1:
+        matrix = _matrix(coords)
+        queries = np.asarray(mbrs, dtype=np.float64)
+        mask = ((matrix[None, :, 0] <= queries[:, None, 2]) & (matrix[None, :, 2] >= queries[:, None, 0]) &
+                (matrix[None, :, 1] <= queries[:, None, 3]) & (matrix[None, :, 3] >= queries[:, None, 1]))
+        rows, columns = np.nonzero(mask)
+        return list(zip(rows.tolist(), columns.tolist()))
+    return [(q, i) for q, mbr in enumerate(mbrs) for i in intersecting(coords, mbr)]
+
+
+def min_distance_matrix(coords, points, dims=2):
+    """
+    Η MINDIST κάθε σημείου από κάθε εγγραφή, για πολλά σημεία ερωτημάτων μαζί.
+
+    :param coords: Ο πίνακας συντεταγμένων του κόμβου.
+    :param points: Τα σημεία των ερωτημάτων.
+    :param dims: Ο αριθμός των διαστάσεων.
+    :return: Λίστα με μία λίστα αποστάσεων ανά σημείο.
+    """
+    if dims != 2:
+        return _nd_min_distance_matrix(coords, points, dims)
+    if _use_numpy(coords) and len(points) > 1:
+        matrix = _matrix(coords)
+        queries = np.asarray(points, dtype=np.float64)
+        px = queries[:, 0:1]
+        py = queries[:, 1:2]
+        dx = np.maximum(np.maximum(matrix[None, :, 0] - px, px - matrix[None, :, 2]), 0.0)
+        dy = np.maximum(np.maximum(matrix[None, :, 1] - py, py - matrix[None, :, 3]), 0.0)
+        return np.sqrt(dx * dx + dy * dy).tolist()
+    return [min_distances(coords, point) for point in points]
+
+
+# Γενικές υλοποιήσεις για d διαστάσεις
+
+def _boxes(coords, dims):
+    """
+    Οι συντεταγμένες κάθε εγγραφής ως ζεύγη (κάτω όρια, άνω όρια).
+    """
+    stride = 2 * dims
+    for i in range(0, len(coords), stride):
+        yield coords[i:i + dims], coords[i + dims:i + stride]
+
+
+def _bounds(coords, dims):
+    """
+    Προβολή του πίνακα coords ως πίνακας NumPy n x 2d, χωρισμένος σε κάτω και άνω όρια.
+    """
+    matrix = np.frombuffer(coords, dtype=np.float64).reshape(-1, 2 * dims)
+    return matrix[:, :dims], matrix[:, dims:]
+
+
+def _nd_bounding_box(coords, dims):
+    if not coords:
+        return None
+    if _use_numpy(coords, 2 * dims):
+        lower, upper = _bounds(coords, dims)
+        return tuple(lower.min(axis=0).tolist()) + tuple(upper.max(axis=0).tolist())
+    stride = 2 * dims
+    return (tuple(min(coords[d::stride]) for d in range(dims)) +
+            tuple(max(coords[dims + d::stride]) for d in range(dims)))
+
+
+def _nd_intersecting(coords, mbr, dims):
+    if _use_numpy(coords, 2 * dims):
+        lower, upper = _bounds(coords, dims)
+        mask = np.all((lower <= mbr[dims:]) & (upper >= mbr[:dims]), axis=1)
+        return np.flatnonzero(mask).tolist()
+    query_lower, query_upper = mbr[:dims], mbr[dims:]
+    return [
+        i for i, (lower, upper) in enumerate(_boxes(coords, dims))
+        if all(l <= qu and u >= ql for l, u, ql, qu in zip(lower, upper, query_lower, query_upper))
+    ]
+
+
+def _nd_containing(coords, mbr, dims):
+    if _use_numpy(coords, 2 * dims):
+        lower, upper = _bounds(coords, dims)
+        mask = np.all((lower <= mbr[:dims]) & (upper >= mbr[dims:]), axis=1)
+        return np.flatnonzero(mask).tolist()
+    query_lower, query_upper = mbr[:dims], mbr[dims:]
+    return [
+        i for i, (lower, upper) in enumerate(_boxes(coords, dims))
+        if all(l <= ql and u >= qu for l, u, ql, qu in zip(lower, upper, query_lower, query_upper))
+    ]
+
+
+def _nd_within(coords, mbr, dims):
+    if _use_numpy(coords, 2 * dims):
+        lower, upper = _bounds(coords, dims)
+        mask = np.all((lower >= mbr[:dims]) & (upper <= mbr[dims:]), axis=1)
+        return np.flatnonzero(mask).tolist()
+    query_lower, query_upper = mbr[:dims], mbr[dims:]
+    return [
+        i for i, (lower, upper) in enumerate(_boxes(coords, dims))
+        if all(l >= ql and u <= qu for l, u, ql, qu in zip(lower, upper, query_lower, query_upper))
+    ]
+
+
+def _nd_areas(coords, dims):
+    if _use_numpy(coords, 2 * dims):
+        lower, upper = _bounds(coords, dims)
+        return np.prod(upper - lower, axis=1).tolist()
+    return [math.prod(u - l for l, u in zip(lower, upper)) for lower, upper in _boxes(coords, dims)]
+
+
+def _nd_enlargements(coords, mbr, dims):
+    if _use_numpy(coords, 2 * dims):
+        lower, upper = _bounds(coords, dims)
+        area = np.prod(upper - lower, axis=1)
+        union = np.prod(np.maximum(upper, mbr[dims:]) - np.minimum(lower, mbr[:dims]), axis=1)
+        return (union - area).tolist()
+    query_lower, query_upper = mbr[:dims], mbr[dims:]
+    return [
+        math.prod(max(u, qu) - min(l, ql) for l, u, ql, qu in zip(lower, upper, query_lower, query_upper)) -
+        math.prod(u - l for l, u in zip(lower, upper))
+        for lower, upper in _boxes(coords, dims)
+    ]
+
+
+def _nd_overlap_sum(coords, mbr, dims):
+    if _use_numpy(coords, 2 * dims):
+        lower, upper = _bounds(coords, dims)
+        sides = np.minimum(upper, mbr[dims:]) - np.maximum(lower, mbr[:dims])
+        return float(np.sum(np.where(np.all(sides > 0, axis=1), np.prod(sides, axis=1), 0.0)))
+    query_lower, query_upper = mbr[:dims], mbr[dims:]
+    total = 0.0
+    for lower, upper in _boxes(coords, dims):
+        volume = 1.0
+        for l, u, ql, qu in zip(lower, upper, query_lower, query_upper):
+            side = (u if u < qu else qu) - (l if l > ql else ql)
+            if side <= 0:
+                break
+            volume *= side
+        else:
+            total += volume
+    return total
+
+
+def _nd_min_distances(coords, point, dims):
+    if _use_numpy(coords, 2 * dims):
+        lower, upper = _bounds(coords, dims)
+        delta = np.maximum(np.maximum(lower - point, np.asarray(point) - upper), 0.0)
+        return np.sqrt(np.sum(delta * delta, axis=1)).tolist()
+    result = []
+    for lower, upper in _boxes(coords, dims):
+        total = 0.0
+        for p, l, u in zip(point, lower, upper):
+            delta = l - p if p < l else (p - u if p > u else 0.0)
+            total += delta * delta
+        result.append(math.sqrt(total))
+    return result
+
+
+def _nd_minmax_distances(coords, point, dims):
+    # MINMAXDIST (Roussopoulos et al.): για κάθε διάσταση k, η πλησιέστερη έδρα στην k και
+    # οι πιο απομακρυσμένες στις υπόλοιπες διαστάσεις. Κρατιέται η μικρότερη από τις d τιμές.
+    if _use_numpy(coords, 2 * dims):
+        lower, upper = _bounds(coords, dims)
+        point = np.asarray(point, dtype=np.float64)
+        center = (lower + upper) / 2
+        near = (point - np.where(point <= center, lower, upper)) ** 2
+        far = (point - np.where(point >= center, lower, upper)) ** 2
+        return np.sqrt(np.min(far.sum(axis=1)[:, None] - far + near, axis=1)).tolist()
+    result = []
+    for lower, upper in _boxes(coords, dims):
+        near = []
+        far = []
+        for p, l, u in zip(point, lower, upper):
+            center = (l + u) / 2
+            near.append((p - (l if p <= center else u)) ** 2)
+            far.append((p - (l if p >= center else u)) ** 2)
+        far_total = sum(far)
+        result.append(math.sqrt(min(far_total - f + n for n, f in zip(near, far))))
+    return result
+
+
+def _nd_nearest_entries(coords, point, k, dims):
+    distances = _nd_min_distances(coords, point, dims)
+    if k >= len(distances):
+        return list(enumerate(distances))
+    return [(i, distances[i]) for i in sorted(range(len(distances)), key=distances.__getitem__)[:k]]
+
+
+def _nd_intersecting_pairs(coords, mbrs, dims):
+    return [(q, i) for q, mbr in enumerate(mbrs) for i in _nd_intersecting(coords, mbr, dims)]
+
+
+def _nd_min_distance_matrix(coords, points, dims):
+    return [_nd_min_distances(coords, point, dims) for point in points]
+
+
+# Γεωδαισιακές αποστάσεις (σημεία και MBR σε μοίρες: lat, lon, lat, lon)
+
+def haversine(lat1, lon1, lat2, lon2):
+    """
+    Η απόσταση μεγάλου κύκλου δύο σημείων (τύπος haversine).
+
+    :return: Η απόσταση σε km.
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2 +
+         math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+
+def _meridian_distance(lat, lon, edge_lon, min_lat, max_lat):
+    """
+    Η ελάχιστη απόσταση του σημείου από το τμήμα του μεσημβρινού edge_lon μεταξύ min_lat και max_lat.
+    """
+    # Το πλησιέστερο σημείο ολόκληρου του μεγάλου κύκλου του μεσημβρινού. Η απόσταση κατά μήκος
+    # του κύκλου έχει ένα μόνο ελάχιστο, οπότε στο τμήμα το ελάχιστο είναι στην προβολή ή σε άκρο.
+    phi = math.radians(lat)
+    closest = math.degrees(math.atan2(math.sin(phi), math.cos(phi) * math.cos(math.radians(lon - edge_lon))))
+    candidates = [min_lat, max_lat]
+    if min_lat < closest < max_lat:
+        candidates.append(closest)
+    return min(haversine(lat, lon, candidate, edge_lon) for candidate in candidates)
+
+
+def geodesic_min_distances(coords, point):
+    """
+    Η ελάχιστη γεωδαισιακή απόσταση (MINDIST πάνω στη σφαίρα) του σημείου από κάθε εγγραφή.
+    Είναι η πραγματική απόσταση από το πλησιέστερο σημείο του MBR, επομένως κάτω φράγμα της απόστασης
+    από κάθε αντικείμενο που περιέχεται σε αυτό.
+
+    :param coords: Ο πίνακας συντεταγμένων του κόμβου (min_lat, min_lon, max_lat, max_lon ανά εγγραφή).
+    :param point: Το σημείο του ερωτήματος (lat, lon).
+    :return: Λίστα με αποστάσεις σε km.
+    """
+    lat, lon = point
+    km_per_degree = math.radians(EARTH_RADIUS_KM)
+    result = []
+    for min_lat, min_lon, max_lat, max_lon in _columns(coords):
+        if min_lon <= lon <= max_lon:
+            # Στο ίδιο γεωγραφικό μήκος η απόσταση είναι η διαφορά πλάτους
+            delta = min_lat - lat if lat < min_lat else (lat - max_lat if lat > max_lat else 0.0)
+            result.append(delta * km_per_degree)
+        elif min_lat == max_lat and min_lon == max_lon:
+            result.append(haversine(lat, lon, min_lat, min_lon))
+        else:
+            # Αλλιώς το πλησιέστερο σημείο βρίσκεται σε μία από τις δύο πλευρές-μεσημβρινούς
+            result.append(min(_meridian_distance(lat, lon, min_lon, min_lat, max_lat),
+                              _meridian_distance(lat, lon, max_lon, min_lat, max_lat)))
+    return result
+
+
+def geodesic_bounding_box(point, radius):
+    """
+    Το MBR (lat, lon) που περιέχει όλα τα σημεία σε γεωδαισιακή απόσταση το πολύ radius από το σημείο.
+    Αν ο κύκλος περιέχει πόλο ή περνά τον αντιμεσημβρινό, το MBR καλύπτει όλα τα γεωγραφικά μήκη.
+
+    :param point: Το κέντρο (lat, lon) σε μοίρες.
+    :param radius: Η ακτίνα σε km.
+    :return: Το MBR (min_lat, min_lon, max_lat, max_lon).
+    """
+    lat, lon = point
+    delta = math.degrees(radius / EARTH_RADIUS_KM)
+    min_lat = lat - delta
+    max_lat = lat + delta
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return (max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0)
+    # Το μέγιστο άνοιγμα σε μήκος ενός σφαιρικού κύκλου γωνιακής ακτίνας delta γύρω από το πλάτος lat
+    spread = math.degrees(math.asin(min(1.0, math.sin(math.radians(delta)) / math.cos(math.radians(lat)))))
+    if lon - spread < -180.0 or lon + spread > 180.0:
+        return (min_lat, -180.0, max_lat, 180.0)
+    return (min_lat, lon - spread, max_lat, lon + spread)
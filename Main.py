@@ -37,8 +37,10 @@ def terminal_interface():
             max_x = float(input("Enter max X: "))
             max_y = float(input("Enter max Y: "))
             mbr = (min_x, min_y, max_x, max_y)
-            rstar_tree.delete(mbr)
-            print("Record deleted successfully.")
+            if rstar_tree.delete(mbr):
+                print("Record deleted successfully.")
+            else:
+                print("Record not found.")
 
         elif choice == "3":
             # Ερώτημα περιοχής (range query)
@@ -74,7 +76,8 @@ def terminal_interface():
                 print(result)
 
         elif choice == "6":
-            # Έξοδος από το πρόγραμμα
+            # Αποθήκευση του δέντρου στο index file και έξοδος από το πρόγραμμα
+            rstar_tree.close()
             print("Exiting...")
             break
 
@@ -1,63 +1,550 @@
+import math
+import threading
+from array import array
+
+from MBRKernels import bounding_box
+
+# Διαθέσιμες στρατηγικές διαχωρισμού κόμβων
+SPLIT_POLICIES = ('linear', 'quadratic', 'rstar')
+
+
+# Τα MBR είναι πλειάδες με τα d κάτω όρια και στη συνέχεια τα d άνω όρια (d = len(mbr) // 2).
+# Οι συναρτήσεις έχουν ξεχωριστό, γρηγορότερο δρόμο για τις δύο διαστάσεις.
+
+def mbr_area(mbr):
+    """
+    Εμβαδόν (όγκος σε d διαστάσεις) ενός MBR.
+    """
+    if len(mbr) == 4:
+        return (mbr[2] - mbr[0]) * (mbr[3] - mbr[1])
+    dims = len(mbr) >> 1
+    return math.prod(mbr[dims + d] - mbr[d] for d in range(dims))
+
+
+def mbr_margin(mbr):
+    """
+    Περίμετρος (margin) ενός MBR: το άθροισμα των ακμών του.
+    """
+    if len(mbr) == 4:
+        return 2 * ((mbr[2] - mbr[0]) + (mbr[3] - mbr[1]))
+    dims = len(mbr) >> 1
+    return (1 << (dims - 1)) * sum(mbr[dims + d] - mbr[d] for d in range(dims))
+
+
+def mbr_union(mbr1, mbr2):
+    """
+    Το ελάχιστο MBR που περιέχει και τα δύο MBR.
+    """
+    if len(mbr1) == 4:
+        return (min(mbr1[0], mbr2[0]), min(mbr1[1], mbr2[1]), max(mbr1[2], mbr2[2]), max(mbr1[3], mbr2[3]))
+    dims = len(mbr1) >> 1
+    return tuple(map(min, mbr1[:dims], mbr2[:dims])) + tuple(map(max, mbr1[dims:], mbr2[dims:]))
+
+
+def overlap_area(mbr1, mbr2):
+    """
+    Εμβαδόν της τομής δύο MBR (0 αν δεν τέμνονται).
+    """
+    if len(mbr1) == 4:
+        dx = min(mbr1[2], mbr2[2]) - max(mbr1[0], mbr2[0])
+        dy = min(mbr1[3], mbr2[3]) - max(mbr1[1], mbr2[1])
+        if dx <= 0 or dy <= 0:
+            return 0.0
+        return dx * dy
+    dims = len(mbr1) >> 1
+    volume = 1.0
+    for d in range(dims):
+        side = min(mbr1[dims + d], mbr2[dims + d]) - max(mbr1[d], mbr2[d])
+        if side <= 0:
+            return 0.0
+        volume *= side
+    return volume
+
+
+def mbr_distance(mbr1, mbr2):
+    """
+    Η ελάχιστη ευκλείδια απόσταση ανάμεσα σε δύο MBR (0 αν τέμνονται).
+    """
+    if len(mbr1) == 4:
+        dx = max(mbr1[0] - mbr2[2], mbr2[0] - mbr1[2], 0.0)
+        dy = max(mbr1[1] - mbr2[3], mbr2[1] - mbr1[3], 0.0)
+        return (dx * dx + dy * dy) ** 0.5
+    dims = len(mbr1) >> 1
+    total = 0.0
+    for d in range(dims):
+        delta = max(mbr1[d] - mbr2[dims + d], mbr2[d] - mbr1[dims + d], 0.0)
+        total += delta * delta
+    return total ** 0.5
+
+
+def mbr_center(mbr):
+    """
+    Το κέντρο ενός MBR.
+    """
+    if len(mbr) == 4:
+        return ((mbr[0] + mbr[2]) / 2, (mbr[1] + mbr[3]) / 2)
+    dims = len(mbr) >> 1
+    return tuple((mbr[d] + mbr[dims + d]) / 2 for d in range(dims))
+
+
+def min_entries_for(max_entries, min_fill=0.4):
+    """
+    Ελάχιστος αριθμός εγγραφών ανά κόμβο (m), ως ποσοστό του max_entries (M).
+    """
+    return max(1, min(int(round(max_entries * min_fill)), (max_entries + 1) // 2))
+
+
+# Προστατεύει την αντικατάσταση ενός αριθμού σελίδας από τον κόμβο που φορτώθηκε (βλ. Node.child),
+# αφού πολλά νήματα αναγνωστών μπορεί να φορτώνουν ταυτόχρονα τα παιδιά του ίδιου κόμβου
+_child_load_lock = threading.Lock()
+
+
 class Node:
-    def __init__(self, is_leaf=False, max_entries=4):
+    # Συμπαγής αναπαράσταση: χωρίς __dict__ ανά κόμβο και με τα MBR όλων των εγγραφών
+    # σε ένα συνεχές array('d') (2d συντεταγμένες ανά εγγραφή, π.χ. min_x, min_y, max_x, max_y), ενώ οι δείκτες
+    # των φύλλων προς το datafile κρατούνται σε παράλληλους πίνακες ακεραίων.
+    # Οι κόμβοι που διαβάζονται από το index file κρατούν τη σελίδα τους (page_id) και το αρχείο (store),
+    # ενώ τα παιδιά τους μένουν ως αριθμοί σελίδων μέχρι να χρειαστούν.
+    # Οι εσωτερικοί κόμβοι κρατούν για κάθε υποκόμβο το πλήθος των εγγραφών του υποδέντρου του (counts)
+    # και το άθροισμα των κέντρων τους (sums, d τιμές ανά υποκόμβο) για τα ερωτήματα συνάθροισης.
+    __slots__ = ('is_leaf', 'max_entries', 'dims', 'mbr', 'coords', 'children', 'block_ids', 'slots', 'counts',
+                 'sums', 'page_id', 'store')
+
+    def __init__(self, is_leaf=False, max_entries=4, dims=2):
         """
         Αναπαράσταση ενός κόμβου στο R*-Tree.
         
         :param is_leaf: Εάν ο κόμβος είναι φύλλο ή όχι.
         :param max_entries: Μέγιστος αριθμός εγγραφών που μπορεί να έχει ο κόμβος.
+        :param dims: Ο αριθμός των διαστάσεων.
         """
         self.is_leaf = is_leaf
-        self.entries = []  # Λίστα από τα entries που είναι είτε παιδιά είτε εγγραφές
-        self.mbr = None  # (Minimum Bounding Rectangle)
         self.max_entries = max_entries
+        self.dims = dims
+        self.mbr = None  # (Minimum Bounding Rectangle)
+        self.coords = array('d')  # Τα MBR των εγγραφών, 2d συντεταγμένες ανά εγγραφή
+        if is_leaf:
+            self.children = None
+            self.block_ids = array('I')
+            self.slots = array('I')
+            self.counts = None
+            self.sums = None
+        else:
+            self.children = []  # Οι υποκόμβοι, στην ίδια σειρά με τα MBR τους
+            self.block_ids = None
+            self.slots = None
+            self.counts = array('I')
+            self.sums = array('d')
+        self.page_id = None  # Η σελίδα του κόμβου στο index file (None αν δεν έχει αποθηκευτεί)
+        self.store = None  # Το index file από όπου φορτώνονται τα παιδιά του κόμβου
+
+    def __len__(self):
+        """
+        Ο αριθμός των εγγραφών (ή υποκόμβων) του κόμβου.
+        """
+        return len(self.coords) // (2 * self.dims)
+
+    def __getitem__(self, key):
+        """
+        Πρόσβαση στο MBR του κόμβου με τον ίδιο τρόπο όπως στις εγγραφές (node['mbr']),
+        ώστε οι εσωτερικοί κόμβοι να χειρίζονται ομοιόμορφα με τις εγγραφές των φύλλων.
+        """
+        if key == 'mbr':
+            return self.mbr
+        raise KeyError(key)
+
+    @property
+    def entries(self):
+        """
+        Οι εγγραφές του κόμβου: dict (mbr, block_id, slot) για τα φύλλα, υποκόμβοι για τους εσωτερικούς.
+        Δημιουργούνται κατά την κλήση από τους συμπαγείς πίνακες.
+        """
+        return [self.entry(i) for i in range(len(self))]
+
+    def entry(self, i):
+        """
+        Η i-οστή εγγραφή του κόμβου.
+        
+        :param i: Η θέση της εγγραφής.
+        """
+        if self.is_leaf:
+            return {'mbr': self.entry_mbr(i), 'block_id': self.block_ids[i], 'slot': self.slots[i]}
+        return self.child(i)
+
+    def child(self, i):
+        """
+        Ο i-οστός υποκόμβος, που φορτώνεται από το index file την πρώτη φορά που ζητείται.
+        Αν δύο νήματα τον φορτώσουν ταυτόχρονα, κρατιέται μόνο ο κόμβος που αποθηκεύτηκε πρώτος,
+        ώστε όλοι να βλέπουν το ίδιο αντικείμενο (π.χ. στη διαδρομή που αντιγράφει ο writer).
+        
+        :param i: Η θέση του υποκόμβου.
+        """
+        child = self.children[i]
+        if isinstance(child, int):
+            loaded = self.store.read_node(child)
+            with _child_load_lock:
+                child = self.children[i]
+                if isinstance(child, int):
+                    self.children[i] = child = loaded
+        return child
+
+    @property
+    def subtree_count(self):
+        """
+        Το πλήθος των εγγραφών (φύλλων) στο υποδέντρο του κόμβου.
+        """
+        if self.is_leaf:
+            return len(self)
+        return sum(self.counts)
+
+    @property
+    def subtree_sums(self):
+        """
+        Το άθροισμα των κέντρων των εγγραφών στο υποδέντρο του κόμβου, ανά διάσταση (άθροισμα x, άθροισμα y, ...).
+        """
+        dims = self.dims
+        if dims == 2:
+            if self.is_leaf:
+                coords = self.coords
+                return ((sum(coords[0::4]) + sum(coords[2::4])) / 2, (sum(coords[1::4]) + sum(coords[3::4])) / 2)
+            return (sum(self.sums[0::2]), sum(self.sums[1::2]))
+        if self.is_leaf:
+            coords = self.coords
+            stride = 2 * dims
+            return tuple((sum(coords[d::stride]) + sum(coords[dims + d::stride])) / 2 for d in range(dims))
+        return tuple(sum(self.sums[d::dims]) for d in range(dims))
+
+    def entry_mbr(self, i):
+        """
+        Το MBR της i-οστής εγγραφής.
+        
+        :param i: Η θέση της εγγραφής.
+        """
+        coords = self.coords
+        if self.dims == 2:
+            j = i << 2
+            return (coords[j], coords[j + 1], coords[j + 2], coords[j + 3])
+        stride = 2 * self.dims
+        return tuple(coords[i * stride:(i + 1) * stride])
+
+    def set_entry_mbr(self, i, mbr):
+        """
+        Αλλαγή του MBR της i-οστής εγγραφής (π.χ. όταν αλλάζει το MBR ενός υποκόμβου).
+        
+        :param i: Η θέση της εγγραφής.
+        :param mbr: Το νέο MBR.
+        """
+        stride = 2 * self.dims
+        self.coords[i * stride:(i + 1) * stride] = array('d', mbr)
+
+    def refresh_entry(self, i):
+        """
+        Ενημέρωση του MBR, του πλήθους και των αθροισμάτων του i-οστού υποκόμβου από τον ίδιο τον υποκόμβο.
+        
+        :param i: Η θέση του υποκόμβου.
+        :return: True αν άλλαξε το MBR του υποκόμβου.
+        """
+        child = self.children[i]
+        changed = self.entry_mbr(i) != child.mbr
+        if changed:
+            self.set_entry_mbr(i, child.mbr)
+        self.counts[i] = child.subtree_count
+        dims = self.dims
+        self.sums[i * dims:(i + 1) * dims] = array('d', child.subtree_sums)
+        return changed
+
+    def index_of_child(self, child):
+        """
+        Η θέση ενός υποκόμβου στον κόμβο.
+        
+        :param child: Ο υποκόμβος.
+        """
+        for i, node in enumerate(self.children):
+            if node is child:
+                return i
+        raise ValueError("Child not found in node")
 
     def add_entry(self, entry):
         """
         Προσθήκη μιας εγγραφής ή υποκόμβου στον κόμβο.
+        Επιτρέπεται μία επιπλέον εγγραφή πάνω από το max_entries (υπερχείλιση),
+        την οποία χειρίζεται στη συνέχεια ο διαχωρισμός του κόμβου.
         
         :param entry: Η εγγραφή (ή υποκόμβος).
         """
-        if len(self.entries) < self.max_entries:
-            self.entries.append(entry)
-            self.update_mbr()
+        if len(self) <= self.max_entries:
+            self._append(entry)
+            self.mbr = entry['mbr'] if self.mbr is None else mbr_union(self.mbr, entry['mbr'])
         else:
             raise Exception("Node full, needs splitting!")
 
+    def set_entries(self, entries):
+        """
+        Αντικατάσταση όλων των εγγραφών του κόμβου.
+        
+        :param entries: Οι νέες εγγραφές (ή υποκόμβοι).
+        """
+        del self.coords[:]
+        if self.is_leaf:
+            del self.block_ids[:]
+            del self.slots[:]
+        else:
+            del self.children[:]
+            del self.counts[:]
+            del self.sums[:]
+        for entry in entries:
+            self._append(entry)
+        self.update_mbr()
+
+    def remove_entry_at(self, i):
+        """
+        Αφαίρεση της i-οστής εγγραφής από τον κόμβο (το MBR του κόμβου δεν ενημερώνεται).
+        Ένας υποκόμβος που δεν έχει φορτωθεί δεν διαβάζεται από το index file.
+        
+        :param i: Η θέση της εγγραφής.
+        :return: Η εγγραφή που αφαιρέθηκε, ή για εσωτερικό κόμβο ο υποκόμβος
+                 (ο αριθμός σελίδας του, αν δεν έχει φορτωθεί).
+        """
+        dims = self.dims
+        if self.is_leaf:
+            entry = {'mbr': self.entry_mbr(i), 'block_id': self.block_ids[i], 'slot': self.slots[i]}
+            del self.block_ids[i]
+            del self.slots[i]
+        else:
+            entry = self.children.pop(i)
+            del self.counts[i]
+            del self.sums[i * dims:(i + 1) * dims]
+        del self.coords[2 * i * dims:2 * (i + 1) * dims]
+        return entry
+
+    def _append(self, entry):
+        """
+        Προσθήκη μιας εγγραφής στο τέλος των πινάκων του κόμβου.
+        """
+        self.coords.extend(entry['mbr'])
+        if self.is_leaf:
+            self.block_ids.append(entry['block_id'])
+            self.slots.append(entry['slot'])
+        else:
+            self.children.append(entry)
+            self.counts.append(entry.subtree_count)
+            self.sums.extend(entry.subtree_sums)
+
+    def subset(self, indices):
+        """
+        Δημιουργία νέου κόμβου με τις εγγραφές στις δοσμένες θέσεις.
+        
+        :param indices: Οι θέσεις των εγγραφών.
+        :return: Ο νέος κόμβος.
+        """
+        dims = self.dims
+        stride = 2 * dims
+        node = Node(self.is_leaf, self.max_entries, dims)
+        node.store = self.store
+        coords = self.coords
+        for i in indices:
+            j = i * stride
+            node.coords.extend(coords[j:j + stride])
+            if self.is_leaf:
+                node.block_ids.append(self.block_ids[i])
+                node.slots.append(self.slots[i])
+            else:
+                node.children.append(self.children[i])
+                node.counts.append(self.counts[i])
+                node.sums.extend(self.sums[i * dims:(i + 1) * dims])
+        node.update_mbr()
+        return node
+
+    def copy(self):
+        """
+        Αντίγραφο του κόμβου με δικούς του πίνακες εγγραφών (οι υποκόμβοι δεν αντιγράφονται).
+        Το αντίγραφο δεν έχει σελίδα στο index file μέχρι να αποθηκευτεί.
+        
+        :return: Ο νέος κόμβος.
+        """
+        node = Node(self.is_leaf, self.max_entries, self.dims)
+        node.store = self.store
+        node.mbr = self.mbr
+        node.coords = array('d', self.coords)
+        if self.is_leaf:
+            node.block_ids = array('I', self.block_ids)
+            node.slots = array('I', self.slots)
+        else:
+            node.children = list(self.children)
+            node.counts = array('I', self.counts)
+            node.sums = array('d', self.sums)
+        return node
+
     def update_mbr(self):
         """
         Ενημέρωση του Minimum Bounding Rectangle (MBR) με βάση τις εγγραφές του κόμβου.
         """
-        if not self.entries:
-            return None
-        
         # Υπολογισμός του MBR (με ελάχιστες και μέγιστες συντεταγμένες) για όλες τις εγγραφές
-        min_x = min(entry['mbr'][0] for entry in self.entries)
-        min_y = min(entry['mbr'][1] for entry in self.entries) 
-        max_x = max(entry['mbr'][2] for entry in self.entries)  
-        max_y = max(entry['mbr'][3] for entry in self.entries)
-        self.mbr = (min_x, min_y, max_x, max_y)
+        self.mbr = bounding_box(self.coords, self.dims)
 
     def is_full(self):
         """
         Επιστρέφει True αν ο κόμβος έχει φτάσει το μέγιστο αριθμό εγγραφών.
         """
-        return len(self.entries) >= self.max_entries
+        return len(self) >= self.max_entries
 
-    def split(self):
+    def is_overflowing(self):
         """
-        Διαχωρισμός του κόμβου όταν είναι πλήρης. 
-        Επιστρέφει δύο νέους κόμβους μετά τον διαχωρισμό.
+        Επιστρέφει True αν ο κόμβος έχει περισσότερες εγγραφές από το επιτρεπτό και πρέπει να διαχωριστεί.
         """
-        # Για απλότητα, διαχωρίζουμε τα entries στα δύο (απλή στρατηγική split)
-        half = len(self.entries) // 2
-        left_node = Node(self.is_leaf, self.max_entries)
-        right_node = Node(self.is_leaf, self.max_entries)
-        
-        left_node.entries = self.entries[:half]
-        right_node.entries = self.entries[half:]
-        
-        left_node.update_mbr()
-        right_node.update_mbr()
+        return len(self) > self.max_entries
+
+    def split(self, policy='rstar', min_entries=None):
+        """
+        Διαχωρισμός του κόμβου όταν υπερχειλίσει.
+        Επιστρέφει δύο νέους κόμβους μετά τον διαχωρισμό.
         
-        return left_node, right_node
+        :param policy: Στρατηγική διαχωρισμού ('linear', 'quadratic' ή 'rstar').
+        :param min_entries: Ελάχιστος αριθμός εγγραφών σε κάθε νέο κόμβο.
+        """
+        if min_entries is None:
+            min_entries = min_entries_for(self.max_entries)
+
+        mbrs = [self.entry_mbr(i) for i in range(len(self))]
+        if policy == 'rstar':
+            group1, group2 = self._rstar_split(mbrs, min_entries, self.dims)
+        elif policy == 'quadratic':
+            group1, group2 = self._quadratic_split(mbrs, min_entries)
+        elif policy == 'linear':
+            group1, group2 = self._linear_split(mbrs, min_entries, self.dims)
+        else:
+            raise ValueError(f"Unknown split policy: {policy}")
+
+        return self.subset(group1), self.subset(group2)
+
+    @staticmethod
+    def _rstar_split(mbrs, min_entries, dims=2):
+        """
+        Διαχωρισμός R*: επιλογή του άξονα με το μικρότερο άθροισμα περιμέτρων και
+        στη συνέχεια της κατανομής με την ελάχιστη επικάλυψη (και ελάχιστο εμβαδόν).
+        Επιστρέφει τις θέσεις των εγγραφών κάθε ομάδας.
+        """
+        count = len(mbrs)
+        best_axis_distributions = None
+        best_margin = float('inf')
+
+        for axis in range(dims):
+            margin_sum = 0.0
+            distributions = []
+            # Ταξινόμηση κατά το κάτω και κατά το πάνω όριο του άξονα
+            for bound, other in ((axis, axis + dims), (axis + dims, axis)):
+                ordered = sorted(range(count), key=lambda i: (mbrs[i][bound], mbrs[i][other]))
+                prefix = Node._running_mbrs(mbrs, ordered)
+                suffix = Node._running_mbrs(mbrs, ordered[::-1])[::-1]
+                for k in range(min_entries, count - min_entries + 1):
+                    left_mbr = prefix[k - 1]
+                    right_mbr = suffix[k]
+                    margin_sum += mbr_margin(left_mbr) + mbr_margin(right_mbr)
+                    distributions.append((ordered, k, left_mbr, right_mbr))
+
+            if margin_sum < best_margin:
+                best_margin = margin_sum
+                best_axis_distributions = distributions
+
+        best_key = None
+        best_split = None
+        for ordered, k, left_mbr, right_mbr in best_axis_distributions:
+            key = (overlap_area(left_mbr, right_mbr), mbr_area(left_mbr) + mbr_area(right_mbr))
+            if best_key is None or key < best_key:
+                best_key = key
+                best_split = (ordered[:k], ordered[k:])
+        return best_split
+
+    @staticmethod
+    def _running_mbrs(mbrs, ordered):
+        """
+        Επιστρέφει τα σωρευτικά MBR (prefix) των εγγραφών με τη σειρά που δίνεται.
+        """
+        running = []
+        current = None
+        for i in ordered:
+            current = mbrs[i] if current is None else mbr_union(current, mbrs[i])
+            running.append(current)
+        return running
+
+    @staticmethod
+    def _quadratic_split(mbrs, min_entries):
+        """
+        Τετραγωνικός διαχωρισμός του Guttman: επιλογή του ζεύγους που σπαταλά το
+        μεγαλύτερο εμβαδόν ως σπόρων και ανάθεση των υπολοίπων κατά προτίμηση.
+        """
+        best_waste = None
+        seeds = (0, 1)
+        for i in range(len(mbrs)):
+            for j in range(i + 1, len(mbrs)):
+                waste = mbr_area(mbr_union(mbrs[i], mbrs[j])) - mbr_area(mbrs[i]) - mbr_area(mbrs[j])
+                if best_waste is None or waste > best_waste:
+                    best_waste = waste
+                    seeds = (i, j)
+
+        def pick_next(remaining, mbr1, mbr2):
+            # Η εγγραφή με τη μεγαλύτερη διαφορά προτίμησης ανάμεσα στις δύο ομάδες
+            best_index = 0
+            best_diff = -1.0
+            for index, i in enumerate(remaining):
+                d1 = mbr_area(mbr_union(mbr1, mbrs[i])) - mbr_area(mbr1)
+                d2 = mbr_area(mbr_union(mbr2, mbrs[i])) - mbr_area(mbr2)
+                if abs(d1 - d2) > best_diff:
+                    best_diff = abs(d1 - d2)
+                    best_index = index
+            return best_index
+
+        return Node._distribute(mbrs, seeds, min_entries, pick_next)
+
+    @staticmethod
+    def _linear_split(mbrs, min_entries, dims=2):
+        """
+        Γραμμικός διαχωρισμός του Guttman: σπόροι οι εγγραφές με τη μεγαλύτερη
+        κανονικοποιημένη απόσταση σε κάποιον άξονα, ανάθεση των υπολοίπων με τη σειρά.
+        """
+        best_separation = None
+        seeds = (0, 1)
+        for axis in range(dims):
+            highest_low = max(range(len(mbrs)), key=lambda i: mbrs[i][axis])
+            lowest_high = min(range(len(mbrs)), key=lambda i: mbrs[i][axis + dims])
+            width = max(mbr[axis + dims] for mbr in mbrs) - min(mbr[axis] for mbr in mbrs)
+            separation = (mbrs[highest_low][axis] - mbrs[lowest_high][axis + dims]) / (width or 1.0)
+            if highest_low != lowest_high and (best_separation is None or separation > best_separation):
+                best_separation = separation
+                seeds = (lowest_high, highest_low)
+
+        return Node._distribute(mbrs, seeds, min_entries, lambda remaining, mbr1, mbr2: 0)
+
+    @staticmethod
+    def _distribute(mbrs, seeds, min_entries, pick_next):
+        """
+        Κοινό βήμα των διαχωρισμών του Guttman: ανάθεση κάθε εγγραφής στην ομάδα που
+        χρειάζεται τη μικρότερη επέκταση, εξασφαλίζοντας τον ελάχιστο αριθμό εγγραφών.
+        """
+        first, second = seeds
+        group1 = [first]
+        group2 = [second]
+        mbr1 = mbrs[first]
+        mbr2 = mbrs[second]
+        remaining = [i for i in range(len(mbrs)) if i not in seeds]
+
+        while remaining:
+            # Αν μια ομάδα χρειάζεται όλες τις υπόλοιπες για να φτάσει το ελάχιστο, τις παίρνει
+            if len(group1) + len(remaining) == min_entries:
+                group1.extend(remaining)
+                break
+            if len(group2) + len(remaining) == min_entries:
+                group2.extend(remaining)
+                break
+
+            i = remaining.pop(pick_next(remaining, mbr1, mbr2))
+            grow1 = mbr_area(mbr_union(mbr1, mbrs[i])) - mbr_area(mbr1)
+            grow2 = mbr_area(mbr_union(mbr2, mbrs[i])) - mbr_area(mbr2)
+            if (grow1, mbr_area(mbr1), len(group1)) <= (grow2, mbr_area(mbr2), len(group2)):
+                group1.append(i)
+                mbr1 = mbr_union(mbr1, mbrs[i])
+            else:
+                group2.append(i)
+                mbr2 = mbr_union(mbr2, mbrs[i])
 
+        return group1, group2
@@ -0,0 +1,217 @@
+import math
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+
+from MBRKernels import intersecting
+
+# Σχετική ανοχή (σε κελιά του πλέγματος) για όρια που πέφτουν πάνω σε γραμμή του πλέγματος
+SNAP_TOLERANCE = 1e-6
+
+
+def _snap(cell, rounding):
+    """
+    Στρογγυλοποίηση ενός ορίου (σε μονάδες κελιών) στο πλησιέστερο κελί αν απέχει λιγότερο από
+    SNAP_TOLERANCE από αυτό, αλλιώς με τη συνάρτηση rounding (math.floor ή math.ceil).
+    """
+    nearest = round(cell)
+    if abs(cell - nearest) < SNAP_TOLERANCE:
+        return nearest
+    return rounding(cell)
+
+
+class QueryCache:
+    def __init__(self, capacity_bytes=16 * 1024 * 1024, resolution=1e-6):
+        """
+        Προσωρινή μνήμη αποτελεσμάτων ερωτημάτων (range και k-NN) του R*-Tree, με πολιτική LRU και όριο μνήμης.
+        Ενεργοποιείται με tree.query_cache = QueryCache(...).
+
+        Τα ερωτήματα περιοχής αποθηκεύονται με κλειδί το παράθυρό τους κβαντισμένο προς τα έξω σε πλέγμα
+        βήματος resolution, ώστε επαναλαμβανόμενα παράθυρα (π.χ. tiles) με μικρές αριθμητικές διαφορές
+        να μοιράζονται την ίδια εγγραφή: εκτελείται το κβαντισμένο παράθυρο και κάθε ερώτημα παίρνει
+        μόνο τις εγγραφές που τέμνουν το δικό του. Τα ερωτήματα k-NN αποθηκεύονται με κλειδί το σημείο και το k.
+
+        Κάθε εγγραφή έχει ένα παράθυρο ακύρωσης: το κβαντισμένο παράθυρο για τα ερωτήματα περιοχής, ή το MBR
+        της σφαίρας μέχρι τον k-οστό γείτονα για τα k-NN. Μια εισαγωγή ή διαγραφή ακυρώνει μόνο τις εγγραφές
+        των οποίων το παράθυρο τέμνει το MBR που άλλαξε. Τα παράθυρα κρατιούνται σε ένα συνεχές array('d'),
+        όπως τα MBR ενός κόμβου, ώστε ο έλεγχος να γίνεται με τα kernels του MBRKernels.
+
+        Κάθε εγγραφή σημειώνεται με την έκδοση του δέντρου όπου υπολογίστηκε, ώστε τα στιγμιότυπα (snapshot)
+        να μη βλέπουν αποτελέσματα νεότερων εκδόσεων και να μην αποθηκεύουν αποτελέσματα που έχουν ήδη ακυρωθεί.
+
+        :param capacity_bytes: Το μέγιστο (εκτιμώμενο) μέγεθος μνήμης των αποτελεσμάτων (σε bytes).
+        :param resolution: Το βήμα του πλέγματος κβάντισης των παραθύρων (στις μονάδες των συντεταγμένων).
+        """
+        self.capacity_bytes = capacity_bytes
+        self.resolution = resolution
+        self.used_bytes = 0
+        self.entries = OrderedDict()  # Κλειδί -> (αποτέλεσμα, θέση παραθύρου, μέγεθος, έκδοση), κατά σειρά χρήσης
+        self.keys = []  # Θέση παραθύρου -> κλειδί (None για ελεύθερη θέση)
+        self.free_slots = []
+        self.windows = array('d')  # Τα παράθυρα ακύρωσης, 2d συντεταγμένες ανά θέση
+        self.dims = None  # Ορίζεται από το πρώτο παράθυρο
+        self.version = 0  # Η νεότερη έκδοση του δέντρου για την οποία έχει γίνει ακύρωση
+        self.lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Μηδενισμός των μετρητών.
+        """
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def stats(self):
+        """
+        Οι μετρητές της προσωρινής μνήμης, για τη ρύθμιση του μεγέθους και του βήματος κβάντισης.
+
+        :return: Λεξικό με hits, misses, evictions, invalidations, hit_rate, entries και used_bytes.
+        """
+        requests = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'hit_rate': self.hits / requests if requests else 0.0,
+            'entries': len(self.entries),
+            'used_bytes': self.used_bytes,
+        }
+
+    def range_key(self, mbr):
+        """
+        Το κλειδί και το κβαντισμένο παράθυρο ενός ερωτήματος περιοχής: τα κάτω όρια στρογγυλοποιούνται
+        προς τα κάτω και τα άνω προς τα πάνω, ώστε το κβαντισμένο παράθυρο να περιέχει το αρχικό.
+
+        :param mbr: Το MBR του ερωτήματος.
+        :return: Ζεύγος (κλειδί, κβαντισμένο παράθυρο), ή (None, None) αν το παράθυρο δεν κβαντίζεται
+                 (μη πεπερασμένες συντεταγμένες ή σφάλμα στρογγυλοποίησης που το αφήνει να μην περιέχει το αρχικό).
+        """
+        if not all(map(math.isfinite, mbr)):
+            return None, None
+        dims = len(mbr) >> 1
+        resolution = self.resolution
+        # Όρια που πέφτουν (με σφάλμα στρογγυλοποίησης) πάνω σε γραμμή του πλέγματος δεν μετακινούνται στο
+        # επόμενο κελί, και το παράθυρο ανοίγει λίγο προς τα έξω ώστε να τα περιέχει ακριβώς
+        cells = (tuple(_snap(value / resolution, math.floor) for value in mbr[:dims]) +
+                 tuple(_snap(value / resolution, math.ceil) for value in mbr[dims:]))
+        pad = resolution * SNAP_TOLERANCE
+        window = (tuple(cell * resolution - pad for cell in cells[:dims]) +
+                  tuple(cell * resolution + pad for cell in cells[dims:]))
+        if any(window[d] > mbr[d] or window[dims + d] < mbr[dims + d] for d in range(dims)):
+            return None, None
+        return ('range',) + cells, window
+
+    @staticmethod
+    def knn_key(point, k):
+        """
+        Το κλειδί ενός ερωτήματος k-NN.
+        """
+        return ('knn', k) + tuple(point)
+
+    def get(self, key, version=None):
+        """
+        Αναζήτηση ενός αποτελέσματος.
+
+        :param key: Το κλειδί του ερωτήματος.
+        :param version: Η έκδοση του δέντρου του ερωτήματος (None για την τρέχουσα): αποτελέσματα
+                        νεότερων εκδόσεων δεν επιστρέφονται.
+        :return: Το αποτέλεσμα ή None αν δεν υπάρχει.
+        """
+        with self.lock:
+            cached = self.entries.get(key)
+            if cached is None or (version is not None and cached[3] > version):
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return cached[0]
+
+    def put(self, key, result, window, version=0):
+        """
+        Αποθήκευση ενός αποτελέσματος. Αν από την έκδοση του ερωτήματος έχει γίνει κάποια αλλαγή στο δέντρο,
+        το αποτέλεσμα μπορεί να έχει ήδη ακυρωθεί και δεν αποθηκεύεται.
+
+        :param key: Το κλειδί του ερωτήματος.
+        :param result: Η λίστα με τις εγγραφές του αποτελέσματος.
+        :param window: Το παράθυρο ακύρωσης του αποτελέσματος.
+        :param version: Η έκδοση του δέντρου όπου υπολογίστηκε.
+        """
+        size = self._result_bytes(result)
+        if size > self.capacity_bytes:
+            return
+        with self.lock:
+            if version < self.version:
+                return
+            if self.dims is None:
+                self.dims = len(window) >> 1
+            if key in self.entries:
+                self._remove(key)
+            while self.entries and self.used_bytes + size > self.capacity_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+            stride = len(window)
+            if self.free_slots:
+                slot = self.free_slots.pop()
+                self.windows[slot * stride:(slot + 1) * stride] = array('d', window)
+                self.keys[slot] = key
+            else:
+                slot = len(self.keys)
+                self.windows.extend(window)
+                self.keys.append(key)
+            self.entries[key] = (result, slot, size, version)
+            self.used_bytes += size
+
+    def invalidate(self, mbr, version=0):
+        """
+        Ακύρωση των αποτελεσμάτων των οποίων το παράθυρο τέμνει ένα MBR που άλλαξε (εισαγωγή ή διαγραφή).
+
+        :param mbr: Το MBR της εγγραφής που εισήχθη ή διαγράφηκε.
+        :param version: Η έκδοση του δέντρου που περιέχει την αλλαγή.
+        """
+        with self.lock:
+            self.version = max(self.version, version)
+            if not self.entries:
+                return
+            for slot in intersecting(self.windows, tuple(mbr), self.dims):
+                self._remove(self.keys[slot])
+                self.invalidations += 1
+
+    def clear(self):
+        """
+        Αφαίρεση όλων των αποτελεσμάτων.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.keys = []
+            self.free_slots = []
+            self.windows = array('d')
+            self.used_bytes = 0
+
+    def _remove(self, key):
+        """
+        Αφαίρεση ενός αποτελέσματος. Η θέση του παραθύρου του παίρνει ένα κενό παράθυρο,
+        που δεν τέμνει κανένα MBR, μέχρι να ξαναχρησιμοποιηθεί.
+        """
+        _, slot, size, _ = self.entries.pop(key)
+        dims = self.dims
+        self.windows[slot * 2 * dims:(slot + 1) * 2 * dims] = array('d', [math.inf] * dims + [-math.inf] * dims)
+        self.keys[slot] = None
+        self.free_slots.append(slot)
+        self.used_bytes -= size
+
+    @staticmethod
+    def _result_bytes(result):
+        """
+        Εκτίμηση της μνήμης ενός αποτελέσματος, από το μέγεθος της λίστας και μιας τυπικής εγγραφής.
+        """
+        size = sys.getsizeof(result)
+        if result:
+            entry = result[0]
+            mbr = entry['mbr']
+            size += len(result) * (sys.getsizeof(entry) + sys.getsizeof(mbr) + len(mbr) * sys.getsizeof(0.0))
+        return size
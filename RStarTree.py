@@ -1,20 +1,201 @@
-from Node import Node
-from IndexFile import IndexFile
+from Node import Node, SPLIT_POLICIES, mbr_area, mbr_union, mbr_center, mbr_distance, min_entries_for
+from DataFile import FIXED_SCALE
+from IndexFile import IndexFile, LEAF_ENCODINGS
+from Instrumentation import instrumented
+from WriteAheadLog import WriteAheadLog
+from MBRKernels import (intersecting, containing, areas, enlargements, overlap_sum, min_distances, minmax_distances,
+                        nearest_entries, intersecting_pairs, min_distance_matrix, within, geodesic_min_distances,
+                        geodesic_bounding_box)
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import contextlib
 import heapq
+import logging
 import math
+import threading
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# Διαθέσιμες μετρικές αποστάσεων για τα ερωτήματα k-NN: ευκλείδια στις μονάδες των συντεταγμένων,
+# ή απόσταση μεγάλου κύκλου (σε km) για σημεία (lat, lon) σε μοίρες
+METRICS = ('euclidean', 'haversine')
+
+
+def _hilbert_index(order, x, y):
+    """
+    Υπολογισμός της θέσης ενός σημείου (x, y) του πλέγματος πάνω στην καμπύλη Hilbert.
+    
+    :param order: Τάξη της καμπύλης (πλέγμα 2^order x 2^order).
+    :param x: Ακέραια συντεταγμένη x στο πλέγμα.
+    :param y: Ακέραια συντεταγμένη y στο πλέγμα.
+    :return: Η απόσταση του σημείου κατά μήκος της καμπύλης.
+    """
+    n = 1 << order
+    d = 0
+    s = n >> 1
+    while s > 0:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        d += s * s * ((3 * rx) ^ ry)
+        # Περιστροφή του τεταρτημορίου ώστε η καμπύλη να παραμένει συνεχής
+        if ry == 0:
+            if rx == 1:
+                x = n - 1 - x
+                y = n - 1 - y
+            x, y = y, x
+        s >>= 1
+    return d
+
+
+def _hilbert_order(centers, order=16):
+    """
+    Οι θέσεις των σημείων ταξινομημένες κατά μήκος μιας καμπύλης Hilbert
+    που καλύπτει το ελάχιστο ορθογώνιο που τα περιέχει.
+    
+    :param centers: Λίστα από σημεία (x, y).
+    :param order: Τάξη της καμπύλης (πλέγμα 2^order x 2^order).
+    :return: Λίστα με θέσεις σημείων.
+    """
+    min_x = min(x for x, _ in centers)
+    min_y = min(y for _, y in centers)
+    span_x = (max(x for x, _ in centers) - min_x) or 1.0
+    span_y = (max(y for _, y in centers) - min_y) or 1.0
+    side = (1 << order) - 1
+
+    keys = [
+        _hilbert_index(order, int((x - min_x) / span_x * side), int((y - min_y) / span_y * side))
+        for x, y in centers
+    ]
+    return sorted(range(len(centers)), key=keys.__getitem__)
+
+
+# Το δέντρο κάθε διεργασίας εργάτη στα ερωτήματα παρτίδας (ανοίγεται μία φορά από το index file)
+_worker_tree = None
+
+
+def _open_worker_tree(index_filename):
+    global _worker_tree
+    _worker_tree = RStarTree.open(index_filename)
+
+
+def _worker_range_group(mbrs):
+    return _worker_tree._range_group(mbrs)
+
+
+def _worker_knn_group(points, k):
+    return _worker_tree._knn_group(points, k)
+
 
 class RStarTree:
-    def __init__(self, max_entries_per_node=4, index_filename='indexfile.dat'):
+    def __init__(self, max_entries_per_node=4, index_filename='indexfile.dat', split_policy='rstar', reinsert_fraction=0.3,
+                 index_file=None, concurrent=False, wal_filename=None, dims=2, metric='euclidean',
+                 leaf_encoding='float64', scale=FIXED_SCALE):
         """
         Δημιουργία του R*-Tree.
         
         :param max_entries_per_node: Μέγιστος αριθμός εγγραφών ανά κόμβο.
         :param index_filename: Το όνομα του αρχείου για τον κατάλογο (index file).
+        :param split_policy: Στρατηγική διαχωρισμού: 'rstar' (R*-Tree με επανεισαγωγή),
+                             'quadratic' ή 'linear' (κλασικό R-Tree του Guttman).
+        :param reinsert_fraction: Ποσοστό των εγγραφών που επανεισάγονται στην πρώτη υπερχείλιση ανά επίπεδο.
+        :param index_file: Ένα ήδη ανοιγμένο IndexFile (χρησιμοποιείται από την open).
+        :param concurrent: True για ταυτόχρονες αναγνώσεις από πολλά νήματα μέσω της snapshot, ενώ ένα νήμα
+                           γράφει: οι εγγραφές αντιγράφουν τους κόμβους που αλλάζουν (copy-on-write)
+                           αντί να τους τροποποιούν.
+        :param wal_filename: Το όνομα του write-ahead log (None για λειτουργία χωρίς log). Κάθε εισαγωγή και
+                             διαγραφή καταγράφεται πριν εφαρμοστεί και η save κάνει checkpoint, οπότε μετά από
+                             διακοπή η open ξαναεφαρμόζει όσες αλλαγές δεν είχαν αποθηκευτεί.
+        :param dims: Ο αριθμός των διαστάσεων: κάθε MBR έχει τα dims κάτω όρια και στη συνέχεια τα dims άνω όρια.
+        :param metric: Η μετρική αποστάσεων των ερωτημάτων k-NN: 'euclidean' ή 'haversine' (απόσταση μεγάλου
+                       κύκλου σε km, για δέντρα δύο διαστάσεων με συντεταγμένες lat, lon σε μοίρες).
+        :param leaf_encoding: Η κωδικοποίηση των φύλλων στο index file: 'float64' (οποιαδήποτε MBR), 'point'
+                              (μόνο σημεία) ή 'delta' (σημεία πάνω στο πλέγμα 1/scale, π.χ. από datafile με
+                              κωδικοποίηση 'fixed'). Οι συμπαγείς κωδικοποιήσεις χωρούν περισσότερες εγγραφές ανά
+                              φύλλο στο ίδιο μέγεθος σελίδας, οπότε τα ερωτήματα διαβάζουν λιγότερες σελίδες.
+        :param scale: Οι μονάδες ανά μονάδα συντεταγμένης της κωδικοποίησης 'delta'.
         """
+        if split_policy not in SPLIT_POLICIES:
+            raise ValueError(f"Unknown split policy: {split_policy}")
+        if dims < 2:
+            raise ValueError(f"Trees need at least 2 dimensions, got {dims}")
+        if metric not in METRICS:
+            raise ValueError(f"Unknown distance metric: {metric}")
+        if metric == 'haversine' and dims != 2:
+            raise ValueError("The haversine metric requires a 2-dimensional (lat, lon) tree")
+        if leaf_encoding not in LEAF_ENCODINGS:
+            raise ValueError(f"Unknown leaf encoding: {leaf_encoding}")
+
+        self.index_file = index_file if index_file is not None else IndexFile(index_filename, max_entries_per_node,
+                                                                              dims=dims, metric=metric,
+                                                                              leaf_encoding=leaf_encoding, scale=scale)
         self.max_entries_per_node = max_entries_per_node
-        self.root = Node(is_leaf=True, max_entries=max_entries_per_node)
-        self.index_file = IndexFile(index_filename)
+        self.min_entries_per_node = min_entries_for(max_entries_per_node)
+        # Τα φύλλα μπορεί να χωρούν περισσότερες εγγραφές από τους εσωτερικούς κόμβους (βλ. leaf_encoding)
+        self.leaf_encoding = self.index_file.leaf_encoding
+        self.max_leaf_entries = self.index_file.leaf_capacity
+        self.min_leaf_entries = min_entries_for(self.max_leaf_entries)
+        self.split_policy = split_policy
+        self.reinsert_fraction = reinsert_fraction
+        self.dims = dims
+        self.metric = metric
+        self.root = Node(is_leaf=True, max_entries=self.max_leaf_entries, dims=dims)
+        self.height = 1  # Πλήθος επιπέδων του δέντρου (τα φύλλα είναι το επίπεδο 0)
+        # Οι node_visits και entries_tested μετρούν μόνο με counters_enabled (ή με stats sink), ώστε χωρίς
+        # αυτά οι βρόχοι των ερωτημάτων να μην πληρώνουν μια ενημέρωση ανά κόμβο
+        self.node_visits = 0  # Πλήθος κόμβων που επισκέφθηκαν τα ερωτήματα, οι εισαγωγές και οι διαγραφές
+        self.entries_tested = 0  # Πλήθος εγγραφών φύλλων που ελέγχθηκαν από τα ερωτήματα και τις διαγραφές
+        self.splits = 0  # Πλήθος διαχωρισμών κόμβων
+        self.reinserts = 0  # Πλήθος επανεισαγωγών (forced reinsert)
+        self.counters_enabled = False
+        self.stats_sink = None  # Stats sink (Instrumentation) που δέχεται χρόνους και μετρητές ανά λειτουργία
+        self.query_cache = None  # Προσωρινή μνήμη αποτελεσμάτων (QueryCache) για τα range και k-NN ερωτήματα
+        self._overflowed_levels = set()
+        self.locator = None  # (block_id, slot) -> φύλλο, αν ενεργοποιηθεί με την enable_locator
+        self._worker_pools = weakref.WeakSet()  # Τα pools της worker_pool που βλέπουν την αποθηκευμένη έκδοση
+        self.wal = WriteAheadLog(wal_filename) if wal_filename is not None else None
+        if self.wal is not None and index_file is None:
+            # Νέο index file: οι εγγραφές ενός παλιού log δεν το αφορούν
+            self.wal.checkpoint()
+
+        # Ταυτόχρονη πρόσβαση: οι αναγνώστες βλέπουν την τελευταία δημοσιευμένη έκδοση (ρίζα, ύψος, αριθμός έκδοσης)
+        self.concurrent = concurrent
+        self.read_only = False  # True για τα στιγμιότυπα της snapshot
+        self._write_lock = threading.RLock()
+        self._snapshot_lock = threading.Lock()
+        self._version = 0
+        self._published = (self.root, self.height, 0)
+        self._owned = set()  # Κόμβοι που δημιουργήθηκαν μετά την τελευταία δημοσίευση και αλλάζουν χωρίς αντιγραφή
+        self._retiring = []  # Σελίδες κόμβων που αντικαταστάθηκαν από την τελευταία δημοσίευση
+        self._retired = []  # Ζεύγη (έκδοση, σελίδες) που ελευθερώνονται όταν δεν τις βλέπει κανένας αναγνώστης
+        self._readers = {}  # Έκδοση -> πλήθος ενεργών στιγμιοτύπων της
 
+    @property
+    def stats_sink(self):
+        return self._stats_sink
+
+    @stats_sink.setter
+    def stats_sink(self, sink):
+        """
+        Ορισμός του stats sink, που ενεργοποιεί (ή με None απενεργοποιεί) και τους μετρητές επισκέψεων.
+        """
+        self._stats_sink = sink
+        self.counters_enabled = sink is not None
+
+    def counters(self):
+        """
+        Οι τρέχουσες τιμές των μετρητών του δέντρου (κόμβοι, εγγραφές φύλλων, διαχωρισμοί,
+        επανεισαγωγές και σελίδες που διαβάστηκαν από το index file).
+        """
+        return {
+            'node_visits': self.node_visits,
+            'entries_tested': self.entries_tested,
+            'splits': self.splits,
+            'reinserts': self.reinserts,
+            'page_reads': self.index_file.page_reads,
+        }
+
+    @instrumented('insert')
     def insert(self, record):
         """
         Εισαγωγή μιας νέας εγγραφής στο R*-Tree.
@@ -24,6 +205,9 @@ class RStarTree:
         mbr = record['mbr']
         block_id = record['block_id']
         slot = record['slot']
+        if len(mbr) != 2 * self.dims:
+            raise ValueError(f"Expected an MBR with {2 * self.dims} coordinates, got {len(mbr)}")
+        self._check_encodable(mbr)
         
         entry = {
             'mbr': mbr,
@@ -31,40 +215,346 @@ class RStarTree:
             'slot': slot
         }
 
-        # Προσθήκη της εγγραφής στον κατάλληλο κόμβο
-        leaf_node = self.choose_leaf(self.root, entry)
-        leaf_node.add_entry(entry)
+        # Προσθήκη της εγγραφής στο κατάλληλο φύλλο (η επανεισαγωγή γίνεται μία φορά ανά επίπεδο)
+        self._check_writable()
+        with self._write_lock:
+            if self.wal is not None:
+                self.wal.log_insert(entry)
+            self._overflowed_levels = set()
+            self.insert_entry(entry, level=0)
+            if self.query_cache is not None:
+                self.query_cache.invalidate(mbr, self._version + 1)
+            self._publish()
+        logger.debug("Record inserted with MBR: %s, Block ID: %s, Slot: %s", mbr, block_id, slot)
 
-        if leaf_node.is_full():
-            self.split_and_adjust_tree(leaf_node)
+    def _check_encodable(self, mbr):
+        """
+        Έλεγχος ότι το MBR μιας εγγραφής αποθηκεύεται ακριβώς με την κωδικοποίηση των φύλλων.
+        """
+        if not self.index_file.encodable(mbr):
+            raise ValueError(f"MBR {tuple(mbr)} cannot be stored with the '{self.leaf_encoding}' leaf encoding")
+
+    def _min_entries(self, node):
+        """
+        Ο ελάχιστος αριθμός εγγραφών ενός κόμβου (διαφορετικός για τα φύλλα, βλ. max_leaf_entries).
+        """
+        return self.min_leaf_entries if node.is_leaf else self.min_entries_per_node
+
+    def insert_entry(self, entry, level):
+        """
+        Εισαγωγή μιας εγγραφής (ή υποκόμβου) σε κόμβο του δοσμένου επιπέδου.
         
-        # Προσθήκη εγγραφής στον κατάλογο
-        self.index_file.add_index_entry(mbr, block_id, slot)
-        print(f"Record inserted with MBR: {mbr}, Block ID: {block_id}, Slot: {slot}")
+        :param entry: Η εγγραφή ή ο υποκόμβος προς εισαγωγή.
+        :param level: Το επίπεδο του κόμβου που θα τη δεχτεί (0 για τα φύλλα).
+        """
+        path = self._writable(self.choose_subtree(entry, level))
+        node = path[-1]
+        node.add_entry(entry)
+        if level == 0 and self.locator is not None:
+            self.locator[(entry['block_id'], entry['slot'])] = node
+        self.adjust_ancestors(path)
+
+        if node.is_overflowing():
+            self.overflow_treatment(path, level)
 
-    def choose_leaf(self, node, entry):
+    @classmethod
+    def bulk_load(cls, records, max_entries_per_node=4, index_filename='indexfile.dat', method='str', **kwargs):
         """
-        Επιλέγουμε τον κατάλληλο φύλλο για την προσθήκη της νέας εγγραφής.
+        Μαζική κατασκευή (bulk loading) του R*-Tree από ένα σύνολο εγγραφών.
+        Τα φύλλα γεμίζουν πλήρως με ταξινόμηση Sort-Tile-Recursive (STR) ή καμπύλης Hilbert
+        και τα ανώτερα επίπεδα χτίζονται από κάτω προς τα πάνω με τον ίδιο τρόπο.
         
-        :param node: Ο κόμβος από όπου ξεκινάμε την αναζήτηση του φύλλου.
-        :param entry: Η εγγραφή προς εισαγωγή.
-        :return: Ο φύλλος όπου θα γίνει η εισαγωγή της εγγραφής.
+        :param records: Iterable από εγγραφές με MBR και δείκτες προς το datafile.
+        :param max_entries_per_node: Μέγιστος αριθμός εγγραφών ανά κόμβο.
+        :param index_filename: Το όνομα του αρχείου για τον κατάλογο (index file).
+        :param method: 'str' ή 'hilbert'.
+        :param kwargs: Επιπλέον παράμετροι του δέντρου (π.χ. split_policy).
+        :return: Το νέο R*-Tree.
         """
-        if node.is_leaf:
-            return node
+        if method == 'str':
+            pack = cls._str_pack
+        elif method == 'hilbert':
+            pack = cls._hilbert_pack
+        else:
+            raise ValueError(f"Unknown bulk load method: {method}")
+
+        tree = cls(max_entries_per_node=max_entries_per_node, index_filename=index_filename, **kwargs)
+        entries = [
+            {'mbr': tuple(record['mbr']), 'block_id': record['block_id'], 'slot': record['slot']}
+            for record in records
+        ]
+        if not entries:
+            tree.save()
+            return tree
+        if tree.leaf_encoding != 'float64':
+            for entry in entries:
+                tree._check_encodable(entry['mbr'])
+
+        # Κατασκευή των φύλλων και στη συνέχεια των ανώτερων επιπέδων μέχρι να μείνει μία ρίζα
+        level = tree._build_level(pack(entries, tree.max_leaf_entries, tree.dims), is_leaf=True)
+        while len(level) > 1:
+            level = tree._build_level(pack(level, max_entries_per_node, tree.dims), is_leaf=False)
+            tree.height += 1
+        tree.root = level[0]
+
+        # Αποθήκευση όλων των κόμβων στις σελίδες του index file
+        tree.save()
+        tree._publish()
+        return tree
+
+    @classmethod
+    def open(cls, index_filename, concurrent=False, wal_filename=None):
+        """
+        Άνοιγμα ενός R*-Tree που έχει αποθηκευτεί σε index file, χωρίς ανακατασκευή.
+        Διαβάζεται μόνο η ρίζα, ενώ οι υπόλοιποι κόμβοι φορτώνονται όταν τους χρειαστεί κάποιο ερώτημα.
+        Αν δοθεί write-ahead log, ξαναεφαρμόζονται οι αλλαγές του μετά το τελευταίο checkpoint (recovery).
+        
+        :param index_filename: Το όνομα του index file.
+        :param concurrent: True για ταυτόχρονες αναγνώσεις με στιγμιότυπα (βλ. __init__).
+        :param wal_filename: Το όνομα του write-ahead log (βλ. __init__).
+        :return: Το R*-Tree.
+        """
+        index_file = IndexFile(index_filename, create=False)
+        tree = cls(max_entries_per_node=index_file.max_entries, index_filename=index_filename,
+                   split_policy=index_file.split_policy, index_file=index_file, concurrent=concurrent,
+                   wal_filename=wal_filename, dims=index_file.dims, metric=index_file.metric)
+        if index_file.root_page:
+            tree.root = index_file.read_node(index_file.root_page)
+            tree.height = index_file.height
+        # Αλλιώς το δέντρο δεν αποθηκεύτηκε ποτέ και μένει με κενή ρίζα
+        if tree.wal is not None:
+            tree._recover()
+        tree._publish()
+        return tree
+
+    def _recover(self):
+        """
+        Επανεφαρμογή των εισαγωγών και διαγραφών του write-ahead log με LSN μεγαλύτερο από το
+        checkpoint του index file. Οι αλλαγές δεν καταγράφονται ξανά, αφού βρίσκονται ήδη στο log.
+        """
+        replayed = 0
+        for _, record in self.wal.records(self.index_file.checkpoint_lsn):
+            if record['op'] == 'insert':
+                self._overflowed_levels = set()
+                self.insert_entry({'mbr': record['mbr'], 'block_id': record['block_id'], 'slot': record['slot']},
+                                  level=0)
+            elif record['op'] == 'delete':
+                found = self.find_entry(record['mbr'], record['block_id'], record['slot'])
+                if found is not None:
+                    self._remove(found)
+            replayed += 1
+        if replayed:
+            logger.info('Recovered %d operations from %s.', replayed, self.wal.filename)
+
+    def save(self):
+        """
+        Αποθήκευση του δέντρου στο index file (shadow paging): κάθε κόμβος που άλλαξε από την
+        προηγούμενη αποθήκευση γράφεται σε νέα σελίδα και στο τέλος ενημερώνεται η σελίδα 0 με τη
+        νέα ρίζα (βλ. IndexFile.checkpoint). Οι κόμβοι που δεν άλλαξαν μένουν ως έχουν.
+        Με write-ahead log η αποθήκευση είναι checkpoint: οι σελίδες γίνονται fsync μαζί με το LSN
+        της τελευταίας αλλαγής που περιέχουν και μόνο τότε το log αδειάζει, οπότε μια διακοπή κατά την
+        αποθήκευση αφήνει το παλιό δέντρο και το log του.
+        """
+        self._check_writable()
+        with self._write_lock:
+            if self.wal is not None:
+                self.wal.commit()
+                self.index_file.checkpoint_lsn = self.wal.last_lsn
+            saved_root = self.index_file.root_page
+            self._save_node(self.root)
+            self.index_file.checkpoint(self.root.page_id, self.height, self.split_policy,
+                                       durable=self.wal is not None)
+            if self.root.page_id != saved_root:
+                # Τα pools της worker_pool έχουν ανοίξει την προηγούμενη έκδοση
+                self._worker_pools.clear()
+            if self.wal is not None:
+                self.wal.checkpoint()
+
+    def commit(self):
+        """
+        Μόνιμη αποθήκευση στο write-ahead log όλων των αλλαγών μέχρι τώρα, χωρίς checkpoint.
+        Ανάμεσα στις commit το fsync του log γίνεται ομαδικά (βλ. WriteAheadLog).
+        """
+        if self.wal is not None:
+            self.wal.commit()
+
+    def _save_node(self, node):
+        """
+        Αποθήκευση ενός κόμβου που άλλαξε και των απογόνων του που άλλαξαν (πρώτα τα παιδιά,
+        ώστε να έχουν σελίδα πριν γραφτεί ο γονέας). Ένας κόμβος που έχει σελίδα δεν έχει αλλάξει
+        από τότε που γράφτηκε, ούτε κάποιος απόγονός του, αφού κάθε αλλαγή αφαιρεί τη σελίδα από όλη
+        τη διαδρομή της (βλ. _writable).
+        
+        :param node: Ο κόμβος.
+        """
+        if node.page_id is not None:
+            return
+        if not node.is_leaf:
+            for child in node.children:
+                if isinstance(child, Node):
+                    self._save_node(child)
+        node.page_id = self.index_file.allocate_page()
+        self.index_file.write_node(node)
+
+    def close(self):
+        """
+        Αποθήκευση του δέντρου και κλείσιμο του index file.
+        """
+        self._check_writable()
+        self.save()
+        self.index_file.close()
+        if self.wal is not None:
+            self.wal.close()
+
+    @classmethod
+    def bulk_load_datafile(cls, data_filename, **kwargs):
+        """
+        Μαζική κατασκευή του R*-Tree απευθείας από τα blocks ενός datafile.
         
-        # Αναζήτηση του καλύτερου υποκόμβου με βάση το MBR (ελάχιστη επέκταση)
-        best_child = None
-        best_increase = float('inf')
+        :param data_filename: Το όνομα του datafile.
+        :param kwargs: Παράμετροι που προωθούνται στη bulk_load.
+        :return: Το νέο R*-Tree.
+        """
+        from DataFile import iter_block_records
+        return cls.bulk_load(iter_block_records(data_filename), **kwargs)
 
-        for child in node.entries:
-            increase = self.mbr_increase(child['mbr'], entry['mbr'])
-            if increase < best_increase:
-                best_increase = increase
-                best_child = child
+    def _build_level(self, groups, is_leaf):
+        """
+        Δημιουργία ενός επιπέδου κόμβων από ομάδες εγγραφών (ή υποκόμβων).
+        
+        :param groups: Λίστα από ομάδες, μία για κάθε νέο κόμβο.
+        :param is_leaf: Εάν οι νέοι κόμβοι είναι φύλλα.
+        :return: Η λίστα με τους νέους κόμβους.
+        """
+        nodes = []
+        max_entries = self.max_leaf_entries if is_leaf else self.max_entries_per_node
+        for group in groups:
+            node = Node(is_leaf=is_leaf, max_entries=max_entries, dims=self.dims)
+            node.set_entries(group)
+            nodes.append(node)
+        return nodes
 
-        # Αναδρομή για να βρούμε τον κατάλληλο φύλλο
-        return self.choose_leaf(best_child, entry)
+    @staticmethod
+    def _str_pack(items, capacity, dims=2, axis=0):
+        """
+        Ομαδοποίηση με Sort-Tile-Recursive: ταξινόμηση κατά x σε κάθετες λωρίδες
+        και ταξινόμηση κάθε λωρίδας κατά y πριν τη διάσπαση σε κόμβους.
+        Σε d διαστάσεις κάθε λωρίδα χωρίζεται αναδρομικά με τον ίδιο τρόπο στις επόμενες διαστάσεις.
+        
+        :param items: Οι εγγραφές (ή υποκόμβοι) προς ομαδοποίηση.
+        :param capacity: Πλήθος εγγραφών ανά κόμβο.
+        :param dims: Ο αριθμός των διαστάσεων.
+        :param axis: Η διάσταση της ταξινόμησης σε αυτό το βήμα της αναδρομής.
+        :return: Λίστα από ομάδες εγγραφών.
+        """
+        items = sorted(items, key=lambda item: item['mbr'][axis] + item['mbr'][axis + dims])
+        remaining = dims - axis
+        if remaining == 1:
+            return [items[i:i + capacity] for i in range(0, len(items), capacity)]
+
+        # Πλήθος λωρίδων ανά διάσταση: η ακέραια (προς τα πάνω) ρίζα τάξης remaining του πλήθους των κόμβων
+        node_count = math.ceil(len(items) / capacity)
+        slice_count = max(1, round(node_count ** (1 / remaining)))
+        while slice_count ** remaining < node_count:
+            slice_count += 1
+        slice_size = slice_count ** (remaining - 1) * capacity
+
+        groups = []
+        for start in range(0, len(items), slice_size):
+            groups.extend(RStarTree._str_pack(items[start:start + slice_size], capacity, dims, axis + 1))
+        return groups
+
+    @staticmethod
+    def _hilbert_pack(items, capacity, dims=2, order=16):
+        """
+        Ομαδοποίηση με βάση τη θέση του κέντρου κάθε MBR πάνω σε καμπύλη Hilbert.
+        Σε περισσότερες από δύο διαστάσεις η καμπύλη χρησιμοποιεί τις δύο πρώτες.
+        
+        :param items: Οι εγγραφές (ή υποκόμβοι) προς ομαδοποίηση.
+        :param capacity: Πλήθος εγγραφών ανά κόμβο.
+        :param dims: Ο αριθμός των διαστάσεων.
+        :param order: Τάξη της καμπύλης (πλέγμα 2^order x 2^order).
+        :return: Λίστα από ομάδες εγγραφών.
+        """
+        centers = [((item['mbr'][0] + item['mbr'][dims]) / 2, (item['mbr'][1] + item['mbr'][dims + 1]) / 2)
+                   for item in items]
+        ordered = [items[i] for i in _hilbert_order(centers, order)]
+        return [ordered[i:i + capacity] for i in range(0, len(ordered), capacity)]
+
+    def choose_subtree(self, entry, level):
+        """
+        Επιλογή του κόμβου του δοσμένου επιπέδου όπου θα γίνει η εισαγωγή της εγγραφής.
+        
+        :param entry: Η εγγραφή (ή ο υποκόμβος) προς εισαγωγή.
+        :param level: Το επίπεδο του κόμβου-στόχου (0 για τα φύλλα).
+        :return: Η διαδρομή από τη ρίζα μέχρι τον κόμβο όπου θα γίνει η εισαγωγή.
+        """
+        node = self.root
+        path = [node]
+        node_level = self.height - 1
+        while node_level > level:
+            # Στο R*-Tree, όταν τα παιδιά είναι φύλλα, ελαχιστοποιούμε την αύξηση της επικάλυψης
+            if self.split_policy == 'rstar' and node_level == 1:
+                node = self.least_overlap_child(node, entry['mbr'])
+            else:
+                node = self.least_enlargement_child(node, entry['mbr'])
+            path.append(node)
+            node_level -= 1
+        if self.counters_enabled:
+            self.node_visits += len(path)
+        return path
+
+    def least_enlargement_child(self, node, mbr):
+        """
+        Επιστρέφει το παιδί που χρειάζεται την ελάχιστη επέκταση εμβαδού για να περιέχει το MBR
+        (σε ισοπαλία, αυτό με το μικρότερο εμβαδόν).
+        
+        :param node: Ο εσωτερικός κόμβος.
+        :param mbr: Το MBR της νέας εγγραφής.
+        :return: Το επιλεγμένο παιδί.
+        """
+        increases = enlargements(node.coords, mbr, self.dims)
+        child_areas = areas(node.coords, self.dims)
+        best_index = min(range(len(increases)), key=lambda i: (increases[i], child_areas[i]))
+        return node.child(best_index)
+
+    def least_overlap_child(self, node, mbr, candidates=32):
+        """
+        Επιστρέφει το παιδί με την ελάχιστη αύξηση επικάλυψης με τα αδέλφια του (R* ChooseSubtree).
+        Για μεγάλους κόμβους εξετάζονται μόνο τα παιδιά με τη μικρότερη επέκταση εμβαδού.
+        
+        :param node: Ο εσωτερικός κόμβος με παιδιά φύλλα.
+        :param mbr: Το MBR της νέας εγγραφής.
+        :param candidates: Μέγιστος αριθμός παιδιών για τον υπολογισμό της επικάλυψης.
+        :return: Το επιλεγμένο παιδί.
+        """
+        coords = node.coords
+        dims = self.dims
+        child_areas = areas(coords, dims)
+
+        # Αν το MBR χωράει ήδη σε κάποιο παιδί, η επικάλυψη δεν αλλάζει: επιλέγουμε το μικρότερο τέτοιο παιδί
+        inside = containing(coords, mbr, dims)
+        if inside:
+            return node.child(min(inside, key=child_areas.__getitem__))
+
+        increases = enlargements(coords, mbr, dims)
+        ranked = sorted(zip(increases, child_areas, range(len(increases))))[:candidates]
+
+        best_index = 0
+        best_key = None
+
+        for increase, area, index in ranked:
+            child_mbr = node.entry_mbr(index)
+            # Η τομή του παιδιού με τον εαυτό του είναι ίση με το εμβαδόν του και στα δύο αθροίσματα,
+            # οπότε η διαφορά δίνει ακριβώς την αύξηση επικάλυψης με τα αδέλφια
+            overlap_increase = (overlap_sum(coords, mbr_union(child_mbr, mbr), dims) -
+                                overlap_sum(coords, child_mbr, dims))
+            key = (overlap_increase, increase, area)
+            if best_key is None or key < best_key:
+                best_key = key
+                best_index = index
+
+        return node.child(best_index)
 
     def mbr_increase(self, mbr1, mbr2):
         """
@@ -74,60 +564,97 @@ class RStarTree:
         :param mbr2: Το MBR της νέας εγγραφής.
         :return: Το ποσό της επέκτασης του MBR.
         """
-        min_x1, min_y1, max_x1, max_y1 = mbr1
-        min_x2, min_y2, max_x2, max_y2 = mbr2
+        return mbr_area(mbr_union(mbr1, mbr2)) - mbr_area(mbr1)
+
+    def overflow_treatment(self, path, level):
+        """
+        Χειρισμός κόμβου που υπερχείλισε: στην πρώτη υπερχείλιση κάθε επιπέδου (εκτός της ρίζας)
+        γίνεται επανεισαγωγή (forced reinsert), αλλιώς διαχωρισμός.
+        
+        :param path: Η διαδρομή από τη ρίζα μέχρι τον κόμβο που υπερχείλισε.
+        :param level: Το επίπεδο του κόμβου.
+        """
+        node = path[-1]
+        if self.split_policy == 'rstar' and node is not self.root and level not in self._overflowed_levels:
+            self._overflowed_levels.add(level)
+            self.reinsert(path, level)
+        else:
+            self.split_and_adjust_tree(path, level)
+
+    def reinsert(self, path, level):
+        """
+        Επανεισαγωγή των εγγραφών που απέχουν περισσότερο από το κέντρο του κόμβου.
         
-        new_min_x = min(min_x1, min_x2)
-        new_min_y = min(min_y1, min_y2)
-        new_max_x = max(max_x1, max_x2)
-        new_max_y = max(max_y1, max_y2)
+        :param path: Η διαδρομή από τη ρίζα μέχρι τον κόμβο που υπερχείλισε.
+        :param level: Το επίπεδο του κόμβου.
+        """
+        node = path[-1]
+        self.reinserts += 1
+        center = mbr_center(node.mbr)
+
+        def distance_from_center(i):
+            return sum((a - b) ** 2 for a, b in zip(mbr_center(node.entry_mbr(i)), center))
 
-        old_area = (max_x1 - min_x1) * (max_y1 - min_y1)
-        new_area = (new_max_x - new_min_x) * (new_max_y - new_min_y)
+        ordered = sorted(range(len(node)), key=distance_from_center)
+        farthest = ordered[-max(1, int(round(node.max_entries * self.reinsert_fraction))):]
+        removed = [node.entry(i) for i in farthest]
+        for i in sorted(farthest, reverse=True):
+            node.remove_entry_at(i)
+        node.update_mbr()
+        self.adjust_ancestors(path)
 
-        return new_area - old_area
+        # Close reinsert: ξεκινάμε από την εγγραφή που είναι πιο κοντά στο κέντρο
+        for entry in removed:
+            self.insert_entry(entry, level)
 
-    def split_and_adjust_tree(self, node):
+    def split_and_adjust_tree(self, path, level=0):
         """
-        Διαχωρισμός ενός κόμβου που έχει γεμίσει και προσαρμογή του δέντρου.
+        Διαχωρισμός ενός κόμβου που έχει γεμίσει και προσαρμογή του δέντρου
+        κατά μήκος της διαδρομής προς τη ρίζα.
         
-        :param node: Ο κόμβος προς διαχωρισμό.
+        :param path: Η διαδρομή από τη ρίζα μέχρι τον κόμβο προς διαχωρισμό.
+        :param level: Το επίπεδο του κόμβου.
         """
-        new_node1, new_node2 = node.split()
+        node = path[-1]
+        self.splits += 1
+        new_node1, new_node2 = node.split(self.split_policy, self._min_entries(node))
+        self._own(new_node1, new_node2)
+        if node.is_leaf and self.locator is not None:
+            self._register_leaf(new_node1)
+            self._register_leaf(new_node2)
 
         # Αν είναι η ρίζα που πρέπει να διαχωριστεί, δημιουργούμε νέα ρίζα
-        if node == self.root:
-            self.root = Node(is_leaf=False, max_entries=self.max_entries_per_node)
+        if node is self.root:
+            self.root = Node(is_leaf=False, max_entries=self.max_entries_per_node, dims=self.dims)
+            self._own(self.root)
             self.root.add_entry(new_node1)
             self.root.add_entry(new_node2)
+            self.height += 1
         else:
-            parent_node = self.find_parent(self.root, node)
+            parent_path = path[:-1]
+            parent_node = parent_path[-1]
+            parent_node.remove_entry_at(parent_node.index_of_child(node))
             parent_node.add_entry(new_node1)
             parent_node.add_entry(new_node2)
+            self.adjust_ancestors(parent_path)
 
-            if parent_node.is_full():
-                self.split_and_adjust_tree(parent_node)
+            if parent_node.is_overflowing():
+                self.overflow_treatment(parent_path, level + 1)
 
-    def find_parent(self, current_node, target_node):
+    def adjust_ancestors(self, path):
         """
-        Αναζήτηση του γονέα ενός κόμβου.
+        Ενημέρωση των MBR των προγόνων του τελευταίου κόμβου της διαδρομής (AdjustTree),
+        μαζί με τα πλήθη και τα αθροίσματα των υποδέντρων τους, που αλλάζουν σε κάθε εισαγωγή.
         
-        :param current_node: Ο τρέχων κόμβος που εξετάζεται.
-        :param target_node: Ο κόμβος για τον οποίο αναζητείται ο γονέας.
-        :return: Ο γονέας του target_node.
+        :param path: Η διαδρομή από τη ρίζα μέχρι τον κόμβο που άλλαξε.
         """
-        if current_node.is_leaf:
-            return None
-
-        for entry in current_node.entries:
-            if entry == target_node:
-                return current_node
-            parent = self.find_parent(entry, target_node)
-            if parent:
-                return parent
-        
-        return None
+        for depth in range(len(path) - 1, 0, -1):
+            child = path[depth]
+            parent = path[depth - 1]
+            if parent.refresh_entry(parent.index_of_child(child)):
+                parent.update_mbr()
 
+    @instrumented('search')
     def range_query(self, mbr):
         """
         Ερώτημα περιοχής (range query) στο δέντρο.
@@ -135,6 +662,8 @@ class RStarTree:
         :param mbr: Το MBR της περιοχής που εξετάζεται.
         :return: Μια λίστα με τις εγγραφές που βρίσκονται εντός της περιοχής.
         """
+        if self.query_cache is not None:
+            return self._cached_range(tuple(mbr))
         return self.search(self.root, mbr)
 
     def search(self, node, mbr):
@@ -145,16 +674,189 @@ class RStarTree:
         :param mbr: Η περιοχή αναζήτησης.
         :return: Οι εγγραφές που βρίσκονται εντός της περιοχής.
         """
-        results = []
+        return list(self._range_iter(node, tuple(mbr)))
+
+    @instrumented('search')
+    def range_iter(self, mbr, limit=None):
+        """
+        Ερώτημα περιοχής ως generator: οι εγγραφές επιστρέφονται μόλις βρεθούν, οπότε ο καλών
+        μπορεί να σταματήσει νωρίς χωρίς να διασχιστεί το υπόλοιπο δέντρο.
+        
+        :param mbr: Το MBR της περιοχής που εξετάζεται.
+        :param limit: Μέγιστος αριθμός εγγραφών (None για όλες).
+        :return: Generator με τις εγγραφές που βρίσκονται εντός της περιοχής.
+        """
+        if limit is not None and limit <= 0:
+            return
+        mbr = tuple(mbr)
+        if self.query_cache is not None:
+            # Με όριο η αναζήτηση δεν ολοκληρώνεται, οπότε χρησιμοποιείται μόνο ένα αποτέλεσμα που υπάρχει ήδη
+            cached = self._cached_range(mbr, fill=limit is None)
+            if cached is not None:
+                yield from cached[:limit]
+                return
+        count = 0
+        for entry in self._range_iter(self.root, mbr):
+            yield entry
+            count += 1
+            if count == limit:
+                return
+
+    def _cached_range(self, mbr, fill=True):
+        """
+        Ερώτημα περιοχής μέσω της query_cache: εκτελείται (ή βρίσκεται στη μνήμη) το κβαντισμένο
+        παράθυρο και κρατιούνται οι εγγραφές που τέμνουν το παράθυρο του ερωτήματος.
+
+        :param mbr: Το MBR της περιοχής.
+        :param fill: False για να μην εκτελεστεί το ερώτημα αν δεν βρεθεί στη μνήμη.
+        :return: Λίστα με (αντίγραφα των) εγγραφών, ή None αν δεν βρέθηκε και fill είναι False.
+        """
+        cache = self.query_cache
+        key, window = cache.range_key(mbr)
+        if key is None:
+            return list(self._range_iter(self.root, mbr)) if fill else None
+        version = self._version
+        result = cache.get(key, version)
+        if result is None:
+            if not fill:
+                return None
+            result = list(self._range_iter(self.root, window))
+            cache.put(key, result, window, version)
+        if window == mbr:
+            return [dict(entry) for entry in result]
+        dims = self.dims
+        axes = range(dims)
+        return [
+            dict(entry) for entry in result
+            if all(entry['mbr'][d] <= mbr[dims + d] and entry['mbr'][dims + d] >= mbr[d] for d in axes)
+        ]
+
+    def _range_iter(self, node, mbr):
+        """
+        Επαναληπτική (με ρητή στοίβα) αναζήτηση περιοχής από έναν κόμβο. Οι υποκόμβοι που
+        περιέχονται ολόκληροι στην περιοχή σημειώνονται στη στοίβα και όλες οι εγγραφές του
+        υποδέντρου τους επιστρέφονται χωρίς άλλους ελέγχους επικάλυψης.
+        """
+        # Στοιχεία της στοίβας: (κόμβος, αν περιέχεται ολόκληρος στην περιοχή)
+        dims = self.dims
+        counting = self.counters_enabled
+        stack = [(node, False)]
+        while stack:
+            node, inside = stack.pop()
+            if counting:
+                self.node_visits += 1
+
+            if inside:
+                indices = range(len(node))
+            else:
+                indices = intersecting(node.coords, mbr, dims)
+
+            if node.is_leaf:
+                if counting and not inside:
+                    self.entries_tested += len(node)
+                for i in indices:
+                    yield node.entry(i)
+                continue
+
+            contained = set(range(len(node)) if inside else within(node.coords, mbr, dims))
+            # Οι υποκόμβοι μπαίνουν στη στοίβα με αντίστροφη σειρά ώστε να εξετάζονται με τη σειρά τους
+            for i in reversed(indices):
+                stack.append((node.child(i), i in contained))
+
+    def range_count(self, mbr):
+        """
+        Το πλήθος των εγγραφών που τέμνουν την περιοχή, χωρίς να δημιουργούνται οι εγγραφές.
+        Για κάθε υποκόμβο που περιέχεται ολόκληρος στην περιοχή χρησιμοποιείται το αποθηκευμένο
+        πλήθος του υποδέντρου του και η αναζήτηση δεν κατεβαίνει σε αυτόν.
+        
+        :param mbr: Το MBR της περιοχής.
+        :return: Το πλήθος των εγγραφών.
+        """
+        return self.range_aggregate(mbr, 'count')
+
+    @instrumented('aggregate')
+    def range_aggregate(self, mbr, fn):
+        """
+        Συνάθροιση πάνω στις εγγραφές που τέμνουν την περιοχή. Όπως στη range_count,
+        οι υποκόμβοι που περιέχονται ολόκληροι στην περιοχή δίνουν απευθείας το αποτέλεσμά τους
+        από το πλήθος, τα αθροίσματα και το MBR που κρατά ο γονέας τους.
         
-        for entry in node.entries:
-            if self.overlap(entry['mbr'], mbr):
+        :param mbr: Το MBR της περιοχής.
+        :param fn: 'count' (πλήθος), 'sum' ή 'mean' (άθροισμα ή μέσος όρος των κέντρων των εγγραφών, ως (x, y, ...)),
+                   'min' ή 'max' (ελάχιστες ή μέγιστες συντεταγμένες των εγγραφών, ως (x, y, ...)).
+        :return: Το αποτέλεσμα της συνάθροισης (None για 'mean', 'min' και 'max' αν δεν υπάρχουν εγγραφές).
+        """
+        if fn not in ('count', 'sum', 'mean', 'min', 'max'):
+            raise ValueError(f"Unknown aggregate: {fn}")
+
+        mbr = tuple(mbr)
+        dims = self.dims
+        axes = range(dims)
+        inf = float('inf')
+        # Συσσωρευτές: πλήθος και, ανά διάσταση, άθροισμα κέντρων, ελάχιστη και μέγιστη συντεταγμένη.
+        # Ενημερώνονται μόνο όσοι χρειάζονται για τη συνάθροιση που ζητήθηκε.
+        need_sums = fn in ('sum', 'mean')
+        need_box = fn in ('min', 'max')
+        count = 0
+        sums = [0.0] * dims
+        lows = [inf] * dims
+        highs = [-inf] * dims
+
+        def add_box(box):
+            for d in axes:
+                lows[d] = min(lows[d], box[d])
+                highs[d] = max(highs[d], box[dims + d])
+
+        root = self.root
+        if len(root) and all(mbr[d] <= root.mbr[d] and root.mbr[dims + d] <= mbr[dims + d] for d in axes):
+            count = root.subtree_count
+            sums = list(root.subtree_sums)
+            add_box(root.mbr)
+        elif len(root):
+            counting = self.counters_enabled
+            stack = [root]
+            while stack:
+                node = stack.pop()
+                if counting:
+                    self.node_visits += 1
                 if node.is_leaf:
-                    results.append(entry)
-                else:
-                    results.extend(self.search(entry, mbr))
+                    if counting:
+                        self.entries_tested += len(node)
+                    hits = intersecting(node.coords, mbr, dims)
+                    count += len(hits)
+                    if need_sums or need_box:
+                        for i in hits:
+                            box = node.entry_mbr(i)
+                            if need_sums:
+                                for d in axes:
+                                    sums[d] += (box[d] + box[dims + d]) / 2
+                            if need_box:
+                                add_box(box)
+                    continue
 
-        return results
+                inside = set(within(node.coords, mbr, dims))
+                for i in intersecting(node.coords, mbr, dims):
+                    if i in inside:
+                        count += node.counts[i]
+                        if need_sums:
+                            for d in axes:
+                                sums[d] += node.sums[i * dims + d]
+                        if need_box:
+                            add_box(node.entry_mbr(i))
+                    else:
+                        stack.append(node.child(i))
+
+        if fn == 'count':
+            return count
+        if fn == 'sum':
+            return tuple(sums)
+        if not count:
+            return None
+        if fn == 'mean':
+            return tuple(total / count for total in sums)
+        if fn == 'min':
+            return tuple(lows)
+        return tuple(highs)
 
     def overlap(self, mbr1, mbr2):
         """
@@ -164,51 +866,341 @@ class RStarTree:
         :param mbr2: Το δεύτερο MBR.
         :return: True αν επικαλύπτονται, False αλλιώς.
         """
-        min_x1, min_y1, max_x1, max_y1 = mbr1
-        min_x2, min_y2, max_x2, max_y2 = mbr2
-        
-        return not (max_x1 < min_x2 or max_x2 < min_x1 or max_y1 < min_y2 or max_y2 < min_y1)
+        dims = self.dims
+        return all(mbr1[d] <= mbr2[dims + d] and mbr2[d] <= mbr1[dims + d] for d in range(dims))
 
+    @instrumented('knn')
     def k_nearest_neighbors(self, query_point, k=1):
         """
-        Ερώτημα k-NN για την εύρεση των k πλησιέστερων γειτόνων.
+        Ερώτημα k-NN για την εύρεση των k πλησιέστερων γειτόνων (best-first αναζήτηση).
         
         :param query_point: Το σημείο για το οποίο γίνεται η αναζήτηση των γειτόνων.
         :param k: Ο αριθμός των πλησιέστερων γειτόνων που ζητούνται.
-        :return: Λίστα με τους k πλησιέστερους γείτονες.
+        :return: Λίστα με τους k πλησιέστερους γείτονες, ταξινομημένους κατά απόσταση.
         """
         knn_result = []
-        priority_queue = []
-        heapq.heappush(priority_queue, (0, self.root))  # Προσθήκη της ρίζας με απόσταση 0
+        if k <= 0:
+            return knn_result
+
+        cache = self.query_cache
+        if cache is not None:
+            key = cache.knn_key(query_point, k)
+            version = self._version
+            cached = cache.get(key, version)
+            if cached is not None:
+                return [dict(entry) for entry in cached]
 
-        while priority_queue and len(knn_result) < k:
-            distance, node = heapq.heappop(priority_queue)
+        for distance, entry in self._best_first(query_point, k):
+            knn_result.append(entry)
+            if len(knn_result) == k:
+                break
 
+        if cache is not None:
+            cache.put(key, [dict(entry) for entry in knn_result], self._knn_window(query_point, k, knn_result),
+                      version)
+        return knn_result
+
+    def _knn_window(self, query_point, k, result):
+        """
+        Το παράθυρο ακύρωσης ενός αποτελέσματος k-NN: το MBR της σφαίρας γύρω από το σημείο με ακτίνα
+        την απόσταση του k-οστού γείτονα. Μόνο μια αλλαγή μέσα σε αυτό μπορεί να αλλάξει το αποτέλεσμα.
+        Αν βρέθηκαν λιγότεροι από k γείτονες, κάθε εισαγωγή αλλάζει το αποτέλεσμα.
+        """
+        dims = self.dims
+        if len(result) < k:
+            return (-math.inf,) * dims + (math.inf,) * dims
+        # Μικρό περιθώριο ώστε μια εγγραφή ακριβώς πάνω στη σφαίρα να μη χαθεί από σφάλματα στρογγυλοποίησης
+        radius = self.distance(query_point, result[-1]['mbr']) * (1 + 1e-9) + 1e-12
+        if self.metric == 'haversine':
+            return geodesic_bounding_box(tuple(query_point), radius)
+        return tuple(value - radius for value in query_point) + tuple(value + radius for value in query_point)
+
+    @instrumented('nearest')
+    def nearest_iter(self, query_point):
+        """
+        Σταδιακή (incremental) αναζήτηση πλησιέστερων γειτόνων: generator που επιστρέφει
+        τις εγγραφές σε αύξουσα σειρά απόστασης, ώστε ο καλών να μπορεί να σταματήσει
+        οποτεδήποτε ή να φιλτράρει τα αποτελέσματα χωρίς νέα αναζήτηση.
+        
+        :param query_point: Το σημείο για το οποίο γίνεται η αναζήτηση των γειτόνων.
+        :return: Generator από ζεύγη (απόσταση, εγγραφή).
+        """
+        return self._best_first(query_point)
+
+    def _best_first(self, query_point, k=None):
+        """
+        Best-first διάσχιση (Hjaltason-Samet) με ουρά προτεραιότητας κατά MINDIST.
+        Όταν δίνεται το k, οι κόμβοι κλαδεύονται με βάση ένα άνω φράγμα της απόστασης
+        του k-οστού γείτονα, που προκύπτει από τις αποστάσεις των εγγραφών που έχουν βρεθεί
+        και από το MINMAXDIST των παιδιών κάθε κόμβου.
+        
+        :param query_point: Το σημείο της αναζήτησης.
+        :param k: Ο αριθμός των γειτόνων για το κλάδεμα (None για χωρίς κλάδεμα).
+        :return: Generator από ζεύγη (απόσταση, εγγραφή) σε αύξουσα σειρά απόστασης.
+        """
+        if not len(self.root):
+            return
+
+        # Στοιχεία της ουράς: (απόσταση, μετρητής, κόμβος, θέση εγγραφής ή -1 για ολόκληρο κόμβο).
+        # Για τους εσωτερικούς κόμβους η θέση δείχνει υποκόμβο, που φορτώνεται μόνο όταν βγει από την ουρά.
+        # Ο μετρητής σπάει τις ισοπαλίες ώστε να μη συγκρίνονται ποτέ κόμβοι μεταξύ τους.
+        counter = 0
+        priority_queue = [(0.0, counter, self.root, -1)]
+        bound = float('inf')
+        candidate_distances = []  # Max-heap (με αρνητικές τιμές) με τις k μικρότερες αποστάσεις εγγραφών
+        dims = self.dims
+        # Με τη μετρική haversine η MINDIST είναι η γεωδαισιακή απόσταση από το πλησιέστερο σημείο κάθε MBR,
+        # που παραμένει κάτω φράγμα. Το MINMAXDIST δεν έχει γεωδαισιακή εκδοχή εδώ, οπότε το κλάδεμα
+        # στηρίζεται μόνο στις αποστάσεις των εγγραφών που έχουν βρεθεί.
+        geodesic = self.metric == 'haversine'
+        counting = self.counters_enabled
+
+        while priority_queue:
+            distance, _, node, index = heapq.heappop(priority_queue)
+            if distance > bound:
+                break
+
+            if index >= 0:
+                if node.is_leaf:
+                    yield distance, node.entry(index)
+                    continue
+                node = node.child(index)
+
+            if counting:
+                self.node_visits += 1
             if node.is_leaf:
-                for entry in node.entries:
-                    dist = self.distance(query_point, entry['mbr'])
-                    heapq.heappush(priority_queue, (dist, entry))
+                if counting:
+                    self.entries_tested += len(node)
+                if geodesic:
+                    candidates = enumerate(geodesic_min_distances(node.coords, query_point))
+                elif k is None:
+                    candidates = enumerate(min_distances(node.coords, query_point, dims))
+                else:
+                    # Μόνο οι k πλησιέστερες εγγραφές ενός φύλλου μπορούν να ανήκουν στο αποτέλεσμα
+                    candidates = nearest_entries(node.coords, query_point, k, dims)
+                for i, dist in candidates:
+                    if dist > bound:
+                        continue
+                    if k is not None:
+                        if len(candidate_distances) < k:
+                            heapq.heappush(candidate_distances, -dist)
+                        elif dist < -candidate_distances[0]:
+                            heapq.heapreplace(candidate_distances, -dist)
+                        if len(candidate_distances) == k:
+                            bound = min(bound, -candidate_distances[0])
+                    counter += 1
+                    heapq.heappush(priority_queue, (dist, counter, node, i))
             else:
-                for child in node.entries:
-                    dist = self.distance_to_mbr(query_point, child['mbr'])
-                    heapq.heappush(priority_queue, (dist, child))
+                if geodesic:
+                    distances = geodesic_min_distances(node.coords, query_point)
+                else:
+                    if k is not None and len(candidate_distances) < k and len(node) >= k:
+                        # Κάθε παιδί περιέχει τουλάχιστον μία εγγραφή σε απόσταση <= MINMAXDIST.
+                        # Χρειάζεται μόνο πριν βρεθούν k εγγραφές, αφού μετά το φράγμα τους είναι ακριβέστερο.
+                        minmax = sorted(minmax_distances(node.coords, query_point, dims))
+                        bound = min(bound, minmax[k - 1])
+                    distances = min_distances(node.coords, query_point, dims)
+                for i, dist in enumerate(distances):
+                    if dist > bound:
+                        continue
+                    counter += 1
+                    heapq.heappush(priority_queue, (dist, counter, node, i))
+
+    def range_query_batch(self, mbrs, group_size=256, processes=None, executor=None):
+        """
+        Εκτέλεση πολλών ερωτημάτων περιοχής μαζί. Τα ερωτήματα ταξινομούνται κατά τη θέση τους
+        σε καμπύλη Hilbert και χωρίζονται σε ομάδες γειτονικών ερωτημάτων. Κάθε ομάδα διασχίζει
+        το δέντρο μία φορά, ελέγχοντας κάθε κόμβο για όλα τα ενεργά ερωτήματα μαζί.
+
+        Στην παράλληλη εκτέλεση (processes ή executor) οι διεργασίες ανοίγουν το δέντρο από το index file,
+        οπότε το δέντρο πρέπει να είναι αποθηκευμένο: με αλλαγές μετά την τελευταία save (ή σε στιγμιότυπο
+        παλαιότερης έκδοσης) προκύπτει ValueError, αντί να αποθηκευτεί σιωπηρά.
         
+        :param mbrs: Τα MBR των ερωτημάτων.
+        :param group_size: Μέγιστος αριθμός ερωτημάτων ανά ομάδα.
+        :param processes: Αριθμός διεργασιών ενός process pool που δημιουργείται για αυτή την κλήση
+                          (None για εκτέλεση εδώ).
+        :param executor: Ένα pool της worker_pool, για πολλές κλήσεις χωρίς νέες διεργασίες κάθε φορά.
+        :return: Λίστα με τα αποτελέσματα κάθε ερωτήματος, με τη σειρά των ερωτημάτων.
+        """
+        mbrs = [tuple(mbr) for mbr in mbrs]
+        dims = self.dims
+        centers = [((mbr[0] + mbr[dims]) / 2, (mbr[1] + mbr[dims + 1]) / 2) for mbr in mbrs]
+        return self._run_batch(mbrs, centers, group_size, processes, executor, self._range_group,
+                               _worker_range_group)
+
+    def knn_batch(self, points, k=1, group_size=8, processes=None, executor=None):
+        """
+        Εκτέλεση πολλών ερωτημάτων k-NN μαζί. Όπως στη range_query_batch, τα σημεία χωρίζονται
+        σε ομάδες γειτονικών σημείων και κάθε ομάδα διασχίζει το δέντρο μία φορά (depth-first),
+        με ένα άνω φράγμα για κάθε σημείο από τους γείτονες που έχουν βρεθεί ως τότε.
+        Με τη μετρική haversine κάθε σημείο εξετάζεται χωριστά με την k_nearest_neighbors.
+        Η παράλληλη εκτέλεση απαιτεί αποθηκευμένο δέντρο, όπως στη range_query_batch.
+        
+        :param points: Τα σημεία των ερωτημάτων.
+        :param k: Ο αριθμός των γειτόνων ανά σημείο.
+        :param group_size: Μέγιστος αριθμός ερωτημάτων ανά ομάδα.
+        :param processes: Αριθμός διεργασιών ενός process pool για αυτή την κλήση (None για εκτέλεση εδώ).
+        :param executor: Ένα pool της worker_pool, για πολλές κλήσεις χωρίς νέες διεργασίες κάθε φορά.
+        :return: Λίστα με τους γείτονες κάθε σημείου (ταξινομημένους κατά απόσταση), με τη σειρά των σημείων.
+        """
+        points = [tuple(point) for point in points]
+        if k <= 0:
+            return [[] for _ in points]
+        if self.metric == 'haversine':
+            return [self.k_nearest_neighbors(point, k) for point in points]
+        return self._run_batch(points, [point[:2] for point in points], group_size, processes, executor,
+                               lambda group: self._knn_group(group, k), partial(_worker_knn_group, k=k))
+
+    def worker_pool(self, processes=None):
+        """
+        Process pool για τα ερωτήματα παρτίδας (executor της range_query_batch και της knn_batch), του
+        οποίου κάθε διεργασία ανοίγει μία φορά το δέντρο όπως είναι αποθηκευμένο τώρα. Ο καλών κλείνει
+        το pool (π.χ. με with). Μετά από μια save που αλλάζει το δέντρο το παλιό pool βλέπει την προηγούμενη
+        έκδοση, οπότε τα ερωτήματα παρτίδας το απορρίπτουν (ValueError) και χρειάζεται νέο.
+
+        :param processes: Ο αριθμός των διεργασιών (προεπιλογή ο αριθμός των πυρήνων).
+        :return: Ένα ProcessPoolExecutor.
+        """
+        self._check_saved()
+        pool = ProcessPoolExecutor(max_workers=processes, initializer=_open_worker_tree,
+                                   initargs=(self.index_file.filename,))
+        self._worker_pools.add(pool)
+        return pool
+
+    def _check_saved(self):
+        """
+        Έλεγχος ότι η ρίζα του δέντρου είναι αυτή που βρίσκεται στη σελίδα 0 του index file,
+        δηλαδή ότι ένα δέντρο που ανοίγεται από το αρχείο βλέπει την ίδια έκδοση.
+        """
+        if self.root.page_id is None or self.root.page_id != self.index_file.root_page:
+            raise ValueError("Parallel batch queries need a tree without unsaved changes; call save() first")
+
+    def _run_batch(self, queries, centers, group_size, processes, executor, run_group, worker_group):
+        """
+        Χωρισμός των ερωτημάτων σε ομάδες κατά Hilbert και εκτέλεσή τους, εδώ ή σε process pool.
+        """
+        if not queries:
+            return []
+        order = _hilbert_order(centers)
+        groups = [order[i:i + group_size] for i in range(0, len(order), group_size)]
+        query_groups = [[queries[q] for q in group] for group in groups]
+
+        if executor is not None or processes:
+            self._check_saved()
+            if executor is not None:
+                if executor not in self._worker_pools:
+                    raise ValueError("The executor was not created by worker_pool() for the current save")
+                group_results = list(executor.map(worker_group, query_groups))
+            else:
+                with self.worker_pool(processes) as pool:
+                    group_results = list(pool.map(worker_group, query_groups))
+        else:
+            group_results = [run_group(group) for group in query_groups]
+
+        results = [None] * len(queries)
+        for group, group_result in zip(groups, group_results):
+            for q, result in zip(group, group_result):
+                results[q] = result
+        return results
+
+    def _range_group(self, mbrs):
+        """
+        Μία διάσχιση του δέντρου για μια ομάδα ερωτημάτων περιοχής. Σε κάθε κόμβο ελέγχονται μαζί
+        όλα τα ερωτήματα που έφτασαν σε αυτόν και κάθε παιδί επισκέπτεται μία φορά, με όσα από αυτά το τέμνουν.
+        """
+        results = [[] for _ in mbrs]
+        stack = [(self.root, list(range(len(mbrs))))]
+        while stack:
+            node, live = stack.pop()
+            if self.counters_enabled:
+                self.node_visits += 1
+            pairs = intersecting_pairs(node.coords, [mbrs[q] for q in live], self.dims)
+            if node.is_leaf:
+                for q, i in pairs:
+                    results[live[q]].append(node.entry(i))
+            else:
+                children = {}
+                for q, i in pairs:
+                    children.setdefault(i, []).append(live[q])
+                for i, child_live in children.items():
+                    stack.append((node.child(i), child_live))
+        return results
+
+    def _knn_group(self, points, k):
+        """
+        Μία depth-first διάσχιση του δέντρου για μια ομάδα ερωτημάτων k-NN. Κάθε σημείο κρατά
+        τους k καλύτερους υποψηφίους του και ένα παιδί εξετάζεται μόνο για τα σημεία
+        των οποίων το φράγμα δεν είναι μικρότερο από την MINDIST του παιδιού.
+        """
+        candidates = [[] for _ in points]  # Max-heap (με αρνητικές αποστάσεις) ανά σημείο
+        bounds = [float('inf')] * len(points)
+        counter = 0
+
+        def visit(node, live):
+            nonlocal counter
+            if self.counters_enabled:
+                self.node_visits += 1
+            distances = min_distance_matrix(node.coords, [points[q] for q in live], self.dims)
             if node.is_leaf:
-                knn_result.append(node.entries)
+                for q, row in zip(live, distances):
+                    heap = candidates[q]
+                    bound = bounds[q]
+                    for i, dist in enumerate(row):
+                        if dist > bound:
+                            continue
+                        counter += 1
+                        if len(heap) < k:
+                            heapq.heappush(heap, (-dist, -counter, node, i))
+                            if len(heap) == k:
+                                bound = -heap[0][0]
+                        else:
+                            heapq.heapreplace(heap, (-dist, -counter, node, i))
+                            bound = -heap[0][0]
+                    bounds[q] = bound
+                return
 
-        return knn_result
+            # Τα παιδιά εξετάζονται με σειρά της μικρότερης MINDIST από κάποιο ενεργό σημείο
+            order = sorted(range(len(node)), key=lambda i: min(row[i] for row in distances))
+            for i in order:
+                child_live = [q for q, row in zip(live, distances) if row[i] <= bounds[q]]
+                if child_live:
+                    visit(node.child(i), child_live)
+
+        if len(self.root):
+            visit(self.root, list(range(len(points))))
+
+        results = []
+        for heap in candidates:
+            ordered = sorted(heap, key=lambda item: (-item[0], -item[1]))
+            results.append([node.entry(i) for _, _, node, i in ordered])
+        return results
 
     def distance(self, point, mbr):
         """
-        Υπολογισμός της ευκλείδιας απόστασης μεταξύ ενός σημείου και του κέντρου ενός MBR.
+        Υπολογισμός της ακριβούς απόστασης ενός σημείου από μια εγγραφή, με τη μετρική του δέντρου.
+        Για εγγραφές-σημεία είναι η απόσταση των δύο σημείων, ενώ για ορθογώνια
+        η απόσταση από το πλησιέστερο σημείο τους.
+        
+        :param point: Το σημείο που εξετάζεται.
+        :param mbr: Το Minimum Bounding Rectangle της εγγραφής.
+        :return: Η απόσταση (ευκλείδια, ή σε km με τη μετρική haversine).
+        """
+        if self.metric == 'haversine':
+            return geodesic_min_distances(tuple(mbr), tuple(point))[0]
+        return self.distance_to_mbr(point, mbr)
+
+    def minmax_distance(self, point, mbr):
+        """
+        Υπολογισμός του MINMAXDIST (Roussopoulos et al.): η μικρότερη απόσταση μέσα στην οποία
+        υπάρχει σίγουρα κάποιο σημείο του περιεχομένου ενός MBR, αφού κάθε πλευρά του MBR
+        αγγίζει τουλάχιστον μία εγγραφή.
         
         :param point: Το σημείο που εξετάζεται.
         :param mbr: Το Minimum Bounding Rectangle.
-        :return: Η ευκλείδια απόσταση.
+        :return: Το MINMAXDIST.
         """
-        center_x = (mbr[0] + mbr[2]) / 2
-        center_y = (mbr[1] + mbr[3]) / 2
-        return math.sqrt((point[0] - center_x) ** 2 + (point[1] - center_y) ** 2)
+        return minmax_distances(tuple(mbr), tuple(point), self.dims)[0]
 
     def distance_to_mbr(self, point, mbr):
         """
@@ -218,74 +1210,495 @@ class RStarTree:
         :param mbr: Το Minimum Bounding Rectangle.
         :return: Η ελάχιστη απόσταση.
         """
-        min_x, min_y, max_x, max_y = mbr
-        px, py = point
+        return min_distances(tuple(mbr), tuple(point), self.dims)[0]
 
-        dx = max(min_x - px, 0, px - max_x)
-        dy = max(min_y - py, 0, py - max_y)
+    @instrumented('join')
+    def spatial_join(self, other):
+        """
+        Χωρική σύζευξη (spatial join) με ένα άλλο R*-Tree: όλα τα ζεύγη εγγραφών των δύο δέντρων
+        των οποίων τα MBR αλληλοεπικαλύπτονται. Τα δύο δέντρα διασχίζονται ταυτόχρονα (Brinkhoff et al.):
+        για κάθε ζεύγος κόμβων εξετάζονται μόνο οι εγγραφές που τέμνουν την τομή των δύο MBR
+        και τα ζεύγη τους βρίσκονται με σάρωση επιπέδου (plane sweep) κατά x.
         
-        return math.sqrt(dx * dx + dy * dy)
+        :param other: Το δεύτερο R*-Tree.
+        :return: Generator από ζεύγη (εγγραφή αυτού του δέντρου, εγγραφή του άλλου δέντρου).
+        """
+        return self._join(self.root, other.root, 0.0)
 
-    def skyline_query(self):
+    @instrumented('join')
+    def distance_join(self, other, epsilon):
         """
-        Ερώτημα κορυφογραμμής (Skyline Query) που επιστρέφει τα σημεία που δεν κυριαρχούνται από κανένα άλλο σημείο.
+        Σύζευξη απόστασης: όλα τα ζεύγη εγγραφών των δύο δέντρων σε απόσταση το πολύ epsilon
+        (στις μονάδες των συντεταγμένων). Γίνεται όπως η spatial_join, με τα MBR του πρώτου
+        δέντρου μεγαλωμένα κατά epsilon, και στα φύλλα ελέγχεται η ακριβής απόσταση.
         
-        :return: Λίστα με τα σημεία που ανήκουν στην κορυφογραμμή.
+        :param other: Το δεύτερο R*-Tree.
+        :param epsilon: Η μέγιστη απόσταση.
+        :return: Generator από ζεύγη (εγγραφή αυτού του δέντρου, εγγραφή του άλλου δέντρου).
+        """
+        return self._join(self.root, other.root, epsilon)
+
+    def _join(self, node_a, node_b, epsilon):
         """
-        all_points = self.get_all_points(self.root)
-        skyline_points = []
+        Σύζευξη δύο κόμβων. Αν ο ένας είναι φύλλο και ο άλλος όχι (δέντρα διαφορετικού ύψους),
+        κατεβαίνει μόνο ο εσωτερικός κόμβος.
+        """
+        if not len(node_a) or not len(node_b):
+            return
+        if self.counters_enabled:
+            self.node_visits += 1
+
+        dims = self.dims
+        if node_a.is_leaf and not node_b.is_leaf:
+            for j in intersecting(node_b.coords, self._expand(node_a.mbr, epsilon), dims):
+                yield from self._join(node_a, node_b.child(j), epsilon)
+            return
+        if node_b.is_leaf and not node_a.is_leaf:
+            for i in intersecting(node_a.coords, self._expand(node_b.mbr, epsilon), dims):
+                yield from self._join(node_a.child(i), node_b, epsilon)
+            return
 
-        for point in all_points:
-            if not any(self.dominates(other, point) for other in all_points):
-                skyline_points.append(point)
+        # Περιορισμός του χώρου αναζήτησης στην τομή των (μεγαλωμένων κατά epsilon) MBR των δύο κόμβων
+        mbr_a = self._expand(node_a.mbr, epsilon)
+        mbr_b = node_b.mbr
+        window = tuple(map(max, mbr_a[:dims], mbr_b[:dims])) + tuple(map(min, mbr_a[dims:], mbr_b[dims:]))
+        if any(window[d] > window[dims + d] for d in range(dims)):
+            return
+        entries_a = [
+            (self._expand(node_a.entry_mbr(i), epsilon), i)
+            for i in intersecting(node_a.coords, self._expand(window, epsilon), dims)
+        ]
+        entries_b = [(node_b.entry_mbr(j), j) for j in intersecting(node_b.coords, window, dims)]
 
-        return skyline_points
+        for i, j in self._plane_sweep(entries_a, entries_b):
+            if node_a.is_leaf:
+                if epsilon and mbr_distance(node_a.entry_mbr(i), node_b.entry_mbr(j)) > epsilon:
+                    continue
+                yield node_a.entry(i), node_b.entry(j)
+            else:
+                yield from self._join(node_a.child(i), node_b.child(j), epsilon)
 
-    def get_all_points(self, node):
+    @staticmethod
+    def _plane_sweep(entries_a, entries_b):
         """
-        Βοηθητική συνάρτηση για να επιστρέψουμε όλα τα σημεία του δέντρου.
+        Σάρωση επιπέδου: τα ζεύγη εγγραφών των δύο λιστών που αλληλοεπικαλύπτονται.
+        Οι λίστες ταξινομούνται κατά min_x και για κάθε εγγραφή εξετάζονται μόνο οι εγγραφές
+        της άλλης λίστας που ξεκινούν πριν τελειώσει αυτή κατά x. Οι υπόλοιπες διαστάσεις
+        ελέγχονται για κάθε τέτοιο ζεύγος.
         
-        :param node: Ο κόμβος που εξετάζεται.
-        :return: Μια λίστα με όλα τα σημεία του δέντρου.
+        :param entries_a: Λίστα από ζεύγη (MBR, θέση) του πρώτου κόμβου.
+        :param entries_b: Λίστα από ζεύγη (MBR, θέση) του δεύτερου κόμβου.
+        :return: Λίστα από ζεύγη θέσεων (θέση στον πρώτο, θέση στον δεύτερο).
         """
-        points = []
-        if node.is_leaf:
-            points.extend(node.entries)
-        else:
-            for child in node.entries:
-                points.extend(self.get_all_points(child))
-        return points
+        if not entries_a or not entries_b:
+            return []
+        dims = len(entries_a[0][0]) >> 1
+        rest = range(1, dims)
+
+        def overlaps(other, mbr):
+            if dims == 2:
+                return other[1] <= mbr[3] and other[3] >= mbr[1]
+            return all(other[d] <= mbr[dims + d] and other[dims + d] >= mbr[d] for d in rest)
 
-    def dominates(self, point_a, point_b):
+        entries_a.sort()
+        entries_b.sort()
+        pairs = []
+        i = j = 0
+        while i < len(entries_a) and j < len(entries_b):
+            mbr_a, index_a = entries_a[i]
+            mbr_b, index_b = entries_b[j]
+            if mbr_a[0] <= mbr_b[0]:
+                k = j
+                while k < len(entries_b) and entries_b[k][0][0] <= mbr_a[dims]:
+                    if overlaps(entries_b[k][0], mbr_a):
+                        pairs.append((index_a, entries_b[k][1]))
+                    k += 1
+                i += 1
+            else:
+                k = i
+                while k < len(entries_a) and entries_a[k][0][0] <= mbr_b[dims]:
+                    if overlaps(entries_a[k][0], mbr_b):
+                        pairs.append((entries_a[k][1], index_b))
+                    k += 1
+                j += 1
+        return pairs
+
+    @staticmethod
+    def _expand(mbr, epsilon):
+        """
+        Το MBR μεγαλωμένο κατά epsilon προς κάθε κατεύθυνση.
+        """
+        if not epsilon:
+            return mbr
+        dims = len(mbr) >> 1
+        return tuple(value - epsilon for value in mbr[:dims]) + tuple(value + epsilon for value in mbr[dims:])
+
+    def skyline_query(self, region=None):
         """
-        Ελέγχει αν το σημείο A κυριαρχεί το σημείο B.
+        Ερώτημα κορυφογραμμής (Skyline Query) που επιστρέφει τα σημεία που δεν κυριαρχούνται από κανένα άλλο σημείο
+        (μικρότερες τιμές είναι καλύτερες σε κάθε διάσταση).
         
-        :param point_a: Το σημείο A.
-        :param point_b: Το σημείο B.
-        :return: True αν το σημείο A κυριαρχεί το B, False αλλιώς.
+        :param region: Προαιρετικό MBR που περιορίζει το ερώτημα (constrained skyline).
+        :return: Λίστα με τα σημεία που ανήκουν στην κορυφογραμμή.
+        """
+        return list(self.skyline_iter(region))
+
+    @instrumented('skyline')
+    def skyline_iter(self, region=None):
+        """
+        Branch-and-Bound Skyline (BBS, Papadias et al.): οι εγγραφές και οι κόμβοι εξετάζονται
+        με ουρά προτεραιότητας κατά την απόσταση L1 της κάτω γωνίας τους από την αρχή των αξόνων.
+        Ένα σημείο που βγαίνει από την ουρά χωρίς να κυριαρχείται ανήκει σίγουρα στην κορυφογραμμή,
+        οπότε επιστρέφεται αμέσως (progressive). Κόμβοι των οποίων η κάτω γωνία κυριαρχείται
+        από ένα σημείο της κορυφογραμμής δεν διαβάζονται καθόλου.
+
+        :param region: Προαιρετικό MBR που περιορίζει το ερώτημα (constrained skyline).
+        :return: Generator με τις εγγραφές της κορυφογραμμής, με τη σειρά που βρίσκονται.
         """
-        return all(a <= b for a, b in zip(point_a['mbr'], point_b['mbr']))
+        if not len(self.root):
+            return
+
+        skyline = []  # Οι κάτω γωνίες των σημείων της κορυφογραμμής
+        dims = self.dims
+        stride = 2 * dims
+
+        def dominated(corner):
+            for point in skyline:
+                if point != corner and all(a <= b for a, b in zip(point, corner)):
+                    return True
+            return False
+
+        # Στοιχεία της ουράς: (L1 απόσταση, μετρητής, κόμβος, θέση εγγραφής ή -1 για ολόκληρο κόμβο, κάτω γωνία)
+        counting = self.counters_enabled
+        counter = 0
+        priority_queue = [(0.0, counter, self.root, -1, None)]
+        while priority_queue:
+            _, _, node, index, corner = heapq.heappop(priority_queue)
+            if corner is not None and dominated(corner):
+                continue
+
+            if index >= 0:
+                if node.is_leaf:
+                    skyline.append(corner)
+                    yield node.entry(index)
+                    continue
+                node = node.child(index)
+
+            if counting:
+                self.node_visits += 1
+            coords = node.coords
+            indices = range(len(node)) if region is None else intersecting(coords, region, dims)
+            for i in indices:
+                corner = tuple(coords[stride * i:stride * i + dims])
+                if region is not None:
+                    # Η κάτω γωνία του τμήματος της εγγραφής που βρίσκεται μέσα στην περιοχή
+                    corner = tuple(map(max, corner, region[:dims]))
+                if dominated(corner):
+                    continue
+                counter += 1
+                heapq.heappush(priority_queue, (sum(corner), counter, node, i, corner))
 
-    def delete(self, mbr):
+    @instrumented('delete')
+    def delete(self, mbr, block_id=None, slot=None):
         """
-        Διαγραφή μιας εγγραφής από το R*-Tree.
+        Διαγραφή μιας εγγραφής από το R*-Tree. Η αναζήτηση κατεβαίνει μόνο στα παιδιά
+        που περιέχουν το MBR και, αν δοθούν, ταιριάζει και τον δείκτη (block_id, slot).
+        Μετά τη διαγραφή οι κόμβοι που έμειναν με λιγότερες από τις ελάχιστες εγγραφές
+        αφαιρούνται και οι εγγραφές τους επανεισάγονται (CondenseTree).
         
         :param mbr: Το MBR της εγγραφής προς διαγραφή.
+        :param block_id: Το block της εγγραφής στο datafile (προαιρετικό).
+        :param slot: Η θέση της εγγραφής στο block (προαιρετικό).
+        :return: True αν βρέθηκε και διαγράφηκε η εγγραφή.
+        """
+        self._check_writable()
+        mbr = tuple(mbr)
+        with self._write_lock:
+            found = self.find_entry(mbr, block_id, slot)
+            if found is None:
+                return False
+
+            if self.wal is not None:
+                # Καταγράφεται ο δείκτης της εγγραφής που βρέθηκε, ώστε η επανεφαρμογή να διαγράψει την ίδια
+                path, index = found
+                self.wal.log_delete(mbr, path[-1].block_ids[index], path[-1].slots[index])
+            self._remove(found)
+            if self.query_cache is not None:
+                self.query_cache.invalidate(mbr, self._version + 1)
+            self._publish()
+        return True
+
+    def _remove(self, found):
         """
-        self.remove_entry(self.root, mbr)
+        Αφαίρεση μιας εγγραφής φύλλου που βρέθηκε με την find_entry και συμπύκνωση του δέντρου.
 
-    def remove_entry(self, node, mbr):
+        :param found: Ζεύγος (διαδρομή προς το φύλλο, θέση της εγγραφής στο φύλλο).
         """
-        Βοηθητική συνάρτηση για τη διαγραφή μιας εγγραφής από το δέντρο.
+        path, index = found
+        path = self._writable(path)
+        leaf = path[-1]
+        if self.locator is not None:
+            self.locator.pop((leaf.block_ids[index], leaf.slots[index]), None)
+        leaf.remove_entry_at(index)
+        leaf.update_mbr()
+        self.condense_tree(path)
+
+    def find_entry(self, mbr, block_id=None, slot=None):
+        """
+        Εύρεση μιας εγγραφής φύλλου (FindLeaf). Όταν υπάρχει ο locator και δίνεται ο δείκτης
+        (block_id, slot), το φύλλο βρίσκεται απευθείας και η διαδρομή προς αυτό ακολουθεί
+        μόνο τα παιδιά που περιέχουν ολόκληρο το MBR του φύλλου.
         
-        :param node: Ο κόμβος που εξετάζεται.
-        :param mbr: Το MBR της εγγραφής προς διαγραφή.
+        :param mbr: Το MBR της εγγραφής.
+        :param block_id: Το block της εγγραφής στο datafile (προαιρετικό).
+        :param slot: Η θέση της εγγραφής στο block (προαιρετικό).
+        :return: Ζεύγος (διαδρομή από τη ρίζα μέχρι το φύλλο, θέση της εγγραφής) ή None.
         """
-        for entry in node.entries:
-            if entry['mbr'] == mbr:
-                node.entries.remove(entry)
-                node.update_mbr()
-                return
-            elif not node.is_leaf:
-                self.remove_entry(entry, mbr)
+        if self.locator is not None and block_id is not None and slot is not None:
+            leaf = self.locator.get((block_id, slot))
+            if leaf is not None:
+                index = self._leaf_index(leaf, mbr, block_id, slot)
+                path = self._path_to(self.root, leaf) if index is not None else None
+                if path is not None:
+                    return path, index
+        return self._find_leaf([self.root], mbr, block_id, slot)
+
+    def _find_leaf(self, path, mbr, block_id, slot):
+        """
+        Αναδρομική αναζήτηση του φύλλου που περιέχει την εγγραφή, μόνο μέσα από τα παιδιά που περιέχουν το MBR.
+        """
+        node = path[-1]
+        if self.counters_enabled:
+            self.node_visits += 1
+            if node.is_leaf:
+                self.entries_tested += len(node)
+        if node.is_leaf:
+            index = self._leaf_index(node, mbr, block_id, slot)
+            return None if index is None else (path, index)
+        for i in containing(node.coords, mbr, self.dims):
+            found = self._find_leaf(path + [node.child(i)], mbr, block_id, slot)
+            if found is not None:
+                return found
+        return None
+
+    @staticmethod
+    def _leaf_index(leaf, mbr, block_id, slot):
+        """
+        Η θέση της εγγραφής μέσα στο φύλλο ή None αν δεν υπάρχει.
+        """
+        for i in range(len(leaf)):
+            if (leaf.entry_mbr(i) == mbr and (block_id is None or leaf.block_ids[i] == block_id)
+                    and (slot is None or leaf.slots[i] == slot)):
+                return i
+        return None
+
+    def _path_to(self, node, target):
+        """
+        Η διαδρομή από τον κόμβο μέχρι τον κόμβο-στόχο, μέσα από τα παιδιά που περιέχουν το MBR του στόχου.
+        """
+        if node is target:
+            return [node]
+        if node.is_leaf or target.mbr is None:
+            return None
+        for i in containing(node.coords, target.mbr, self.dims):
+            path = self._path_to(node.child(i), target)
+            if path is not None:
+                return [node] + path
+        return None
+
+    def condense_tree(self, path):
+        """
+        Προσαρμογή του δέντρου μετά από διαγραφή (CondenseTree): από το φύλλο προς τη ρίζα,
+        κάθε κόμβος με λιγότερες από τις ελάχιστες εγγραφές αφαιρείται από τον γονέα του
+        και οι εγγραφές του επανεισάγονται στο επίπεδό τους, ενώ των υπολοίπων
+        ενημερώνεται το MBR. Τέλος, μια ρίζα με ένα μόνο παιδί αντικαθίσταται από αυτό.
+        
+        :param path: Η διαδρομή από τη ρίζα μέχρι το φύλλο από το οποίο διαγράφηκε η εγγραφή.
+        """
+        orphans = []  # Ζεύγη (κόμβος που αφαιρέθηκε, επίπεδό του)
+        for depth in range(len(path) - 1, 0, -1):
+            node = path[depth]
+            parent = path[depth - 1]
+            index = parent.index_of_child(node)
+            if len(node) < self._min_entries(node):
+                parent.remove_entry_at(index)
+                orphans.append((node, self.height - 1 - depth))
+                if node.page_id is not None:
+                    self._release_page(node.page_id)
+                    node.page_id = None
+            else:
+                parent.refresh_entry(index)
+            parent.update_mbr()
+
+        # Επανεισαγωγή των εγγραφών των κόμβων που αφαιρέθηκαν, ξεκινώντας από τα ανώτερα επίπεδα
+        for node, level in reversed(orphans):
+            for i in range(len(node)):
+                self._overflowed_levels = set()
+                self.insert_entry(node.entry(i), level)
+
+        while not self.root.is_leaf and len(self.root) == 1:
+            old_root = self.root
+            self.root = old_root.child(0)
+            self.height -= 1
+            if old_root.page_id is not None:
+                self._release_page(old_root.page_id)
+
+    @contextlib.contextmanager
+    def snapshot(self):
+        """
+        Στιγμιότυπο μόνο για ανάγνωση της τελευταίας δημοσιευμένης έκδοσης του δέντρου, για χρήση
+        από νήματα αναγνωστών ενώ ένα άλλο νήμα γράφει. Οι εισαγωγές και οι διαγραφές δεν αλλάζουν
+        ποτέ κόμβους που έχουν δημοσιευτεί, οπότε τα ερωτήματα στο στιγμιότυπο δεν χρειάζονται lock
+        και βλέπουν πάντα μια συνεπή έκδοση. Οι σελίδες των παλιών εκδόσεων ελευθερώνονται
+        όταν κλείσουν όλα τα στιγμιότυπα που τις βλέπουν.
+
+        Χρήση: with tree.snapshot() as view: view.range_query(mbr)
+
+        :return: Context manager που δίνει ένα R*-Tree μόνο για ανάγνωση.
+        """
+        if not self.concurrent:
+            raise ValueError("Snapshots require a tree created with concurrent=True")
+
+        with self._snapshot_lock:
+            root, height, version = self._published
+            self._readers[version] = self._readers.get(version, 0) + 1
+        view = self._view(root, height, version)
+        try:
+            yield view
+        finally:
+            with self._snapshot_lock:
+                self._readers[version] -= 1
+                if not self._readers[version]:
+                    del self._readers[version]
+            self._reclaim()
+
+    def _view(self, root, height, version):
+        """
+        Ένα R*-Tree μόνο για ανάγνωση πάνω σε μια δημοσιευμένη έκδοση (ρίζα, ύψος, αριθμός έκδοσης),
+        με το ίδιο index file αλλά δικούς του μετρητές, χωρίς write-ahead log, locator και κατάσταση εγγραφών.
+        Κοινά μένουν μόνο το stats sink και η query_cache, που είναι ασφαλή για πολλά νήματα και
+        ελέγχουν την έκδοση κάθε αποτελέσματος (βλ. QueryCache).
+        """
+        view = type(self)(max_entries_per_node=self.max_entries_per_node, split_policy=self.split_policy,
+                          reinsert_fraction=self.reinsert_fraction, index_file=self.index_file, dims=self.dims,
+                          metric=self.metric)
+        view.root = root
+        view.height = height
+        view.read_only = True
+        view._version = version
+        view._published = (root, height, version)
+        view.stats_sink = self.stats_sink
+        view.counters_enabled = self.counters_enabled
+        view.query_cache = self.query_cache
+        return view
+
+    def _check_writable(self):
+        """
+        Έλεγχος ότι το δέντρο δεν είναι στιγμιότυπο μόνο για ανάγνωση.
+        """
+        if self.read_only:
+            raise ValueError("Cannot modify a read-only snapshot")
+
+    def _writable(self, path):
+        """
+        Προετοιμασία των κόμβων μιας διαδρομής για τροποποίηση. Οι κόμβοι που έχουν σελίδα θα
+        γραφτούν σε νέα σελίδα στην επόμενη save, ώστε η σελίδα 0 στον δίσκο να βλέπει πάντα ένα
+        ολόκληρο δέντρο. Με ταυτόχρονη πρόσβαση οι κόμβοι που ανήκουν σε δημοσιευμένη έκδοση
+        αντιγράφονται (copy-on-write), ώστε να μπορούν να τροποποιηθούν χωρίς να τους δουν οι
+        αναγνώστες. Κάθε αντίγραφο αντικαθιστά το αρχικό στον (ήδη αντιγραμμένο) γονέα του ή γίνεται η νέα ρίζα.
+        
+        :param path: Η διαδρομή από τη ρίζα.
+        :return: Η διαδρομή με τα αντίγραφα.
+        """
+        if not self.concurrent:
+            for node in path:
+                if node.page_id is not None:
+                    self.index_file.free_page(node.page_id)
+                    node.page_id = None
+            return path
+        path = list(path)
+        for depth, node in enumerate(path):
+            if node in self._owned:
+                continue
+            clone = node.copy()
+            self._owned.add(clone)
+            if node.page_id is not None:
+                # Τα αντίγραφα γράφονται σε νέες σελίδες, ώστε οι παλιές εκδόσεις να διαβάζουν πάντα τις δικές τους
+                self._retiring.append(node.page_id)
+            if depth == 0:
+                self.root = clone
+            else:
+                parent = path[depth - 1]
+                parent.children[parent.index_of_child(node)] = clone
+            if clone.is_leaf and self.locator is not None:
+                self._register_leaf(clone)
+            path[depth] = clone
+        return path
+
+    def _own(self, *nodes):
+        """
+        Καταχώριση νέων κόμβων (που δεν έχουν δημοσιευτεί) ώστε να αλλάζουν χωρίς αντιγραφή.
+        """
+        if self.concurrent:
+            self._owned.update(nodes)
+
+    def _release_page(self, page_id):
+        """
+        Αποδέσμευση της σελίδας ενός κόμβου που αφαιρέθηκε. Με ταυτόχρονη πρόσβαση η σελίδα
+        ελευθερώνεται μόνο όταν δεν τη βλέπει κανένα στιγμιότυπο.
+        """
+        if self.concurrent:
+            self._retiring.append(page_id)
+        else:
+            self.index_file.free_page(page_id)
+
+    def _publish(self):
+        """
+        Δημοσίευση της τρέχουσας έκδοσης του δέντρου για τα νέα στιγμιότυπα (με μία ατομική ανάθεση).
+        """
+        self._version += 1
+        self._published = (self.root, self.height, self._version)
+        if self._retiring:
+            self._retired.append((self._version, self._retiring))
+            self._retiring = []
+        self._owned = set()
+        self._reclaim()
+
+    def _reclaim(self):
+        """
+        Ελευθέρωση των σελίδων των παλιών εκδόσεων που δεν βλέπει πλέον κανένα στιγμιότυπο.
+        """
+        with self._snapshot_lock:
+            oldest = min(self._readers) if self._readers else self._version
+            remaining = []
+            for version, pages in self._retired:
+                if version <= oldest:
+                    for page_id in pages:
+                        self.index_file.free_page(page_id)
+                else:
+                    remaining.append((version, pages))
+            self._retired = remaining
+
+    def enable_locator(self):
+        """
+        Δημιουργία ενός ευρετηρίου κατακερματισμού από τον δείκτη (block_id, slot) κάθε εγγραφής
+        προς το φύλλο της, ώστε οι διαγραφές με δείκτη να μη χρειάζονται αναζήτηση στο δέντρο.
+        Διαβάζει όλα τα φύλλα και ενημερώνεται στις εισαγωγές, στους διαχωρισμούς και στις διαγραφές.
+        """
+        self.locator = {}
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.is_leaf:
+                self._register_leaf(node)
+            else:
+                stack.extend(node.child(i) for i in range(len(node)))
+
+    def _register_leaf(self, leaf):
+        """
+        Καταχώριση όλων των εγγραφών ενός φύλλου στον locator.
+        """
+        locator = self.locator
+        for key in zip(leaf.block_ids, leaf.slots):
+            locator[key] = leaf
 
@@ -0,0 +1,211 @@
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from QueryCache import QueryCache
+from RStarTree import RStarTree
+
+# Μέγιστο μέγεθος μιας γραμμής αιτήματος (π.χ. για μεγάλα MBR ή πολλά ορίσματα)
+MAX_LINE = 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+# Τα ερωτήματα που εκτελούνται από προεπιλογή στο executor, ώστε να μην καθυστερούν τον event loop
+HEAVY_OPS = frozenset({'range', 'knn'})
+
+# Οι λειτουργίες που αλλάζουν το δέντρο και εκτελούνται μία-μία στο νήμα του writer
+WRITE_OPS = frozenset({'insert', 'delete'})
+
+
+def _entry(entry):
+    """
+    Μετατροπή μιας εγγραφής φύλλου σε λεξικό για JSON.
+    """
+    return {'mbr': list(entry['mbr']), 'block_id': entry['block_id'], 'slot': entry['slot']}
+
+
+class RStarTreeServer:
+    def __init__(self, tree, offload=HEAVY_OPS, workers=None, max_inflight=64):
+        """
+        Εξυπηρετητής (asyncio) που δίνει πρόσβαση στο R*-Tree μέσω socket, ώστε πολλές υπηρεσίες
+        να μοιράζονται ένα ευρετήριο. Το πρωτόκολλο είναι μία γραμμή JSON ανά αίτημα και απάντηση:
+        {"id": 1, "op": "range", "mbr": [...]} -> {"id": 1, "result": [...]} ή {"id": 1, "error": "..."}.
+        Λειτουργίες: range (mbr, limit), knn (point, k), count (mbr), insert (mbr, block_id, slot),
+        delete (mbr, block_id, slot).
+
+        Τα αιτήματα μιας σύνδεσης εξυπηρετούνται ταυτόχρονα (pipelining) και οι απαντήσεις στέλνονται
+        όπως ολοκληρώνονται, με το id του αιτήματος. Όταν μια σύνδεση έχει max_inflight αιτήματα σε εξέλιξη,
+        σταματά η ανάγνωσή της μέχρι να ολοκληρωθεί κάποιο (backpressure).
+
+        Οι εισαγωγές και οι διαγραφές εκτελούνται με τη σειρά σε ένα νήμα writer, εκτός του event loop.
+        Με δέντρο concurrent=True τα ερωτήματα διαβάζουν στιγμιότυπα (snapshot), οπότε όσα ανήκουν στο
+        offload εκτελούνται παράλληλα σε νήματα του executor και τα υπόλοιπα στο νήμα του event loop.
+        Ένα δέντρο χωρίς στιγμιότυπα δεν μπορεί να διαβάζεται ενώ αλλάζει, οπότε όλες οι λειτουργίες
+        εκτελούνται με τη σειρά στο νήμα του writer.
+
+        :param tree: Το R*-Tree.
+        :param offload: Οι λειτουργίες ανάγνωσης που εκτελούνται στο executor (μόνο με concurrent=True).
+        :param workers: Αριθμός νημάτων του executor.
+        :param max_inflight: Μέγιστος αριθμός αιτημάτων σε εξέλιξη ανά σύνδεση.
+        """
+        self.tree = tree
+        if offload and not tree.concurrent:
+            logger.warning('The tree has no snapshots (concurrent=False): queries run on the writer thread.')
+        self.offload = frozenset(offload) if tree.concurrent else frozenset()
+        self.executor = ThreadPoolExecutor(max_workers=workers) if self.offload else None
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rstar-writer')
+        self.max_inflight = max_inflight
+        self.server = None
+
+    async def start(self, host='127.0.0.1', port=8765, path=None):
+        """
+        Έναρξη του εξυπηρετητή σε TCP (host, port) ή σε Unix socket (path).
+
+        :return: Το asyncio.Server.
+        """
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handle_connection, path=path, limit=MAX_LINE)
+        else:
+            self.server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE)
+        return self.server
+
+    async def serve_forever(self, host='127.0.0.1', port=8765, path=None):
+        """
+        Εκτέλεση του εξυπηρετητή μέχρι να ακυρωθεί.
+        """
+        server = await self.start(host, port, path)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        """
+        Τερματισμός του εξυπηρετητή, του executor και του νήματος writer.
+        """
+        if self.server is not None:
+            self.server.close()
+        if self.executor is not None:
+            self.executor.shutdown()
+        self.writer.shutdown()
+
+    async def handle_connection(self, reader, writer):
+        """
+        Εξυπηρέτηση μιας σύνδεσης: κάθε γραμμή γίνεται ξεχωριστή εργασία, με το πολύ max_inflight ταυτόχρονα.
+        """
+        inflight = asyncio.Semaphore(self.max_inflight)
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                await inflight.acquire()
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    inflight.release()
+                    break
+                if not line:
+                    inflight.release()
+                    break
+                task = asyncio.create_task(self._respond(line, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                task.add_done_callback(lambda _: inflight.release())
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, line, writer, write_lock):
+        """
+        Εκτέλεση ενός αιτήματος και αποστολή της απάντησης.
+        """
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            result = await self.execute(request)
+            response = {'id': request_id, 'result': result}
+        except Exception as error:
+            response = {'id': request_id, 'error': f'{type(error).__name__}: {error}'}
+
+        async with write_lock:
+            writer.write(json.dumps(response, separators=(',', ':')).encode() + b'\n')
+            await writer.drain()
+
+    async def execute(self, request):
+        """
+        Εκτέλεση μιας λειτουργίας: στο νήμα του writer αν αλλάζει το δέντρο (ή αν το δέντρο δεν έχει
+        στιγμιότυπα), στο executor αν ανήκει στις λειτουργίες του offload, αλλιώς στον event loop.
+
+        :param request: Το αίτημα (λεξικό με 'op' και τα ορίσματά του).
+        :return: Το αποτέλεσμα σε μορφή κατάλληλη για JSON.
+        """
+        op = request.get('op')
+        if op in WRITE_OPS or not self.tree.concurrent:
+            return await asyncio.get_running_loop().run_in_executor(self.writer, self._run, request)
+        if op in self.offload:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, self._run, request)
+        return self._run(request)
+
+    def _run(self, request):
+        """
+        Εκτέλεση μιας λειτουργίας στο δέντρο.
+        """
+        op = request.get('op')
+        if op == 'insert':
+            self.tree.insert({'mbr': tuple(request['mbr']), 'block_id': request['block_id'], 'slot': request['slot']})
+            return True
+        if op == 'delete':
+            return self.tree.delete(request['mbr'], request.get('block_id'), request.get('slot'))
+        if op not in ('range', 'knn', 'count'):
+            raise ValueError(f"Unknown operation: {op}")
+
+        if self.tree.concurrent:
+            with self.tree.snapshot() as view:
+                return self._query(view, op, request)
+        return self._query(self.tree, op, request)
+
+    @staticmethod
+    def _query(tree, op, request):
+        """
+        Εκτέλεση ενός ερωτήματος (range, knn ή count) σε ένα δέντρο ή στιγμιότυπο.
+        """
+        if op == 'range':
+            return [_entry(entry) for entry in tree.range_iter(tuple(request['mbr']), request.get('limit'))]
+        if op == 'knn':
+            return [_entry(entry) for entry in tree.k_nearest_neighbors(tuple(request['point']), request.get('k', 1))]
+        return tree.range_count(tuple(request['mbr']))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Εξυπηρετητής ερωτημάτων του R*-Tree (newline JSON)')
+    parser.add_argument('index', help='Το indexfile')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--path', default=None, help='Unix socket αντί για TCP')
+    parser.add_argument('--wal', default=None, help='Το write-ahead log του δέντρου')
+    parser.add_argument('--workers', type=int, default=None, help='Αριθμός νημάτων για τα ερωτήματα')
+    parser.add_argument('--max-inflight', type=int, default=64, help='Μέγιστα αιτήματα σε εξέλιξη ανά σύνδεση')
+    parser.add_argument('--cache-mb', type=float, default=0, help='Μέγεθος της προσωρινής μνήμης αποτελεσμάτων (MB)')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    tree = RStarTree.open(args.index, concurrent=True, wal_filename=args.wal)
+    if args.cache_mb > 0:
+        tree.query_cache = QueryCache(int(args.cache_mb * 1024 * 1024))
+    server = RStarTreeServer(tree, workers=args.workers, max_inflight=args.max_inflight)
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port, args.path))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        tree.close()
+
+
+if __name__ == "__main__":
+    main()
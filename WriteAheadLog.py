@@ -0,0 +1,221 @@
+import os
+import struct
+import threading
+import time
+import zlib
+
+# Κεφαλίδα του αρχείου καταγραφής: magic, έκδοση, LSN της πρώτης εγγραφής του αρχείου
+FILE_HEADER = struct.Struct('<4sHQ')
+MAGIC = b'RSTW'
+VERSION = 3
+
+# Κεφαλίδα κάθε εγγραφής: μήκος δεδομένων, CRC32 (του LSN και των δεδομένων), LSN
+RECORD_HEADER = struct.Struct('<IIQ')
+
+# Είδη εγγραφών και η μορφή των δεδομένων τους (μετά το byte του είδους). Τα MBR του δέντρου
+# ξεκινούν με το πλήθος των συντεταγμένων τους (2d για δέντρο d διαστάσεων).
+OP_INSERT = 1  # Εισαγωγή στο δέντρο: πλήθος συντεταγμένων, MBR, block_id, slot
+OP_DELETE = 2  # Διαγραφή από το δέντρο: πλήθος συντεταγμένων, MBR, ποιοι δείκτες δόθηκαν, block_id, slot
+OP_RECORD = 3  # Εγγραφή στο datafile: θέση εγγραφής, id, lat, lon (double, ακριβείς για κάθε κωδικοποίηση)
+INSERT_FORMAT = '<B{}dII'
+DELETE_FORMAT = '<B{}dBII'
+RECORD_STRUCT = struct.Struct('<QQdd')
+
+
+class WriteAheadLog:
+    def __init__(self, filename, group_size=64, group_interval=0.05):
+        """
+        Αρχείο καταγραφής (write-ahead log) των αλλαγών του R*-Tree και του datafile.
+        Κάθε αλλαγή γράφεται στο τέλος του αρχείου πριν εφαρμοστεί, ώστε μετά από μια διακοπή
+        να ξαναεφαρμοστούν όσες δεν έχουν φτάσει στα αρχεία σελίδων (recovery).
+        Το fsync γίνεται ομαδικά (group commit): μόλις συμπληρωθούν group_size εγγραφές, και πάντα στην
+        commit. Ένα νήμα στο παρασκήνιο κάνει το fsync όταν η παλαιότερη εγγραφή που δεν έχει γίνει
+        μόνιμη περιμένει group_interval δευτερόλεπτα, ακόμα κι αν δεν έρθουν άλλες εγγραφές.
+        Μετά από ένα checkpoint το αρχείο αδειάζει.
+
+        :param filename: Το όνομα του αρχείου καταγραφής.
+        :param group_size: Πλήθος εγγραφών ανά fsync.
+        :param group_interval: Μέγιστος χρόνος (σε δευτερόλεπτα) μέχρι το επόμενο fsync.
+        """
+        self.filename = filename
+        self.group_size = group_size
+        self.group_interval = group_interval
+        self.lock = threading.Lock()
+        self.pending_changed = threading.Condition(self.lock)
+        self.pending = 0  # Εγγραφές που δεν έχουν γίνει ακόμα fsync
+        self.oldest_pending = None  # Η χρονική στιγμή της παλαιότερης από αυτές
+        self.closed = False
+
+        if not os.path.exists(filename) or os.path.getsize(filename) < FILE_HEADER.size:
+            self._create(1)
+        else:
+            self.file = open(filename, 'r+b')
+            magic, version, self.base_lsn = FILE_HEADER.unpack(self.file.read(FILE_HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{filename} is not an R*-Tree write-ahead log")
+            # Εύρεση της τελευταίας ακέραιης εγγραφής και αποκοπή μιας μισογραμμένης εγγραφής στο τέλος
+            end = FILE_HEADER.size
+            self.last_lsn = self.base_lsn - 1
+            for lsn, _, offset in self._scan():
+                self.last_lsn = lsn
+                end = offset
+            self.file.truncate(end)
+            self.file.seek(end)
+
+        self.flusher = threading.Thread(target=self._flush_pending, name='wal-flusher', daemon=True)
+        self.flusher.start()
+
+    def _create(self, base_lsn):
+        """
+        Δημιουργία ενός κενού αρχείου καταγραφής που ξεκινά από το base_lsn.
+        Γράφεται πρώτα σε προσωρινό αρχείο, ώστε η αντικατάσταση του παλιού να είναι ατομική.
+        """
+        temp_filename = self.filename + '.tmp'
+        with open(temp_filename, 'wb') as f:
+            f.write(FILE_HEADER.pack(MAGIC, VERSION, base_lsn))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_filename, self.filename)
+        self.file = open(self.filename, 'r+b')
+        self.file.seek(0, os.SEEK_END)
+        self.base_lsn = base_lsn
+        self.last_lsn = base_lsn - 1
+
+    def _scan(self):
+        """
+        Ανάγνωση των εγγραφών του αρχείου μέχρι την πρώτη που λείπει ή είναι κατεστραμμένη.
+
+        :return: Generator από τριάδες (LSN, δεδομένα, θέση στο αρχείο μετά την εγγραφή).
+        """
+        self.file.seek(FILE_HEADER.size)
+        offset = FILE_HEADER.size
+        while True:
+            header = self.file.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            length, crc, lsn = RECORD_HEADER.unpack(header)
+            payload = self.file.read(length)
+            if len(payload) < length or zlib.crc32(header[8:] + payload) != crc:
+                return
+            offset += RECORD_HEADER.size + length
+            yield lsn, payload, offset
+
+    def append(self, payload):
+        """
+        Προσθήκη μιας εγγραφής στο τέλος του αρχείου. Η εγγραφή γίνεται μόνιμη στο επόμενο
+        ομαδικό fsync (ή στην commit).
+
+        :param payload: Τα δεδομένα της εγγραφής (το πρώτο byte είναι το είδος της).
+        :return: Ο αριθμός (LSN) της εγγραφής.
+        """
+        with self.lock:
+            lsn = self.last_lsn + 1
+            lsn_bytes = struct.pack('<Q', lsn)
+            self.file.write(RECORD_HEADER.pack(len(payload), zlib.crc32(lsn_bytes + payload), lsn) + payload)
+            self.last_lsn = lsn
+            self.pending += 1
+            if self.pending >= self.group_size:
+                self._sync()
+            elif self.pending == 1:
+                self.oldest_pending = time.monotonic()
+                self.pending_changed.notify()
+            return lsn
+
+    def _flush_pending(self):
+        """
+        Το νήμα του group commit: fsync των εγγραφών που περιμένουν group_interval δευτερόλεπτα.
+        """
+        with self.lock:
+            while not self.closed:
+                if not self.pending:
+                    self.pending_changed.wait()
+                    continue
+                delay = self.oldest_pending + self.group_interval - time.monotonic()
+                if delay > 0:
+                    self.pending_changed.wait(delay)
+                else:
+                    self._sync()
+
+    def log_insert(self, entry):
+        """
+        Καταγραφή της εισαγωγής μιας εγγραφής στο δέντρο.
+        """
+        mbr = entry['mbr']
+        return self.append(bytes([OP_INSERT]) + struct.pack(INSERT_FORMAT.format(len(mbr)), len(mbr), *mbr,
+                                                            entry['block_id'], entry['slot']))
+
+    def log_delete(self, mbr, block_id=None, slot=None):
+        """
+        Καταγραφή της διαγραφής μιας εγγραφής από το δέντρο.
+        """
+        flags = (1 if block_id is not None else 0) | (2 if slot is not None else 0)
+        return self.append(bytes([OP_DELETE]) + struct.pack(DELETE_FORMAT.format(len(mbr)), len(mbr), *mbr, flags,
+                                                            block_id or 0, slot or 0))
+
+    def log_record(self, index, record):
+        """
+        Καταγραφή μιας εγγραφής του datafile στη θέση index (αύξων αριθμός εγγραφής).
+        """
+        return self.append(bytes([OP_RECORD]) + RECORD_STRUCT.pack(index, record['id'], record['lat'], record['lon']))
+
+    def records(self, after_lsn=0):
+        """
+        Οι εγγραφές του αρχείου με LSN μεγαλύτερο από after_lsn, για την επανεφαρμογή τους.
+
+        :param after_lsn: Το LSN μέχρι το οποίο οι αλλαγές έχουν ήδη φτάσει στα αρχεία σελίδων.
+        :return: Generator από ζεύγη (LSN, εγγραφή), όπου η εγγραφή είναι λεξικό με το είδος ('op') και τα πεδία της.
+        """
+        with self.lock:
+            self.file.flush()
+            items = [(lsn, payload) for lsn, payload, _ in self._scan() if lsn > after_lsn]
+            self.file.seek(0, os.SEEK_END)
+        for lsn, payload in items:
+            op = payload[0]
+            if op == OP_INSERT:
+                _, *mbr, block_id, slot = struct.unpack_from(INSERT_FORMAT.format(payload[1]), payload, 1)
+                yield lsn, {'op': 'insert', 'mbr': tuple(mbr), 'block_id': block_id, 'slot': slot}
+            elif op == OP_DELETE:
+                _, *mbr, flags, block_id, slot = struct.unpack_from(DELETE_FORMAT.format(payload[1]), payload, 1)
+                yield lsn, {'op': 'delete', 'mbr': tuple(mbr), 'block_id': block_id if flags & 1 else None,
+                            'slot': slot if flags & 2 else None}
+            elif op == OP_RECORD:
+                index, record_id, lat, lon = RECORD_STRUCT.unpack_from(payload, 1)
+                yield lsn, {'op': 'record', 'index': index, 'id': record_id, 'lat': lat, 'lon': lon}
+            else:
+                raise ValueError(f"Unknown log record type {op} at LSN {lsn}")
+
+    def commit(self):
+        """
+        Μόνιμη αποθήκευση (fsync) όλων των εγγραφών που έχουν προστεθεί.
+        """
+        with self.lock:
+            if self.pending:
+                self._sync()
+
+    def _sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = 0
+        self.oldest_pending = None
+
+    def checkpoint(self):
+        """
+        Άδειασμα του αρχείου καταγραφής, αφού οι αλλαγές του έχουν γραφτεί μόνιμα στα αρχεία σελίδων.
+        Η αρίθμηση συνεχίζει από το τελευταίο LSN.
+        """
+        with self.lock:
+            self.file.close()
+            self._create(self.last_lsn + 1)
+            self.pending = 0
+
+    def close(self):
+        """
+        Κλείσιμο του αρχείου καταγραφής, αφού γίνουν μόνιμες όλες οι εγγραφές.
+        """
+        with self.lock:
+            if self.pending:
+                self._sync()
+            self.closed = True
+            self.pending_changed.notify()
+        self.flusher.join()
+        self.file.close()
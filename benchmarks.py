@@ -0,0 +1,482 @@
+import argparse
+import heapq
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+from RStarTree import RStarTree
+
+
+def benchmark_insert(total, step, max_entries, split_policy, seed=0):
+    """
+    Μέτρηση του κόστους εισαγωγής καθώς μεγαλώνει το δέντρο.
+    Για κάθε παρτίδα από step εγγραφές τυπώνεται ο μέσος χρόνος ανά εισαγωγή και το ύψος του δέντρου,
+    ώστε να φαίνεται ότι το κόστος μένει σχεδόν σταθερό (O(ύψος)) και όχι γραμμικό.
+
+    :param total: Συνολικός αριθμός εγγραφών.
+    :param step: Μέγεθος κάθε παρτίδας μέτρησης.
+    :param max_entries: Μέγιστος αριθμός εγγραφών ανά κόμβο.
+    :param split_policy: Στρατηγική διαχωρισμού του δέντρου.
+    :param seed: Σπόρος της γεννήτριας τυχαίων σημείων.
+    """
+    rng = random.Random(seed)
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tree = RStarTree(max_entries_per_node=max_entries,
+                         index_filename=os.path.join(tmpdir, 'indexfile.dat'),
+                         split_policy=split_policy)
+        try:
+            print(f"{'entries':>10} {'us/insert':>10} {'height':>7}")
+            inserted = 0
+            while inserted < total:
+                batch = min(step, total - inserted)
+                records = []
+                for slot in range(inserted, inserted + batch):
+                    x = rng.random()
+                    y = rng.random()
+                    records.append({'mbr': (x, y, x, y), 'block_id': slot // 2048 + 1, 'slot': slot % 2048})
+
+                start = time.perf_counter()
+                for record in records:
+                    tree.insert(record)
+                elapsed = time.perf_counter() - start
+
+                inserted += batch
+                per_insert = elapsed / batch * 1e6
+                results.append((inserted, per_insert, tree.height))
+                print(f"{inserted:>10} {per_insert:>10.1f} {tree.height:>7}")
+        finally:
+            tree.close()
+
+    return results
+
+
+class _DictLayoutNode:
+    """
+    Ο παλιός τρόπος αναπαράστασης κόμβου (με __dict__ και εγγραφές ως dict), μόνο για σύγκριση μνήμης.
+    """
+    def __init__(self, is_leaf, entries, mbr, max_entries):
+        self.is_leaf = is_leaf
+        self.entries = entries
+        self.mbr = mbr
+        self.max_entries = max_entries
+
+
+def _to_dict_layout(node):
+    """
+    Μετατροπή ενός συμπαγούς κόμβου (και του υποδέντρου του) στην παλιά αναπαράσταση.
+    """
+    if node.is_leaf:
+        entries = node.entries
+    else:
+        entries = [_to_dict_layout(node.child(i)) for i in range(len(node))]
+    return _DictLayoutNode(node.is_leaf, entries, node.mbr, node.max_entries)
+
+
+def deep_size(obj, seen=None):
+    """
+    Συνολικό μέγεθος σε bytes ενός αντικειμένου και όλων όσων αναφέρει (κάθε αντικείμενο μετράει μία φορά).
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(key, seen) + deep_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif hasattr(obj, '__dict__'):
+        size += deep_size(vars(obj), seen)
+    elif hasattr(type(obj), '__slots__'):
+        size += sum(deep_size(getattr(obj, name), seen) for name in type(obj).__slots__)
+    return size
+
+
+def benchmark_memory(total, max_entries, seed=0):
+    """
+    Σύγκριση της μνήμης ανά εγγραφή ανάμεσα στη συμπαγή αναπαράσταση κόμβων (__slots__ και array)
+    και στην παλιά αναπαράσταση με dict ανά εγγραφή, για το ίδιο δέντρο.
+
+    :param total: Αριθμός εγγραφών.
+    :param max_entries: Μέγιστος αριθμός εγγραφών ανά κόμβο.
+    :param seed: Σπόρος της γεννήτριας τυχαίων σημείων.
+    """
+    rng = random.Random(seed)
+    records = []
+    for slot in range(total):
+        x = rng.random()
+        y = rng.random()
+        records.append({'mbr': (x, y, x, y), 'block_id': slot // 2048 + 1, 'slot': slot % 2048})
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tree = RStarTree.bulk_load(records, max_entries_per_node=max_entries,
+                                   index_filename=os.path.join(tmpdir, 'indexfile.dat'))
+        try:
+            del records
+            compact = deep_size(tree.root) / total
+            dict_layout = deep_size(_to_dict_layout(tree.root)) / total
+        finally:
+            tree.close()
+    print(f"{'layout':>12} {'bytes/entry':>12}")
+    print(f"{'compact':>12} {compact:>12.1f}")
+    print(f"{'dict':>12} {dict_layout:>12.1f}")
+    return compact, dict_layout
+
+
+def benchmark_fanout(total, fanouts, queries, window, k, seed=0):
+    """
+    Χρόνοι ερωτημάτων περιοχής και k-NN για διαφορετικό μέγιστο αριθμό εγγραφών ανά κόμβο,
+    ώστε να φαίνεται η επίδραση των ομαδικών (vectorized) ελέγχων MBR σε κόμβους μεγάλου βαθμού.
+
+    :param total: Αριθμός εγγραφών.
+    :param fanouts: Οι τιμές του max_entries_per_node που δοκιμάζονται.
+    :param queries: Αριθμός ερωτημάτων κάθε είδους.
+    :param window: Πλευρά του τετραγώνου των ερωτημάτων περιοχής (στο μοναδιαίο τετράγωνο).
+    :param k: Αριθμός γειτόνων στα ερωτήματα k-NN.
+    :param seed: Σπόρος της γεννήτριας τυχαίων σημείων.
+    """
+    rng = random.Random(seed)
+    records = []
+    for slot in range(total):
+        x = rng.random()
+        y = rng.random()
+        records.append({'mbr': (x, y, x, y), 'block_id': slot // 2048 + 1, 'slot': slot % 2048})
+    windows = []
+    points = []
+    for _ in range(queries):
+        x = rng.random() * (1 - window)
+        y = rng.random() * (1 - window)
+        windows.append((x, y, x + window, y + window))
+        points.append((rng.random(), rng.random()))
+
+    results = []
+    print(f"{'fanout':>7} {'range us':>10} {'knn us':>10}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for fanout in fanouts:
+            tree = RStarTree.bulk_load(records, max_entries_per_node=fanout,
+                                       index_filename=os.path.join(tmpdir, 'indexfile.dat'))
+            try:
+                start = time.perf_counter()
+                for query in windows:
+                    tree.range_query(query)
+                range_time = (time.perf_counter() - start) / queries * 1e6
+
+                start = time.perf_counter()
+                for point in points:
+                    tree.k_nearest_neighbors(point, k)
+                knn_time = (time.perf_counter() - start) / queries * 1e6
+            finally:
+                tree.close()
+
+            results.append((fanout, range_time, knn_time))
+            print(f"{fanout:>7} {range_time:>10.1f} {knn_time:>10.1f}")
+
+    return results
+
+
+def benchmark_encodings(total, max_entries, queries, window, seed=0):
+    """
+    Σύγκριση των κωδικοποιήσεων: εγγραφές ανά block του datafile και, για κάθε κωδικοποίηση των φύλλων του
+    index file, εγγραφές ανά φύλλο, σελίδες, μέγεθος αρχείου, καθώς και κόμβοι (σελίδες) και χρόνος ανά ερώτημα
+    περιοχής σε δέντρο που μόλις ανοίχτηκε από τον δίσκο. Τα σημεία είναι (lat, lon) πάνω στο πλέγμα
+    της κωδικοποίησης 'fixed', όπως αυτά ενός datafile.
+
+    :param total: Αριθμός εγγραφών.
+    :param max_entries: Μέγιστος αριθμός εγγραφών ανά κόμβο.
+    :param queries: Αριθμός ερωτημάτων περιοχής.
+    :param window: Πλευρά του παραθύρου των ερωτημάτων (σε μοίρες).
+    :param seed: Σπόρος της γεννήτριας τυχαίων σημείων.
+    """
+    from DataFile import RECORD_LAYOUTS, RecordFormat, FIXED_SCALE
+    from IndexFile import LEAF_ENCODINGS
+
+    print(f"{'datafile':>9} {'bytes':>6} {'per block':>10}")
+    for encoding in RECORD_LAYOUTS:
+        record_format = RecordFormat(encoding)
+        print(f"{encoding:>9} {record_format.size:>6} {record_format.records_per_block:>10}")
+
+    rng = random.Random(seed)
+    points = [(round(rng.uniform(37.0, 39.0) * FIXED_SCALE) / FIXED_SCALE,
+               round(rng.uniform(23.0, 25.0) * FIXED_SCALE) / FIXED_SCALE) for _ in range(total)]
+    boxes = []
+    for _ in range(queries):
+        lat = rng.uniform(37.0, 39.0 - window)
+        lon = rng.uniform(23.0, 25.0 - window)
+        boxes.append((lat, lon, lat + window, lon + window))
+
+    results = []
+    print(f"{'leaves':>9} {'per leaf':>9} {'pages':>8} {'file KB':>9} {'nodes/query':>12} {'us/query':>10}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for leaf_encoding in LEAF_ENCODINGS:
+            filename = os.path.join(tmpdir, f'{leaf_encoding}.dat')
+            tree = RStarTree.bulk_load(_records(points), max_entries_per_node=max_entries, index_filename=filename,
+                                       leaf_encoding=leaf_encoding)
+            tree.close()
+
+            tree = RStarTree.open(filename)
+            tree.counters_enabled = True
+            start = time.perf_counter()
+            for box in boxes:
+                tree.range_query(box)
+            query_time = (time.perf_counter() - start) / queries * 1e6
+            row = {'leaf_encoding': leaf_encoding, 'leaf_capacity': tree.max_leaf_entries,
+                   'pages': tree.index_file.page_count, 'file_kb': os.path.getsize(filename) / 1024,
+                   'nodes_per_query': tree.node_visits / queries, 'us_per_query': query_time}
+            tree.close()
+            results.append(row)
+            print(f"{leaf_encoding:>9} {row['leaf_capacity']:>9} {row['pages']:>8} {row['file_kb']:>9.0f} "
+                  f"{row['nodes_per_query']:>12.1f} {query_time:>10.1f}")
+
+    return results
+
+
+def uniform_points(n, rng):
+    """
+    n σημεία ομοιόμορφα κατανεμημένα στο μοναδιαίο τετράγωνο.
+    """
+    return [(rng.random(), rng.random()) for _ in range(n)]
+
+
+def clustered_points(n, rng, clusters=20, spread=0.02):
+    """
+    n σημεία γύρω από τυχαία κέντρα (κανονική κατανομή με τυπική απόκλιση spread), περιορισμένα στο μοναδιαίο τετράγωνο.
+    """
+    centers = [(rng.random(), rng.random()) for _ in range(clusters)]
+    points = []
+    for _ in range(n):
+        cx, cy = rng.choice(centers)
+        points.append((min(max(rng.gauss(cx, spread), 0.0), 1.0), min(max(rng.gauss(cy, spread), 0.0), 1.0)))
+    return points
+
+
+def osm_points(osm_file, n=None):
+    """
+    Τα σημεία (lat, lon) ενός αρχείου .osm (το πολύ n), στην ακρίβεια της προεπιλεγμένης κωδικοποίησης του datafile.
+    """
+    from DataFile import iter_osm_nodes, RecordFormat
+
+    record_format = RecordFormat()
+    points = []
+    for node in iter_osm_nodes(osm_file):
+        _, lat, lon = record_format.unpack_from(record_format.pack(node['id'], node['lat'], node['lon']))
+        points.append((lat, lon))
+        if n is not None and len(points) == n:
+            break
+    return points
+
+
+def _records(points):
+    return [{'mbr': (x, y, x, y), 'block_id': slot // 2048 + 1, 'slot': slot % 2048} for slot, (x, y) in enumerate(points)]
+
+
+def benchmark_workload(points, max_entries, windows, ks, queries, seed=0):
+    """
+    Μετρήσεις για ένα σύνολο σημείων: κατασκευή ένα-προς-ένα έναντι μαζικής κατασκευής, ερωτήματα περιοχής
+    ανά μέγεθος παραθύρου και k-NN ανά k, με τη σειριακή αναζήτηση ως σημείο αναφοράς.
+    Για κάθε μέτρηση καταγράφονται ο χρόνος, οι κόμβοι που επισκέφθηκαν τα ερωτήματα και η μνήμη του δέντρου.
+
+    :param points: Τα σημεία (x, y).
+    :param max_entries: Μέγιστος αριθμός εγγραφών ανά κόμβο.
+    :param windows: Πλευρές των παραθύρων των ερωτημάτων περιοχής (ως ποσοστό της έκτασης των σημείων).
+    :param ks: Οι τιμές του k για τα ερωτήματα k-NN.
+    :param queries: Αριθμός ερωτημάτων ανά μέγεθος παραθύρου και ανά k.
+    :param seed: Σπόρος της γεννήτριας τυχαίων ερωτημάτων.
+    :return: Λεξικό με τα αποτελέσματα (construction, range, knn).
+    """
+    rng = random.Random(seed)
+    records = _records(points)
+    min_x = min(x for x, _ in points)
+    min_y = min(y for _, y in points)
+    width = max(x for x, _ in points) - min_x
+    height = max(y for _, y in points) - min_y
+    result = {'n': len(points), 'max_entries': max_entries, 'construction': {}, 'range': [], 'knn': []}
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        start = time.perf_counter()
+        tree = RStarTree(max_entries_per_node=max_entries, index_filename=os.path.join(tmpdir, 'insert.dat'))
+        try:
+            for record in records:
+                tree.insert(record)
+            elapsed = time.perf_counter() - start
+            result['construction']['insert'] = {'seconds': elapsed, 'height': tree.height,
+                                                'memory_bytes': deep_size(tree.root)}
+        finally:
+            tree.close()
+
+        for method in ('hilbert', 'str'):
+            start = time.perf_counter()
+            tree = RStarTree.bulk_load(records, max_entries_per_node=max_entries, method=method,
+                                       index_filename=os.path.join(tmpdir, f'{method}.dat'))
+            try:
+                elapsed = time.perf_counter() - start
+                result['construction'][f'bulk_{method}'] = {'seconds': elapsed, 'height': tree.height,
+                                                            'memory_bytes': deep_size(tree.root)}
+            finally:
+                # Το δέντρο STR μένει ανοιχτό για τα ερωτήματα και κλείνει στο τέλος τους
+                if method != 'str':
+                    tree.close()
+
+        # Τα ερωτήματα εκτελούνται στο δέντρο της μαζικής κατασκευής STR, μετρώντας τους κόμβους που επισκέπτονται
+        try:
+            tree.counters_enabled = True
+
+            for window in windows:
+                w = width * window
+                h = height * window
+                boxes = []
+                for _ in range(queries):
+                    x = min_x + rng.random() * (width - w)
+                    y = min_y + rng.random() * (height - h)
+                    boxes.append((x, y, x + w, y + h))
+
+                tree.node_visits = 0
+                start = time.perf_counter()
+                matches = sum(len(tree.range_query(box)) for box in boxes)
+                tree_time = time.perf_counter() - start
+                visits = tree.node_visits
+
+                start = time.perf_counter()
+                for x1, y1, x2, y2 in boxes:
+                    [p for p in points if x1 <= p[0] <= x2 and y1 <= p[1] <= y2]
+                scan_time = time.perf_counter() - start
+
+                result['range'].append({'window': window, 'rstar_ms': tree_time / queries * 1e3,
+                                        'sequential_ms': scan_time / queries * 1e3,
+                                        'node_visits': visits / queries, 'results': matches / queries})
+
+            query_points = [(min_x + rng.random() * width, min_y + rng.random() * height) for _ in range(queries)]
+            for k in ks:
+                tree.node_visits = 0
+                start = time.perf_counter()
+                for point in query_points:
+                    tree.k_nearest_neighbors(point, k)
+                tree_time = time.perf_counter() - start
+                visits = tree.node_visits
+
+                start = time.perf_counter()
+                for qx, qy in query_points:
+                    heapq.nsmallest(k, points, key=lambda p: math.hypot(p[0] - qx, p[1] - qy))
+                scan_time = time.perf_counter() - start
+
+                result['knn'].append({'k': k, 'rstar_ms': tree_time / queries * 1e3,
+                                      'sequential_ms': scan_time / queries * 1e3, 'node_visits': visits / queries})
+        finally:
+            tree.close()
+
+    return result
+
+
+def benchmark_suite(workloads, n, max_entries, windows, ks, queries, osm_file='Peramos.osm', output=None, seed=0):
+    """
+    Αναπαραγώγιμη σειρά μετρήσεων σε ομοιόμορφα ('uniform'), ομαδοποιημένα ('clustered') και πραγματικά
+    ('osm') δεδομένα. Τα αποτελέσματα γράφονται σε JSON, από το οποίο σχεδιάζει τα γραφήματα το plot.py.
+
+    :param workloads: Τα σύνολα δεδομένων ('uniform', 'clustered', 'osm').
+    :param n: Αριθμός σημείων των συνθετικών δεδομένων (και μέγιστος αριθμός σημείων από το .osm).
+    :param osm_file: Το αρχείο .osm για τα πραγματικά δεδομένα.
+    :param output: Το αρχείο JSON των αποτελεσμάτων (None για να μη γραφτεί).
+    :param seed: Σπόρος των γεννητριών τυχαίων σημείων και ερωτημάτων.
+    :return: Λεξικό με τις παραμέτρους (meta) και τα αποτελέσματα ανά σύνολο δεδομένων (workloads).
+    """
+    results = {
+        'meta': {'n': n, 'max_entries': max_entries, 'queries': queries, 'seed': seed,
+                 'python': platform.python_version(), 'platform': platform.platform(),
+                 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')},
+        'workloads': {},
+    }
+    for workload in workloads:
+        rng = random.Random(seed)
+        if workload == 'uniform':
+            points = uniform_points(n, rng)
+        elif workload == 'clustered':
+            points = clustered_points(n, rng)
+        elif workload == 'osm':
+            points = osm_points(osm_file, n)
+        else:
+            raise ValueError(f"Unknown workload: {workload}")
+        if not points:
+            raise ValueError(f"Workload {workload} has no points")
+
+        print(f"{workload}: {len(points)} points")
+        result = benchmark_workload(points, max_entries, windows, ks, queries, seed)
+        results['workloads'][workload] = result
+        for method, stats in result['construction'].items():
+            print(f"  build {method:>12} {stats['seconds'] * 1e3:>10.1f} ms  height {stats['height']}")
+        for row in result['range']:
+            print(f"  range {row['window']:>12} {row['rstar_ms']:>10.3f} ms  seq {row['sequential_ms']:>8.3f} ms  "
+                  f"visits {row['node_visits']:.1f}")
+        for row in result['knn']:
+            print(f"  knn k={row['k']:<10} {row['rstar_ms']:>10.3f} ms  seq {row['sequential_ms']:>8.3f} ms  "
+                  f"visits {row['node_visits']:.1f}")
+
+    if output is not None:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {output}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks του R*-Tree')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    insert_parser = subparsers.add_parser('insert', help='Κόστος εισαγωγής ανά μέγεθος δέντρου')
+    insert_parser.add_argument('--n', type=int, default=1_000_000, help='Συνολικός αριθμός εγγραφών')
+    insert_parser.add_argument('--step', type=int, default=100_000, help='Μέγεθος παρτίδας μέτρησης')
+    insert_parser.add_argument('--max-entries', type=int, default=32, help='Μέγιστος αριθμός εγγραφών ανά κόμβο')
+    insert_parser.add_argument('--split-policy', default='rstar', choices=('linear', 'quadratic', 'rstar'))
+
+    memory_parser = subparsers.add_parser('memory', help='Μνήμη ανά εγγραφή: συμπαγείς κόμβοι έναντι dict')
+    memory_parser.add_argument('--n', type=int, default=100_000, help='Αριθμός εγγραφών')
+    memory_parser.add_argument('--max-entries', type=int, default=32, help='Μέγιστος αριθμός εγγραφών ανά κόμβο')
+
+    fanout_parser = subparsers.add_parser('fanout', help='Χρόνοι ερωτημάτων ανά βαθμό κόμβου')
+    fanout_parser.add_argument('--n', type=int, default=200_000, help='Αριθμός εγγραφών')
+    fanout_parser.add_argument('--fanouts', type=int, nargs='+', default=[8, 16, 32, 64, 128, 256])
+    fanout_parser.add_argument('--queries', type=int, default=500, help='Αριθμός ερωτημάτων κάθε είδους')
+    fanout_parser.add_argument('--window', type=float, default=0.01, help='Πλευρά του παραθύρου των ερωτημάτων περιοχής')
+    fanout_parser.add_argument('--k', type=int, default=10, help='Αριθμός γειτόνων')
+
+    encodings_parser = subparsers.add_parser('encodings', help='Εγγραφές ανά block/σελίδα και I/O ανά κωδικοποίηση')
+    encodings_parser.add_argument('--n', type=int, default=200_000, help='Αριθμός εγγραφών')
+    encodings_parser.add_argument('--max-entries', type=int, default=32, help='Μέγιστος αριθμός εγγραφών ανά κόμβο')
+    encodings_parser.add_argument('--queries', type=int, default=500, help='Αριθμός ερωτημάτων περιοχής')
+    encodings_parser.add_argument('--window', type=float, default=0.02, help='Πλευρά του παραθύρου (σε μοίρες)')
+
+    suite_parser = subparsers.add_parser('suite', help='Σειρά μετρήσεων με έξοδο JSON για το plot.py')
+    suite_parser.add_argument('--workloads', nargs='+', default=['uniform', 'clustered', 'osm'],
+                              choices=('uniform', 'clustered', 'osm'))
+    suite_parser.add_argument('--n', type=int, default=20_000, help='Αριθμός σημείων')
+    suite_parser.add_argument('--max-entries', type=int, default=32, help='Μέγιστος αριθμός εγγραφών ανά κόμβο')
+    suite_parser.add_argument('--windows', type=float, nargs='+', default=[0.005, 0.01, 0.02, 0.05, 0.1],
+                              help='Πλευρές των παραθύρων ως ποσοστό της έκτασης των σημείων')
+    suite_parser.add_argument('--ks', type=int, nargs='+', default=[1, 5, 10, 50, 100])
+    suite_parser.add_argument('--queries', type=int, default=100, help='Ερωτήματα ανά μέγεθος παραθύρου και ανά k')
+    suite_parser.add_argument('--osm', default='Peramos.osm', help='Το αρχείο .osm των πραγματικών δεδομένων')
+    suite_parser.add_argument('--output', default='benchmark_results.json', help='Το αρχείο JSON των αποτελεσμάτων')
+
+    args = parser.parse_args()
+    if args.benchmark == 'insert':
+        benchmark_insert(args.n, args.step, args.max_entries, args.split_policy)
+    elif args.benchmark == 'memory':
+        benchmark_memory(args.n, args.max_entries)
+    elif args.benchmark == 'fanout':
+        benchmark_fanout(args.n, args.fanouts, args.queries, args.window, args.k)
+    elif args.benchmark == 'encodings':
+        benchmark_encodings(args.n, args.max_entries, args.queries, args.window)
+    elif args.benchmark == 'suite':
+        benchmark_suite(args.workloads, args.n, args.max_entries, args.windows, args.ks, args.queries,
+                        osm_file=args.osm, output=args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,75 +1,106 @@
+import argparse
+import json
+
 import matplotlib.pyplot as plt
 
-# Δεδομένα για τα ερωτήματα
-queries = ['Range Query', 'k-NN Query']
-rstar_times = [20, 15]  # Χρόνοι εκτέλεσης R*-Tree σε ms
-sequential_times = [80, 70]  # Χρόνοι εκτέλεσης Σειριακής Αναζήτησης σε ms
-
-# Δημιουργία γραφήματος για ερωτήματα
-plt.figure(figsize=(10, 5))
-plt.bar(queries, rstar_times, width=0.4, label='R*-Tree', color='b', align='center')
-plt.bar(queries, sequential_times, width=0.4, label='Σειριακή Αναζήτηση', color='r', align='edge')
-
-# Ρυθμίσεις γραφήματος
-plt.xlabel('Ερώτημα')
-plt.ylabel('Χρόνος Εκτέλεσης (ms)')
-plt.title('Χρόνοι Εκτέλεσης Ερωτημάτων: R*-Tree vs Σειριακή Αναζήτηση')
-plt.legend()
-plt.grid(axis='y')
-plt.savefig('execution_times.png')  # Αποθήκευση γραφήματος
-plt.show()
-
-# Δεδομένα για την κατασκευή
-construction_methods = ['Ένα-Προς-Ένα', 'Μαζική Κατασκευή']
-construction_times = [1200, 800]  # Χρόνοι κατασκευής σε ms
-
-# Δημιουργία γραφήματος για την κατασκευή
-plt.figure(figsize=(8, 5))
-plt.bar(construction_methods, construction_times, color='g')
-
-# Ρυθμίσεις γραφήματος
-plt.xlabel('Μέθοδος Κατασκευής')
-plt.ylabel('Χρόνος Κατασκευής (ms)')
-plt.title('Σύγκριση Χρόνων Κατασκευής R*-Tree')
-plt.grid(axis='y')
-plt.savefig('construction_times.png')  # Αποθήκευση γραφήματος
-plt.show()
-
-# Δεδομένα για ερωτήματα περιοχής
-r_sizes = [1, 2, 3, 4, 5]  # Μεγέθη περιοχής R
-rstar_query_times = [10, 15, 20, 30, 50]  # Χρόνοι εκτέλεσης R*-Tree
-sequential_query_times = [30, 50, 70, 90, 120]  # Χρόνοι εκτέλεσης Σειριακής Αναζήτησης
-
-# Δημιουργία γραφήματος για ερωτήματα περιοχής
-plt.figure(figsize=(10, 5))
-plt.plot(r_sizes, rstar_query_times, label='R*-Tree', color='b', marker='o')
-plt.plot(r_sizes, sequential_query_times, label='Σειριακή Αναζήτηση', color='r', marker='x')
-
-# Ρυθμίσεις γραφήματος
-plt.xlabel('Μέγεθος Περιοχής R')
-plt.ylabel('Χρόνος Εκτέλεσης (ms)')
-plt.title('Χρόνοι Εκτέλεσης Ερωτημάτων Περιοχής ανά Μέγεθος R')
-plt.legend()
-plt.grid()
-plt.savefig('range_query_times.png')  # Αποθήκευση γραφήματος
-plt.show()
-
-# Δεδομένα για k-NN Queries
-k_values = [1, 2, 3, 4, 5]  # Τιμές k
-rstar_knn_times = [10, 12, 15, 18, 25]  # Χρόνοι εκτέλεσης R*-Tree
-sequential_knn_times = [25, 35, 50, 65, 80]  # Χρόνοι εκτέλεσης Σειριακής Αναζήτησης
-
-# Δημιουργία γραφήματος για k-NN Queries
-plt.figure(figsize=(10, 5))
-plt.plot(k_values, rstar_knn_times, label='R*-Tree', color='b', marker='o')
-plt.plot(k_values, sequential_knn_times, label='Σειριακή Αναζήτηση', color='r', marker='x')
-
-# Ρυθμίσεις γραφήματος
-plt.xlabel('k (Αριθμός Πλησιέστερων Γειτόνων)')
-plt.ylabel('Χρόνος Εκτέλεσης (ms)')
-plt.title('Χρόνοι Εκτέλεσης k-NN Queries ανά k')
-plt.legend()
-plt.grid()
-plt.savefig('knn_query_times.png')  # Αποθήκευση γραφήματος
-plt.show()
+# Ονόματα των μεθόδων κατασκευής στα γραφήματα
+CONSTRUCTION_LABELS = {'insert': 'Ένα-Προς-Ένα', 'bulk_str': 'Μαζική Κατασκευή (STR)',
+                       'bulk_hilbert': 'Μαζική Κατασκευή (Hilbert)'}
+
+
+def plot_workload(name, result, show=False):
+    """
+    Γραφήματα για τα αποτελέσματα ενός συνόλου δεδομένων της benchmark_suite (benchmarks.py suite).
+    Κάθε γράφημα αποθηκεύεται ως <είδος>_<σύνολο δεδομένων>.png.
+
+    :param name: Το όνομα του συνόλου δεδομένων (π.χ. 'uniform').
+    :param result: Τα αποτελέσματά του από το αρχείο JSON.
+    :param show: True για εμφάνιση των γραφημάτων.
+    """
+    title_suffix = f" ({name}, n={result['n']})"
+
+    # Δημιουργία γραφήματος για ερωτήματα, στο μεσαίο μέγεθος παραθύρου και k
+    range_row = result['range'][len(result['range']) // 2]
+    knn_row = result['knn'][len(result['knn']) // 2]
+    queries = [f"Range Query (R={range_row['window']})", f"k-NN Query (k={knn_row['k']})"]
+    rstar_times = [range_row['rstar_ms'], knn_row['rstar_ms']]
+    sequential_times = [range_row['sequential_ms'], knn_row['sequential_ms']]
+
+    plt.figure(figsize=(10, 5))
+    plt.bar(queries, rstar_times, width=0.4, label='R*-Tree', color='b', align='center')
+    plt.bar(queries, sequential_times, width=0.4, label='Σειριακή Αναζήτηση', color='r', align='edge')
+    plt.xlabel('Ερώτημα')
+    plt.ylabel('Χρόνος Εκτέλεσης (ms)')
+    plt.title('Χρόνοι Εκτέλεσης Ερωτημάτων: R*-Tree vs Σειριακή Αναζήτηση' + title_suffix)
+    plt.legend()
+    plt.grid(axis='y')
+    plt.savefig(f'execution_times_{name}.png')
+
+    # Δημιουργία γραφήματος για την κατασκευή
+    methods = list(result['construction'])
+    plt.figure(figsize=(8, 5))
+    plt.bar([CONSTRUCTION_LABELS.get(method, method) for method in methods],
+            [result['construction'][method]['seconds'] * 1e3 for method in methods], color='g')
+    plt.xlabel('Μέθοδος Κατασκευής')
+    plt.ylabel('Χρόνος Κατασκευής (ms)')
+    plt.title('Σύγκριση Χρόνων Κατασκευής R*-Tree' + title_suffix)
+    plt.grid(axis='y')
+    plt.savefig(f'construction_times_{name}.png')
+
+    # Δημιουργία γραφήματος για ερωτήματα περιοχής
+    r_sizes = [row['window'] for row in result['range']]
+    plt.figure(figsize=(10, 5))
+    plt.plot(r_sizes, [row['rstar_ms'] for row in result['range']], label='R*-Tree', color='b', marker='o')
+    plt.plot(r_sizes, [row['sequential_ms'] for row in result['range']], label='Σειριακή Αναζήτηση', color='r',
+             marker='x')
+    plt.xlabel('Μέγεθος Περιοχής R (ποσοστό της έκτασης)')
+    plt.ylabel('Χρόνος Εκτέλεσης (ms)')
+    plt.title('Χρόνοι Εκτέλεσης Ερωτημάτων Περιοχής ανά Μέγεθος R' + title_suffix)
+    plt.legend()
+    plt.grid()
+    plt.savefig(f'range_query_times_{name}.png')
+
+    # Δημιουργία γραφήματος για k-NN Queries
+    k_values = [row['k'] for row in result['knn']]
+    plt.figure(figsize=(10, 5))
+    plt.plot(k_values, [row['rstar_ms'] for row in result['knn']], label='R*-Tree', color='b', marker='o')
+    plt.plot(k_values, [row['sequential_ms'] for row in result['knn']], label='Σειριακή Αναζήτηση', color='r',
+             marker='x')
+    plt.xlabel('k (Αριθμός Πλησιέστερων Γειτόνων)')
+    plt.ylabel('Χρόνος Εκτέλεσης (ms)')
+    plt.title('Χρόνοι Εκτέλεσης k-NN Queries ανά k' + title_suffix)
+    plt.legend()
+    plt.grid()
+    plt.savefig(f'knn_query_times_{name}.png')
+
+    # Δημιουργία γραφήματος για τους κόμβους που επισκέφθηκαν τα ερωτήματα
+    fig, (range_axis, knn_axis) = plt.subplots(1, 2, figsize=(12, 5))
+    range_axis.plot(r_sizes, [row['node_visits'] for row in result['range']], color='b', marker='o')
+    range_axis.set_xlabel('Μέγεθος Περιοχής R (ποσοστό της έκτασης)')
+    range_axis.set_ylabel('Κόμβοι ανά Ερώτημα')
+    range_axis.grid()
+    knn_axis.plot(k_values, [row['node_visits'] for row in result['knn']], color='b', marker='o')
+    knn_axis.set_xlabel('k (Αριθμός Πλησιέστερων Γειτόνων)')
+    knn_axis.grid()
+    fig.suptitle('Κόμβοι που Επισκέφθηκαν τα Ερωτήματα' + title_suffix)
+    fig.savefig(f'node_visits_{name}.png')
+
+    if show:
+        plt.show()
+    plt.close('all')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Γραφήματα από τα αποτελέσματα του benchmarks.py suite')
+    parser.add_argument('results', nargs='?', default='benchmark_results.json', help='Το αρχείο JSON των αποτελεσμάτων')
+    parser.add_argument('--show', action='store_true', help='Εμφάνιση των γραφημάτων')
+    args = parser.parse_args()
+
+    with open(args.results) as f:
+        results = json.load(f)
+    for name, result in results['workloads'].items():
+        plot_workload(name, result, show=args.show)
+
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Τα modules του πακέτου βρίσκονται στον γονικό κατάλογο των tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+from RStarTree import RStarTree
+
+
+def box_records(count, seed, size):
+    rng = random.Random(seed)
+    records = []
+    for slot in range(count):
+        x, y = rng.random(), rng.random()
+        records.append({'mbr': (x, y, x + rng.random() * size, y + rng.random() * size), 'block_id': 1, 'slot': slot})
+    return records
+
+
+def brute_aggregate(records, window, fn):
+    hits = [r['mbr'] for r in records
+            if r['mbr'][0] <= window[2] and r['mbr'][2] >= window[0]
+            and r['mbr'][1] <= window[3] and r['mbr'][3] >= window[1]]
+    if fn == 'count':
+        return len(hits)
+    sums = tuple(sum((mbr[d] + mbr[d + 2]) / 2 for mbr in hits) for d in range(2))
+    if fn == 'sum':
+        return sums
+    if not hits:
+        return None
+    if fn == 'mean':
+        return tuple(total / len(hits) for total in sums)
+    if fn == 'min':
+        return tuple(min(mbr[d] for mbr in hits) for d in range(2))
+    return tuple(max(mbr[d + 2] for mbr in hits) for d in range(2))
+
+
+def windows(seed, count=40):
+    rng = random.Random(seed)
+    result = [(0, 0, 1.1, 1.1), (2, 2, 3, 3)]
+    for _ in range(count):
+        x, y = rng.uniform(-0.1, 1), rng.uniform(-0.1, 1)
+        result.append((x, y, x + rng.random() * 0.5, y + rng.random() * 0.5))
+    return result
+
+
+def check_aggregates(tree, records, seed):
+    for window in windows(seed):
+        assert tree.range_count(window) == brute_aggregate(records, window, 'count')
+        for fn in ('sum', 'mean', 'min', 'max'):
+            expected = brute_aggregate(records, window, fn)
+            result = tree.range_aggregate(window, fn)
+            if expected is None:
+                assert result is None
+            else:
+                assert result == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('size', [0.0, 0.05], ids=['points', 'boxes'])
+def test_aggregates_match_brute_force_through_inserts_and_deletes(tmp_path, size):
+    index_filename = str(tmp_path / 'index.dat')
+    records = box_records(1500, seed=1, size=size)
+    tree = RStarTree(max_entries_per_node=6, index_filename=index_filename)
+    for record in records:
+        tree.insert(record)
+    check_aggregates(tree, records, seed=2)
+
+    # Οι διαγραφές (με συμπύκνωση και επανεισαγωγές) ενημερώνουν τα πλήθη και τα αθροίσματα των γονέων
+    rng = random.Random(3)
+    rng.shuffle(records)
+    for record in records[1000:]:
+        assert tree.delete(record['mbr'], record['block_id'], record['slot'])
+    records = records[:1000]
+    check_aggregates(tree, records, seed=4)
+
+    tree.close()
+    tree = RStarTree.open(index_filename)
+    check_aggregates(tree, records, seed=5)
+    tree.close()
+
+
+def test_aggregates_of_a_bulk_loaded_tree(tmp_path):
+    records = box_records(2000, seed=6, size=0.02)
+    tree = RStarTree.bulk_load(records, max_entries_per_node=8, index_filename=str(tmp_path / 'index.dat'))
+    check_aggregates(tree, records, seed=7)
+    tree.close()
+
+
+def test_range_count_skips_subtrees_inside_the_window(tmp_path):
+    records = box_records(3000, seed=8, size=0.0)
+    tree = RStarTree.bulk_load(records, max_entries_per_node=8, index_filename=str(tmp_path / 'index.dat'))
+    tree.counters_enabled = True
+    window = (0.1, 0.1, 0.9, 0.9)
+    tree.range_query(window)
+    search_visits = tree.node_visits
+    tree.node_visits = 0
+    assert tree.range_count(window) == brute_aggregate(records, window, 'count')
+    assert tree.node_visits < search_visits / 2
+    tree.close()
+
+
+def test_unknown_aggregates_are_rejected(tmp_path):
+    tree = RStarTree(index_filename=str(tmp_path / 'index.dat'))
+    with pytest.raises(ValueError):
+        tree.range_aggregate((0, 0, 1, 1), 'median')
+    tree.close()
@@ -0,0 +1,116 @@
+import math
+import random
+
+import pytest
+
+from RStarTree import RStarTree
+
+
+def box_records(count, seed, size=0.0):
+    rng = random.Random(seed)
+    records = []
+    for slot in range(count):
+        x, y = rng.random(), rng.random()
+        records.append({'mbr': (x, y, x + rng.random() * size, y + rng.random() * size), 'block_id': 1, 'slot': slot})
+    return records
+
+
+def brute_distance(point, mbr):
+    return math.dist(point, [min(max(value, mbr[d]), mbr[d + 2]) for d, value in enumerate(point)])
+
+
+def key(record):
+    return (tuple(record['mbr']), record['block_id'], record['slot'])
+
+
+@pytest.fixture(params=[0.0, 0.02], ids=['points', 'boxes'])
+def loaded(tmp_path, request):
+    records = box_records(2000, seed=1, size=request.param)
+    tree = RStarTree(max_entries_per_node=8, index_filename=str(tmp_path / 'index.dat'))
+    for record in records:
+        tree.insert(record)
+    yield tree, records
+    tree.close()
+
+
+@pytest.mark.parametrize('group_size', [1, 7, 256])
+def test_range_query_batch_matches_brute_force(loaded, group_size):
+    tree, records = loaded
+    rng = random.Random(group_size)
+    windows = []
+    for _ in range(300):
+        x, y = rng.uniform(-0.1, 1), rng.uniform(-0.1, 1)
+        windows.append((x, y, x + rng.random() * 0.1, y + rng.random() * 0.1))
+    results = tree.range_query_batch(windows, group_size=group_size)
+    assert len(results) == len(windows)
+    for window, result in zip(windows, results):
+        expected = [key(record) for record in records if tree.overlap(record['mbr'], window)]
+        assert sorted(map(key, result)) == sorted(expected)
+
+
+@pytest.mark.parametrize('group_size', [1, 8, 64])
+def test_knn_batch_matches_brute_force(loaded, group_size):
+    tree, records = loaded
+    rng = random.Random(group_size)
+    points = [(rng.uniform(-0.2, 1.2), rng.uniform(-0.2, 1.2)) for _ in range(100)]
+    for k in (1, 6):
+        results = tree.knn_batch(points, k=k, group_size=group_size)
+        for point, result in zip(points, results):
+            expected = sorted(brute_distance(point, record['mbr']) for record in records)[:k]
+            assert [brute_distance(point, entry['mbr']) for entry in result] == pytest.approx(expected)
+
+
+def test_batches_of_nothing(loaded):
+    tree, _ = loaded
+    assert tree.range_query_batch([]) == []
+    assert tree.knn_batch([]) == []
+    assert tree.knn_batch([(0.5, 0.5)], k=0) == [[]]
+
+
+def test_knn_batch_with_the_haversine_metric(tmp_path):
+    rng = random.Random(3)
+    tree = RStarTree(max_entries_per_node=8, index_filename=str(tmp_path / 'index.dat'), metric='haversine')
+    records = []
+    for slot in range(500):
+        lat, lon = rng.uniform(-60, 60), rng.uniform(-180, 180)
+        records.append({'mbr': (lat, lon, lat, lon), 'block_id': 1, 'slot': slot})
+        tree.insert(records[-1])
+    points = [(rng.uniform(-60, 60), rng.uniform(-180, 180)) for _ in range(20)]
+    for point, result in zip(points, tree.knn_batch(points, k=3)):
+        expected = sorted(tree.distance(point, record['mbr']) for record in records)[:3]
+        assert [tree.distance(point, entry['mbr']) for entry in result] == pytest.approx(expected)
+        assert not math.isnan(expected[0])
+    tree.close()
+
+
+def test_parallel_batches_need_a_saved_tree(tmp_path):
+    records = box_records(1500, seed=4)
+    tree = RStarTree(max_entries_per_node=8, index_filename=str(tmp_path / 'index.dat'))
+    for record in records:
+        tree.insert(record)
+    windows = [(x / 10, x / 10, x / 10 + 0.2, x / 10 + 0.2) for x in range(8)]
+    # Οι αλλαγές που δεν έχουν αποθηκευτεί δεν αποθηκεύονται σιωπηρά
+    with pytest.raises(ValueError):
+        tree.range_query_batch(windows, processes=2)
+    assert tree.root.page_id is None
+
+    tree.save()
+    expected = [sorted(map(key, result)) for result in tree.range_query_batch(windows)]
+    parallel = tree.range_query_batch(windows, group_size=2, processes=2)
+    assert [sorted(map(key, result)) for result in parallel] == expected
+
+    with tree.worker_pool(2) as pool:
+        for _ in range(2):
+            parallel = tree.range_query_batch(windows, group_size=2, executor=pool)
+            assert [sorted(map(key, result)) for result in parallel] == expected
+        nearest = tree.knn_batch([(0.5, 0.5)], k=3, executor=pool)[0]
+        assert list(map(key, nearest)) == list(map(key, tree.k_nearest_neighbors((0.5, 0.5), 3)))
+
+        # Μετά από νέα save το pool βλέπει την παλιά έκδοση του δέντρου
+        tree.insert({'mbr': (0.5, 0.5, 0.5, 0.5), 'block_id': 2, 'slot': 0})
+        with pytest.raises(ValueError):
+            tree.range_query_batch(windows, executor=pool)
+        tree.save()
+        with pytest.raises(ValueError):
+            tree.range_query_batch(windows, executor=pool)
+    tree.close()
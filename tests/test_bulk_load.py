@@ -0,0 +1,117 @@
+import math
+import random
+
+import pytest
+
+from DataFile import DataFile, DataFileReader
+from RStarTree import RStarTree
+
+
+def point_records(count, seed, block_id=1):
+    rng = random.Random(seed)
+    records = []
+    for slot in range(count):
+        x, y = rng.random(), rng.random()
+        records.append({'mbr': (x, y, x, y), 'block_id': block_id, 'slot': slot})
+    return records
+
+
+def key(record):
+    return (tuple(record['mbr']), record['block_id'], record['slot'])
+
+
+def check_structure(tree, records):
+    leaf_depths = set()
+    leaves = []
+
+    def visit(node, depth):
+        if node.is_leaf:
+            leaf_depths.add(depth)
+            leaves.append(node)
+            return [key(entry) for entry in node.entries]
+        found = []
+        for i in range(len(node)):
+            child = node.child(i)
+            assert node.entry_mbr(i) == child.mbr
+            assert node.counts[i] == child.subtree_count
+            found.extend(visit(child, depth + 1))
+        return found
+
+    assert sorted(visit(tree.root, 0)) == sorted(map(key, records))
+    assert leaf_depths == {tree.height - 1}
+    return leaves
+
+
+def check_queries(tree, records, seed):
+    rng = random.Random(seed)
+    for _ in range(20):
+        x, y = rng.random() * 0.9, rng.random() * 0.9
+        window = (x, y, x + 0.1, y + 0.1)
+        expected = [key(record) for record in records if tree.overlap(record['mbr'], window)]
+        assert sorted(map(key, tree.range_query(window))) == sorted(expected)
+
+        point = (rng.random(), rng.random())
+        expected = sorted(math.dist(point, record['mbr'][:2]) for record in records)[:7]
+        result = tree.k_nearest_neighbors(point, 7)
+        assert [math.dist(point, entry['mbr'][:2]) for entry in result] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('method', ['str', 'hilbert'])
+def test_bulk_load_matches_brute_force(tmp_path, method):
+    index_filename = str(tmp_path / 'index.dat')
+    records = point_records(3000, seed=1)
+    tree = RStarTree.bulk_load(records, max_entries_per_node=8, index_filename=index_filename, method=method)
+    leaves = check_structure(tree, records)
+    # Τα φύλλα γεμίζουν πλήρως (3000 εγγραφές σε 375 φύλλα των 8), οπότε το δέντρο έχει το ελάχιστο ύψος
+    assert len(leaves) == math.ceil(len(records) / tree.max_leaf_entries)
+    assert tree.height == 1 + math.ceil(math.log(len(leaves), tree.max_entries_per_node))
+    check_queries(tree, records, seed=2)
+    tree.close()
+
+    tree = RStarTree.open(index_filename)
+    check_structure(tree, records)
+    check_queries(tree, records, seed=3)
+    # Το δέντρο συνεχίζει κανονικά με εισαγωγές μετά τη μαζική κατασκευή
+    extra = point_records(500, seed=4, block_id=2)
+    for record in extra:
+        tree.insert(record)
+    check_structure(tree, records + extra)
+    check_queries(tree, records + extra, seed=5)
+    tree.close()
+
+
+@pytest.mark.parametrize('method', ['str', 'hilbert'])
+def test_bulk_load_handles_tiny_inputs(tmp_path, method):
+    for count in (0, 1, 7, 8, 9):
+        records = point_records(count, seed=count)
+        tree = RStarTree.bulk_load(records, max_entries_per_node=8, index_filename=str(tmp_path / f'{count}.dat'),
+                                   method=method)
+        assert sorted(map(key, tree.range_query((0, 0, 1, 1)))) == sorted(map(key, records))
+        tree.close()
+
+
+def test_bulk_load_datafile_points_at_the_records(tmp_path):
+    data_filename = str(tmp_path / 'data.dat')
+    rng = random.Random(6)
+    datafile = DataFile(data_filename, encoding='float64')
+    points = [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(2500)]
+    for i, (lat, lon) in enumerate(points):
+        datafile.add_record({'id': i, 'lat': lat, 'lon': lon})
+    datafile.finalize()
+    datafile.close()
+
+    tree = RStarTree.bulk_load_datafile(data_filename, max_entries_per_node=8,
+                                        index_filename=str(tmp_path / 'index.dat'))
+    entries = tree.range_query((-90, -180, 90, 180))
+    assert len(entries) == len(points)
+    with DataFileReader(data_filename) as reader:
+        for entry in entries:
+            record = reader.read_record(entry['block_id'], entry['slot'])
+            assert (record['lat'], record['lon']) == points[record['id']]
+            assert entry['mbr'] == (record['lat'], record['lon'], record['lat'], record['lon'])
+    tree.close()
+
+
+def test_bulk_load_rejects_unknown_methods(tmp_path):
+    with pytest.raises(ValueError):
+        RStarTree.bulk_load([], index_filename=str(tmp_path / 'index.dat'), method='zorder')
@@ -0,0 +1,177 @@
+import math
+import random
+
+import pytest
+
+from RStarTree import RStarTree
+
+
+def point_record(rng, block_id, slot):
+    x, y = rng.random(), rng.random()
+    return {'mbr': (x, y, x, y), 'block_id': block_id, 'slot': slot}
+
+
+def key(record):
+    return (record['mbr'], record['block_id'], record['slot'])
+
+
+def check_invariants(tree, records):
+    leaf_depths = set()
+    leaves = []
+
+    def visit(node, depth):
+        if node.is_leaf:
+            leaf_depths.add(depth)
+            leaves.append(node)
+            return [key(entry) for entry in node.entries]
+        found = []
+        for i in range(len(node)):
+            child = node.child(i)
+            # Κάθε εγγραφή του γονέα έχει ακριβώς το MBR, το πλήθος και τα αθροίσματα του υποκόμβου της
+            assert node.entry_mbr(i) == child.mbr
+            assert node.counts[i] == child.subtree_count
+            assert tuple(node.sums[i * tree.dims:(i + 1) * tree.dims]) == pytest.approx(child.subtree_sums)
+            assert len(child) >= tree._min_entries(child)
+            found.extend(visit(child, depth + 1))
+        return found
+
+    found = visit(tree.root, 0)
+    assert sorted(found) == sorted(key(record) for record in records)
+    assert tree.root.subtree_count == len(records)
+    if records:
+        assert leaf_depths == {tree.height - 1}
+    return leaves
+
+
+def check_queries(tree, records, rng):
+    for _ in range(10):
+        x, y = rng.random() * 0.8, rng.random() * 0.8
+        window = (x, y, x + 0.2, y + 0.2)
+        expected = [key(record) for record in records if tree.overlap(record['mbr'], window)]
+        assert sorted(key(entry) for entry in tree.range_query(window)) == sorted(expected)
+
+        point = (rng.random(), rng.random())
+        k = 5
+        expected = sorted(math.dist(point, record['mbr'][:2]) for record in records)[:k]
+        result = tree.k_nearest_neighbors(point, k)
+        assert [math.dist(point, entry['mbr'][:2]) for entry in result] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('split_policy', ['rstar', 'quadratic', 'linear'])
+@pytest.mark.parametrize('max_entries', [4, 6])
+def test_random_inserts_and_deletes_match_brute_force(tmp_path, split_policy, max_entries):
+    index_filename = str(tmp_path / 'index.dat')
+    rng = random.Random(max_entries * 31 + len(split_policy))
+    tree = RStarTree(max_entries_per_node=max_entries, index_filename=index_filename, split_policy=split_policy)
+    records = []
+    next_slot = 0
+    for step in range(1500):
+        if records and rng.random() < 0.45:
+            record = records.pop(rng.randrange(len(records)))
+            assert tree.delete(record['mbr'], record['block_id'], record['slot'])
+            assert not tree.delete(record['mbr'], record['block_id'], record['slot'])
+        else:
+            record = point_record(rng, 1, next_slot)
+            next_slot += 1
+            tree.insert(record)
+            records.append(record)
+        if step % 300 == 299:
+            check_invariants(tree, records)
+    check_invariants(tree, records)
+    check_queries(tree, records, rng)
+
+    tree.close()
+    tree = RStarTree.open(index_filename)
+    check_invariants(tree, records)
+    check_queries(tree, records, rng)
+
+    # Διαγραφή όλων των εγγραφών μετά το άνοιγμα, ώστε να ελεγχθούν και οι κόμβοι που φορτώνονται από τον δίσκο
+    rng.shuffle(records)
+    while records:
+        record = records.pop()
+        assert tree.delete(record['mbr'], record['block_id'], record['slot'])
+        if len(records) % 200 == 0:
+            check_invariants(tree, records)
+    assert tree.height == 1
+    assert tree.range_query((0, 0, 1, 1)) == []
+    tree.close()
+
+
+def test_delete_matches_the_pointer_of_duplicate_mbrs(tmp_path):
+    tree = RStarTree(max_entries_per_node=4, index_filename=str(tmp_path / 'index.dat'))
+    # Πολλές εγγραφές με το ίδιο MBR, που διαφέρουν μόνο στον δείκτη (block_id, slot)
+    records = [{'mbr': (0.5, 0.5, 0.5, 0.5), 'block_id': block_id, 'slot': slot}
+               for block_id in range(1, 4) for slot in range(10)]
+    rng = random.Random(3)
+    records += [point_record(rng, 9, slot) for slot in range(100)]
+    for record in records:
+        tree.insert(record)
+
+    assert not tree.delete((0.5, 0.5, 0.5, 0.5), 4, 0)
+    assert not tree.delete((0.5, 0.5, 0.5, 0.5), 1, 10)
+    assert tree.delete((0.5, 0.5, 0.5, 0.5), 2, 7)
+    records.remove({'mbr': (0.5, 0.5, 0.5, 0.5), 'block_id': 2, 'slot': 7})
+    check_invariants(tree, records)
+
+    # Χωρίς δείκτη διαγράφεται μία οποιαδήποτε εγγραφή με αυτό το MBR
+    assert tree.delete((0.5, 0.5, 0.5, 0.5))
+    remaining = {key(entry) for entry in tree.range_query((0.5, 0.5, 0.5, 0.5))}
+    assert len(remaining) == 28
+    assert remaining < {key(record) for record in records}
+    tree.close()
+
+
+def test_locator_deletes_match_brute_force(tmp_path):
+    index_filename = str(tmp_path / 'index.dat')
+    rng = random.Random(5)
+    tree = RStarTree(max_entries_per_node=4, index_filename=index_filename)
+    records = [point_record(rng, 1, slot) for slot in range(600)]
+    for record in records:
+        tree.insert(record)
+    tree.close()
+
+    tree = RStarTree.open(index_filename)
+    tree.enable_locator()
+    next_slot = 600
+    for step in range(900):
+        if rng.random() < 0.5:
+            record = records.pop(rng.randrange(len(records)))
+            assert tree.delete(record['mbr'], record['block_id'], record['slot'])
+        else:
+            record = point_record(rng, 1, next_slot)
+            next_slot += 1
+            tree.insert(record)
+            records.append(record)
+        if step % 300 == 299:
+            leaves = {id(leaf) for leaf in check_invariants(tree, records)}
+            # Ο locator δείχνει για κάθε εγγραφή το φύλλο του δέντρου που την περιέχει
+            assert len(tree.locator) == len(records)
+            for (block_id, slot), leaf in tree.locator.items():
+                assert id(leaf) in leaves
+                assert (block_id, slot) in zip(leaf.block_ids, leaf.slots)
+    check_queries(tree, records, rng)
+    tree.close()
+
+
+def test_removing_an_unloaded_child_does_not_read_it(tmp_path):
+    index_filename = str(tmp_path / 'index.dat')
+    rng = random.Random(6)
+    tree = RStarTree(max_entries_per_node=4, index_filename=index_filename)
+    for slot in range(100):
+        tree.insert(point_record(rng, 1, slot))
+    tree.close()
+
+    tree = RStarTree.open(index_filename)
+    root = tree.root
+    assert not root.is_leaf and all(isinstance(child, int) for child in root.children)
+    count = len(root)
+    # Αφαιρείται ο αριθμός σελίδας του υποκόμβου, χωρίς να φορτωθεί ο ίδιος ή τα υπόλοιπα παιδιά
+    assert isinstance(root.remove_entry_at(0), int)
+    assert len(root) == count - 1 == len(root.children) == len(root.counts)
+    assert all(isinstance(child, int) for child in root.children)
+    leaf = root.child(0)
+    while not leaf.is_leaf:
+        leaf = leaf.child(0)
+    removed = leaf.remove_entry_at(0)
+    assert set(removed) == {'mbr', 'block_id', 'slot'} and removed['block_id'] == 1
+    tree.close()
@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+from DataFile import FIXED_SCALE, RECORD_LAYOUTS, DataFile, DataFileReader
+from IndexFile import LEAF_ENCODINGS
+from RStarTree import RStarTree
+
+
+def grid_points(count, seed):
+    # Σημεία πάνω στο πλέγμα 1/FIXED_SCALE, ώστε να αποθηκεύονται ακριβώς με κάθε κωδικοποίηση
+    rng = random.Random(seed)
+    return [(round(rng.uniform(37, 39) * FIXED_SCALE) / FIXED_SCALE,
+             round(rng.uniform(23, 25) * FIXED_SCALE) / FIXED_SCALE) for _ in range(count)]
+
+
+def point_records(points, block_id=1):
+    return [{'mbr': (x, y, x, y), 'block_id': block_id, 'slot': slot} for slot, (x, y) in enumerate(points)]
+
+
+def all_entries(tree):
+    return sorted((entry['mbr'], entry['block_id'], entry['slot']) for entry in tree.range_query((-90, -180, 90, 180)))
+
+
+@pytest.mark.parametrize('leaf_encoding', LEAF_ENCODINGS)
+def test_reopen_keeps_leaf_encoding_and_entries(tmp_path, leaf_encoding):
+    index_filename = str(tmp_path / 'index.dat')
+    first = point_records(grid_points(800, seed=1))
+    tree = RStarTree(max_entries_per_node=8, index_filename=index_filename, leaf_encoding=leaf_encoding)
+    for record in first:
+        tree.insert(record)
+    expected = all_entries(tree)
+    tree.close()
+
+    tree = RStarTree.open(index_filename)
+    assert tree.leaf_encoding == leaf_encoding
+    assert all_entries(tree) == expected
+
+    # Οι αλλαγές μετά το άνοιγμα αποθηκεύονται με την ίδια κωδικοποίηση
+    second = point_records(grid_points(400, seed=2), block_id=2)
+    for record in second:
+        tree.insert(record)
+    for record in first[:200]:
+        assert tree.delete(record['mbr'], record['block_id'], record['slot'])
+    expected = all_entries(tree)
+    tree.close()
+
+    tree = RStarTree.open(index_filename)
+    assert all_entries(tree) == expected
+    assert len(expected) == 1000
+    nearest = tree.k_nearest_neighbors(second[0]['mbr'][:2], 1)
+    assert [(entry['mbr'], entry['block_id'], entry['slot']) for entry in nearest] == [(second[0]['mbr'], 2, 0)]
+
+
+@pytest.mark.parametrize('leaf_encoding', LEAF_ENCODINGS)
+def test_bulk_loaded_index_reopens(tmp_path, leaf_encoding):
+    index_filename = str(tmp_path / 'index.dat')
+    records = point_records(grid_points(1500, seed=3))
+    tree = RStarTree.bulk_load(records, max_entries_per_node=8, index_filename=index_filename,
+                               leaf_encoding=leaf_encoding)
+    expected = all_entries(tree)
+    tree.close()
+    assert all_entries(RStarTree.open(index_filename)) == expected
+
+
+def test_compact_encodings_reject_unencodable_mbrs(tmp_path):
+    tree = RStarTree(max_entries_per_node=8, index_filename=str(tmp_path / 'point.dat'), leaf_encoding='point')
+    with pytest.raises(ValueError):
+        tree.insert({'mbr': (0.0, 0.0, 1.0, 1.0), 'block_id': 1, 'slot': 0})
+    tree = RStarTree(max_entries_per_node=8, index_filename=str(tmp_path / 'delta.dat'), leaf_encoding='delta')
+    with pytest.raises(ValueError):
+        tree.insert({'mbr': (0.123456789, 0.5, 0.123456789, 0.5), 'block_id': 1, 'slot': 0})
+
+
+@pytest.mark.parametrize('encoding', sorted(RECORD_LAYOUTS))
+def test_datafile_reopen_across_encodings(tmp_path, encoding):
+    data_filename = str(tmp_path / 'data.dat')
+    points = grid_points(5000, seed=4)
+    datafile = DataFile(data_filename, encoding=encoding)
+    for i, (lat, lon) in enumerate(points[:3000]):
+        datafile.add_record({'id': i, 'lat': lat, 'lon': lon})
+    datafile.finalize()
+    datafile.close()
+
+    # Ένα υπάρχον αρχείο συνεχίζει με την κωδικοποίηση του block0, όποια κι αν ζητηθεί
+    other = 'float64' if encoding != 'float64' else 'fixed'
+    datafile = DataFile(data_filename, create=False, encoding=other)
+    assert datafile.format.encoding == encoding
+    for i, (lat, lon) in enumerate(points[3000:], start=3000):
+        datafile.add_record({'id': i, 'lat': lat, 'lon': lon})
+    datafile.finalize()
+    datafile.close()
+
+    tolerance = 1e-4 if encoding == 'float32' else 1e-9
+    with DataFileReader(data_filename) as reader:
+        assert len(reader) == 5000
+        assert reader.format.encoding == encoding
+        records_per_block = reader.format.records_per_block
+        for i, (lat, lon) in enumerate(points):
+            record = reader.read_record(i // records_per_block + 1, i % records_per_block)
+            assert record['id'] == i
+            assert record['lat'] == pytest.approx(lat, abs=tolerance)
+            assert record['lon'] == pytest.approx(lon, abs=tolerance)
@@ -0,0 +1,119 @@
+import math
+import random
+
+import pytest
+
+from MBRKernels import EARTH_RADIUS_KM, geodesic_bounding_box, geodesic_min_distances, haversine
+from RStarTree import RStarTree
+
+
+def world_points(count, seed):
+    rng = random.Random(seed)
+    points = []
+    for _ in range(count):
+        # Και σημεία κοντά στους πόλους και στον αντιμεσημβρινό
+        lat = rng.choice([rng.uniform(-90, 90), rng.uniform(80, 90), rng.uniform(-90, -80)])
+        lon = rng.choice([rng.uniform(-180, 180), rng.uniform(170, 180), rng.uniform(-180, -170)])
+        points.append((lat, lon))
+    return points
+
+
+def test_haversine_known_distances():
+    assert haversine(0, 0, 0, 1) == pytest.approx(math.radians(EARTH_RADIUS_KM))
+    assert haversine(0, 0, 0, 180) == pytest.approx(math.pi * EARTH_RADIUS_KM)
+    assert haversine(90, 0, -90, 0) == pytest.approx(math.pi * EARTH_RADIUS_KM)
+    # Ο αντιμεσημβρινός δεν είναι σύνορο
+    assert haversine(10, 179.5, 10, -179.5) == pytest.approx(haversine(10, -0.5, 10, 0.5))
+    assert haversine(51.5074, -0.1278, 48.8566, 2.3522) == pytest.approx(343.5, abs=1)
+
+
+def test_haversine_knn_matches_brute_force(tmp_path):
+    points = world_points(1500, seed=1)
+    tree = RStarTree(max_entries_per_node=8, index_filename=str(tmp_path / 'index.dat'), metric='haversine')
+    for slot, (lat, lon) in enumerate(points):
+        tree.insert({'mbr': (lat, lon, lat, lon), 'block_id': 1, 'slot': slot})
+    for query in world_points(60, seed=2):
+        for k in (1, 10):
+            expected = sorted(haversine(*query, *point) for point in points)[:k]
+            result = tree.k_nearest_neighbors(query, k)
+            assert [haversine(*query, *entry['mbr'][:2]) for entry in result] == pytest.approx(expected)
+    tree.close()
+
+
+def test_geodesic_min_distance_is_a_tight_lower_bound():
+    rng = random.Random(3)
+    for _ in range(200):
+        lat, lon = rng.uniform(-80, 70), rng.uniform(-180, 160)
+        box = (lat, lon, lat + rng.uniform(0, 10), lon + rng.uniform(0, 20))
+        query = (rng.uniform(-90, 90), rng.uniform(-180, 180))
+        mindist = geodesic_min_distances(box, query)[0]
+        if box[0] <= query[0] <= box[2] and box[1] <= query[1] <= box[3]:
+            assert mindist == 0
+            continue
+        # Για ένα σημείο έξω από το MBR το πλησιέστερο σημείο του βρίσκεται στο περίγραμμα
+        steps = [t / 400 for t in range(401)]
+        samples = ([(box[0] + (box[2] - box[0]) * t, box[1]) for t in steps] +
+                   [(box[0] + (box[2] - box[0]) * t, box[3]) for t in steps] +
+                   [(box[0], box[1] + (box[3] - box[1]) * t) for t in steps] +
+                   [(box[2], box[1] + (box[3] - box[1]) * t) for t in steps])
+        nearest = min(haversine(*query, *sample) for sample in samples)
+        assert mindist <= nearest + 1e-6
+        assert nearest - mindist <= 0.001 * nearest + 1
+
+
+def test_geodesic_bounding_box_contains_the_circle():
+    rng = random.Random(4)
+    for _ in range(100):
+        center = (rng.uniform(-89, 89), rng.uniform(-180, 180))
+        radius = rng.choice([10, 500, 3000])
+        box = geodesic_bounding_box(center, radius)
+        delta = math.degrees(radius / EARTH_RADIUS_KM)
+        spread = min(180.0, 3 * delta / max(math.cos(math.radians(center[0])), 0.01))
+        inside = 0
+        for _ in range(400):
+            # Σημεία γύρω από το κέντρο, με γεωγραφικό μήκος στο [-180, 180]
+            lat = max(-90.0, min(90.0, center[0] + rng.uniform(-1.2, 1.2) * delta))
+            lon = (center[1] + rng.uniform(-spread, spread) + 180.0) % 360.0 - 180.0
+            if haversine(*center, lat, lon) <= radius:
+                inside += 1
+                assert box[0] <= lat <= box[2] and box[1] <= lon <= box[3]
+        assert inside
+
+
+@pytest.mark.parametrize('dims', [3, 4])
+def test_n_dimensional_queries_match_brute_force(tmp_path, dims):
+    rng = random.Random(dims)
+    records = []
+    tree = RStarTree(max_entries_per_node=6, index_filename=str(tmp_path / 'index.dat'), dims=dims)
+    for slot in range(1200):
+        low = tuple(rng.random() for _ in range(dims))
+        high = tuple(value + rng.random() * 0.05 for value in low)
+        records.append({'mbr': low + high, 'block_id': 1, 'slot': slot})
+        tree.insert(records[-1])
+
+    def overlaps(mbr, window):
+        return all(mbr[d] <= window[dims + d] and window[d] <= mbr[dims + d] for d in range(dims))
+
+    def distance(point, mbr):
+        return math.dist(point, [min(max(value, mbr[d]), mbr[dims + d]) for d, value in enumerate(point)])
+
+    for _ in range(30):
+        low = tuple(rng.random() * 0.7 for _ in range(dims))
+        window = low + tuple(value + 0.3 for value in low)
+        expected = sorted(r['slot'] for r in records if overlaps(r['mbr'], window))
+        assert sorted(entry['slot'] for entry in tree.range_query(window)) == expected
+        assert tree.range_count(window) == len(expected)
+
+        point = tuple(rng.random() for _ in range(dims))
+        expected = sorted(distance(point, r['mbr']) for r in records)[:5]
+        assert [distance(point, e['mbr']) for e in tree.k_nearest_neighbors(point, 5)] == pytest.approx(expected)
+    tree.close()
+
+
+def test_invalid_metric_and_dimension_combinations(tmp_path):
+    with pytest.raises(ValueError):
+        RStarTree(index_filename=str(tmp_path / 'a.dat'), dims=3, metric='haversine')
+    with pytest.raises(ValueError):
+        RStarTree(index_filename=str(tmp_path / 'b.dat'), metric='manhattan')
+    with pytest.raises(ValueError):
+        RStarTree(index_filename=str(tmp_path / 'c.dat'), dims=1)
@@ -0,0 +1,59 @@
+import os
+import random
+
+from RStarTree import RStarTree
+
+
+def point_record(rng, block_id, slot):
+    x, y = rng.random(), rng.random()
+    return {'mbr': (x, y, x, y), 'block_id': block_id, 'slot': slot}
+
+
+def test_pages_replaced_by_saves_are_reused_after_reopen(tmp_path):
+    index_filename = str(tmp_path / 'index.dat')
+    rng = random.Random(11)
+    tree = RStarTree(max_entries_per_node=8, index_filename=index_filename)
+    records = [point_record(rng, 1, slot) for slot in range(2000)]
+    for record in records:
+        tree.insert(record)
+    tree.close()
+
+    sizes = []
+    for cycle in range(12):
+        tree = RStarTree.open(index_filename)
+        # Κάθε κύκλος αντικαθιστά εγγραφές, οπότε το πλήθος των κόμβων μένει περίπου σταθερό
+        for slot in range(50):
+            record = records[cycle * 50 + slot]
+            assert tree.delete(record['mbr'], record['block_id'], record['slot'])
+            tree.insert(point_record(rng, 2 + cycle, slot))
+        tree.close()
+        sizes.append(os.path.getsize(index_filename))
+
+    # Το shadow paging χρειάζεται ένα δεύτερο αντίγραφο των σελίδων που αλλάζουν, όχι ένα νέο ανά κύκλο
+    assert sizes[-1] < 1.2 * sizes[0], sizes
+    tree = RStarTree.open(index_filename)
+    assert len(tree.range_query((0, 0, 1, 1))) == 2000
+    index_file = tree.index_file
+    index_file.allocate_page()
+    reachable = index_file.page_count - 1 - len(index_file.free_pages)
+    assert len(index_file.free_pages) < reachable
+
+
+def test_repeated_small_saves_stop_growing_the_file(tmp_path):
+    index_filename = str(tmp_path / 'index.dat')
+    rng = random.Random(12)
+    tree = RStarTree(max_entries_per_node=8, index_filename=index_filename)
+    for slot in range(500):
+        tree.insert(point_record(rng, 1, slot))
+    tree.close()
+    sizes = []
+    for slot in range(8):
+        tree = RStarTree.open(index_filename)
+        tree.insert(point_record(rng, 2, slot))
+        tree.close()
+        sizes.append(os.path.getsize(index_filename))
+    # Μετά τις πρώτες αποθηκεύσεις οι σελίδες του μονοπατιού εναλλάσσονται ανάμεσα σε δύο αντίγραφα
+    assert sizes[-1] == sizes[3], sizes
+    tree = RStarTree.open(index_filename)
+    tree.close()
+    assert os.path.getsize(index_filename) == sizes[-1]
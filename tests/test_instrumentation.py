@@ -0,0 +1,76 @@
+import random
+import threading
+
+from Instrumentation import COUNTERS, MemorySink, PrometheusSink
+from RStarTree import RStarTree
+
+
+def make_tree(tmp_path, name='index.dat'):
+    rng = random.Random(5)
+    tree = RStarTree(max_entries_per_node=8, index_filename=str(tmp_path / name))
+    for slot in range(300):
+        x, y = rng.random(), rng.random()
+        tree.insert({'mbr': (x, y, x, y), 'block_id': 1, 'slot': slot})
+    return tree
+
+
+def test_counters_are_disabled_without_sink(tmp_path):
+    tree = make_tree(tmp_path)
+    tree.range_query((0, 0, 1, 1))
+    tree.k_nearest_neighbors((0.5, 0.5), 5)
+    assert tree.node_visits == 0 and tree.entries_tested == 0
+
+    tree.counters_enabled = True
+    tree.range_query((0.2, 0.2, 0.6, 0.6))
+    assert tree.node_visits > 0 and tree.entries_tested > 0
+
+
+def test_generator_apis_are_recorded_when_finished(tmp_path):
+    tree = make_tree(tmp_path)
+    other = make_tree(tmp_path, 'other.dat')
+    sink = MemorySink()
+    tree.stats_sink = sink
+    assert tree.counters_enabled
+
+    results = tree.range_iter((0, 0, 0.5, 0.5))
+    assert 'search' not in sink.operations
+    list(results)
+    list(tree.skyline_iter())
+    list(tree.spatial_join(other))
+    list(tree.distance_join(other, 0.01))
+
+    nearest = tree.nearest_iter((0.5, 0.5))
+    next(nearest)
+    nearest.close()  # Ένας generator που σταματά νωρίς καταγράφεται όταν κλείσει
+
+    summary = sink.summary()
+    assert summary['search']['count'] == 1 and summary['search']['node_visits'] > 0
+    assert summary['skyline']['count'] == 1
+    assert summary['join']['count'] == 2
+    assert summary['nearest']['count'] == 1 and summary['nearest']['node_visits'] > 0
+
+    tree.stats_sink = None
+    assert not tree.counters_enabled
+
+
+def test_prometheus_sink_writes_once_per_batch_across_threads(tmp_path):
+    sink = PrometheusSink(str(tmp_path / 'rstar.prom'), write_every=100)
+    writes = []
+    write = sink._write
+    sink._write = lambda: (writes.append(1), write())
+
+    def record():
+        for _ in range(500):
+            sink.record('search', 1e-4, dict.fromkeys(COUNTERS, 1))
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(writes) == 40
+    assert sink.unwritten == 0
+    sink.close()
+    with open(tmp_path / 'rstar.prom') as f:
+        assert 'rstar_operation_seconds_count{op="search"} 4000' in f.read()
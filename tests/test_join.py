@@ -0,0 +1,75 @@
+import math
+import random
+
+import pytest
+
+from RStarTree import RStarTree
+
+
+def box_records(count, seed, size, block_id):
+    rng = random.Random(seed)
+    records = []
+    for slot in range(count):
+        x, y = rng.random(), rng.random()
+        records.append({'mbr': (x, y, x + rng.random() * size, y + rng.random() * size),
+                        'block_id': block_id, 'slot': slot})
+    return records
+
+
+def gap(mbr_a, mbr_b):
+    # Η ελάχιστη απόσταση δύο ορθογωνίων
+    return math.hypot(*(max(0.0, mbr_b[d] - mbr_a[d + 2], mbr_a[d] - mbr_b[d + 2]) for d in range(2)))
+
+
+def build(tmp_path, name, records, max_entries):
+    tree = RStarTree(max_entries_per_node=max_entries, index_filename=str(tmp_path / name))
+    for record in records:
+        tree.insert(record)
+    return tree
+
+
+def pair_keys(pairs):
+    keys = [(a['block_id'], a['slot'], b['block_id'], b['slot']) for a, b in pairs]
+    # Κάθε ζεύγος επιστρέφεται μία μόνο φορά
+    assert len(keys) == len(set(keys))
+    return sorted(keys)
+
+
+def brute_pairs(records_a, records_b, epsilon):
+    return sorted((a['block_id'], a['slot'], b['block_id'], b['slot'])
+                  for a in records_a for b in records_b if gap(a['mbr'], b['mbr']) <= epsilon)
+
+
+# Δέντρα με διαφορετικό πλήθος εγγραφών και μέγεθος κόμβων, ώστε να έχουν και διαφορετικό ύψος
+@pytest.mark.parametrize('sizes', [(600, 600), (900, 40), (5, 700)])
+def test_spatial_join_matches_brute_force(tmp_path, sizes):
+    records_a = box_records(sizes[0], seed=1, size=0.03, block_id=1)
+    records_b = box_records(sizes[1], seed=2, size=0.03, block_id=2)
+    tree_a = build(tmp_path, 'a.dat', records_a, 4)
+    tree_b = build(tmp_path, 'b.dat', records_b, 8)
+    assert tree_a.height != tree_b.height or sizes[0] == sizes[1]
+    assert pair_keys(tree_a.spatial_join(tree_b)) == brute_pairs(records_a, records_b, 0.0)
+    flipped = [(b, a) for a, b in tree_b.spatial_join(tree_a)]
+    assert pair_keys(flipped) == brute_pairs(records_a, records_b, 0.0)
+    tree_a.close()
+    tree_b.close()
+
+
+@pytest.mark.parametrize('epsilon', [0.005, 0.02, 0.1])
+def test_distance_join_matches_brute_force(tmp_path, epsilon):
+    records_a = box_records(500, seed=3, size=0.0, block_id=1)
+    records_b = box_records(400, seed=4, size=0.01, block_id=2)
+    tree_a = build(tmp_path, 'a.dat', records_a, 6)
+    tree_b = build(tmp_path, 'b.dat', records_b, 6)
+    assert pair_keys(tree_a.distance_join(tree_b, epsilon)) == brute_pairs(records_a, records_b, epsilon)
+    tree_a.close()
+    tree_b.close()
+
+
+def test_join_with_an_empty_tree(tmp_path):
+    tree_a = build(tmp_path, 'a.dat', box_records(50, seed=5, size=0.1, block_id=1), 4)
+    tree_b = build(tmp_path, 'b.dat', [], 4)
+    assert list(tree_a.spatial_join(tree_b)) == []
+    assert list(tree_b.distance_join(tree_a, 0.5)) == []
+    tree_a.close()
+    tree_b.close()
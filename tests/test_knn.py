@@ -0,0 +1,87 @@
+import itertools
+import math
+import random
+
+import pytest
+
+from RStarTree import RStarTree
+
+
+def box_records(count, seed, size=0.0):
+    rng = random.Random(seed)
+    records = []
+    for slot in range(count):
+        x, y = rng.random(), rng.random()
+        records.append({'mbr': (x, y, x + rng.random() * size, y + rng.random() * size), 'block_id': 1, 'slot': slot})
+    return records
+
+
+def brute_distance(point, mbr):
+    # Απόσταση από το πλησιέστερο σημείο του ορθογωνίου
+    return math.dist(point, [min(max(value, mbr[d]), mbr[d + 2]) for d, value in enumerate(point)])
+
+
+@pytest.fixture(params=[0.0, 0.03], ids=['points', 'boxes'])
+def loaded(tmp_path, request):
+    records = box_records(2000, seed=1, size=request.param)
+    tree = RStarTree(max_entries_per_node=8, index_filename=str(tmp_path / 'index.dat'))
+    for record in records:
+        tree.insert(record)
+    yield tree, records
+    tree.close()
+
+
+def test_knn_matches_brute_force(loaded):
+    tree, records = loaded
+    rng = random.Random(2)
+    for _ in range(50):
+        # Και σημεία έξω από την έκταση των δεδομένων
+        point = (rng.uniform(-0.5, 1.5), rng.uniform(-0.5, 1.5))
+        k = rng.choice([1, 2, 5, 16, 50])
+        expected = sorted(brute_distance(point, record['mbr']) for record in records)[:k]
+        result = tree.k_nearest_neighbors(point, k)
+        assert [brute_distance(point, entry['mbr']) for entry in result] == pytest.approx(expected)
+
+
+def test_knn_returns_everything_when_k_exceeds_the_size(tmp_path):
+    records = box_records(30, seed=3)
+    tree = RStarTree(max_entries_per_node=4, index_filename=str(tmp_path / 'index.dat'))
+    for record in records:
+        tree.insert(record)
+    result = tree.k_nearest_neighbors((0.5, 0.5), 100)
+    assert sorted(entry['slot'] for entry in result) == list(range(30))
+    assert tree.k_nearest_neighbors((0.5, 0.5), 0) == []
+    tree.close()
+
+
+def test_nearest_iter_yields_every_record_in_distance_order(loaded):
+    tree, records = loaded
+    point = (0.3, 0.7)
+    distances = [distance for distance, _ in tree.nearest_iter(point)]
+    assert distances == pytest.approx(sorted(brute_distance(point, record['mbr']) for record in records))
+
+    # Ο καλών μπορεί να σταματήσει ή να φιλτράρει χωρίς νέα αναζήτηση
+    odd = (entry for _, entry in tree.nearest_iter(point) if entry['slot'] % 2)
+    odd = [entry['slot'] for entry in itertools.islice(odd, 10)]
+    expected = sorted((brute_distance(point, r['mbr']), r['slot']) for r in records if r['slot'] % 2)[:10]
+    assert odd == [slot for _, slot in expected]
+
+
+def test_minmax_distance_bounds_the_nearest_entry_of_every_node(loaded):
+    tree, _ = loaded
+    rng = random.Random(4)
+    nodes = []
+    stack = [tree.root]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        if not node.is_leaf:
+            stack.extend(node.child(i) for i in range(len(node)))
+
+    for _ in range(20):
+        point = (rng.uniform(-0.5, 1.5), rng.uniform(-0.5, 1.5))
+        for node in nodes:
+            # MINDIST <= απόσταση της πλησιέστερης εγγραφής <= MINMAXDIST
+            nearest = min(tree.distance_to_mbr(point, node.entry_mbr(i)) for i in range(len(node)))
+            assert tree.distance_to_mbr(point, node.mbr) <= nearest + 1e-12
+            assert nearest <= tree.minmax_distance(point, node.mbr) + 1e-12
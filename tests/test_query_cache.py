@@ -0,0 +1,123 @@
+import math
+import random
+
+import pytest
+
+from QueryCache import QueryCache
+from RStarTree import RStarTree
+
+
+def point_record(x, y, slot, block_id=1):
+    return {'mbr': (x, y, x, y), 'block_id': block_id, 'slot': slot}
+
+
+def key(record):
+    return (record['mbr'], record['block_id'], record['slot'])
+
+
+@pytest.fixture
+def tree(tmp_path):
+    rng = random.Random(8)
+    tree = RStarTree(max_entries_per_node=8, index_filename=str(tmp_path / 'index.dat'))
+    for slot in range(300):
+        tree.insert(point_record(rng.random(), rng.random(), slot))
+    tree.query_cache = QueryCache(1024 * 1024)
+    yield tree
+    tree.close()
+
+
+def test_changes_inside_a_cached_window_invalidate_it(tree):
+    cache = tree.query_cache
+    window = (0.2, 0.2, 0.4, 0.4)
+    before = tree.range_query(window)
+    tree.insert(point_record(0.3, 0.3, 1000))
+    after = tree.range_query(window)
+    assert cache.stats()['invalidations'] == 1
+    assert cache.stats()['hits'] == 0
+    assert sorted(map(key, after)) == sorted(map(key, before + [point_record(0.3, 0.3, 1000)]))
+
+    assert tree.delete((0.3, 0.3, 0.3, 0.3), 1, 1000)
+    assert sorted(map(key, tree.range_query(window))) == sorted(map(key, before))
+    assert cache.stats()['invalidations'] == 2
+    assert cache.stats()['hits'] == 0
+
+
+def test_changes_outside_a_cached_window_keep_it(tree):
+    cache = tree.query_cache
+    window = (0.2, 0.2, 0.4, 0.4)
+    before = tree.range_query(window)
+    outside = tree.range_query((0.7, 0.7, 0.9, 0.9))
+    tree.insert(point_record(0.8, 0.8, 1000))
+    victim = outside[0]
+    assert tree.delete(victim['mbr'], victim['block_id'], victim['slot'])
+    assert tree.range_query(window) == before
+    assert cache.stats()['hits'] == 1
+    # Ακυρώθηκε μόνο το παράθυρο που περιέχει τις αλλαγές
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_knn_results_are_invalidated_only_inside_their_sphere(tree):
+    cache = tree.query_cache
+    point = (0.5, 0.5)
+    neighbors = tree.k_nearest_neighbors(point, 3)
+    radius = math.dist(point, neighbors[-1]['mbr'][:2])
+    # Εισαγωγή έξω από τη σφαίρα (και έξω από το MBR της) δεν αλλάζει το αποτέλεσμα
+    tree.insert(point_record(0.5 + 2 * radius, 0.5, 1000))
+    assert tree.k_nearest_neighbors(point, 3) == neighbors
+    assert cache.stats()['hits'] == 1
+
+    tree.insert(point_record(0.5, 0.5, 1001))
+    result = tree.k_nearest_neighbors(point, 3)
+    assert cache.stats()['hits'] == 1
+    assert key(result[0]) == key(point_record(0.5, 0.5, 1001))
+    assert list(map(key, result[1:])) == list(map(key, neighbors[:2]))
+
+
+def test_short_knn_results_are_invalidated_by_any_insert(tmp_path):
+    tree = RStarTree(max_entries_per_node=4, index_filename=str(tmp_path / 'index.dat'))
+    for slot, (x, y) in enumerate([(0.1, 0.1), (0.2, 0.2)]):
+        tree.insert(point_record(x, y, slot))
+    tree.query_cache = QueryCache(1024 * 1024)
+    assert len(tree.k_nearest_neighbors((0.1, 0.1), 5)) == 2
+    # Με λιγότερους από k γείτονες, ακόμα και μια πολύ μακρινή εισαγωγή αλλάζει το αποτέλεσμα
+    tree.insert(point_record(1e6, -1e6, 2))
+    result = tree.k_nearest_neighbors((0.1, 0.1), 5)
+    assert [entry['slot'] for entry in result] == [0, 1, 2]
+    assert tree.query_cache.stats()['hits'] == 0
+    tree.close()
+
+
+def test_cached_results_match_uncached_results_after_random_writes(tree):
+    rng = random.Random(21)
+    records = tree.range_query((0, 0, 1, 1))
+    cache = tree.query_cache
+    windows = []
+    for _ in range(8):
+        x, y = rng.random() * 0.8, rng.random() * 0.8
+        windows.append((x, y, x + 0.2, y + 0.2))
+    points = [(rng.random(), rng.random()) for _ in range(8)]
+    next_slot = 1000
+    for _ in range(400):
+        if rng.random() < 0.4:
+            if rng.random() < 0.5:
+                record = records.pop(rng.randrange(len(records)))
+                assert tree.delete(record['mbr'], record['block_id'], record['slot'])
+            else:
+                record = point_record(rng.random(), rng.random(), next_slot)
+                next_slot += 1
+                tree.insert(record)
+                records.append(record)
+        elif rng.random() < 0.5:
+            window = rng.choice(windows)
+            expected = tree.search(tree.root, window)
+            assert sorted(map(key, tree.range_query(window))) == sorted(map(key, expected))
+            assert sorted(map(key, expected)) == sorted(
+                key(record) for record in records if tree.overlap(record['mbr'], window))
+        else:
+            point = rng.choice(points)
+            k = rng.choice([1, 4, 10])
+            expected = sorted(math.dist(point, record['mbr'][:2]) for record in records)[:k]
+            result = tree.k_nearest_neighbors(point, k)
+            assert [math.dist(point, entry['mbr'][:2]) for entry in result] == pytest.approx(expected)
+    stats = cache.stats()
+    assert stats['hits'] > 0 and stats['invalidations'] > 0
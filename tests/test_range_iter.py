@@ -0,0 +1,83 @@
+import itertools
+import random
+
+import pytest
+
+from QueryCache import QueryCache
+from RStarTree import RStarTree
+
+
+def box_records(count, seed, size=0.02):
+    rng = random.Random(seed)
+    records = []
+    for slot in range(count):
+        x, y = rng.random(), rng.random()
+        records.append({'mbr': (x, y, x + rng.random() * size, y + rng.random() * size), 'block_id': 1, 'slot': slot})
+    return records
+
+
+def key(record):
+    return (tuple(record['mbr']), record['block_id'], record['slot'])
+
+
+@pytest.fixture
+def loaded(tmp_path):
+    records = box_records(3000, seed=1)
+    tree = RStarTree(max_entries_per_node=8, index_filename=str(tmp_path / 'index.dat'))
+    for record in records:
+        tree.insert(record)
+    yield tree, records
+    tree.close()
+
+
+def brute_range(tree, records, window):
+    return sorted(key(record) for record in records if tree.overlap(record['mbr'], window))
+
+
+def test_range_iter_matches_brute_force(loaded):
+    tree, records = loaded
+    rng = random.Random(2)
+    for _ in range(40):
+        x, y = rng.uniform(-0.1, 1), rng.uniform(-0.1, 1)
+        window = (x, y, x + rng.random() * 0.3, y + rng.random() * 0.3)
+        found = [key(entry) for entry in tree.range_iter(window)]
+        assert len(found) == len(set(found))
+        assert sorted(found) == brute_range(tree, records, window)
+
+
+def test_range_iter_limit_returns_a_subset(loaded):
+    tree, records = loaded
+    window = (0.2, 0.2, 0.7, 0.7)
+    expected = set(brute_range(tree, records, window))
+    for limit in (0, 1, 10, len(expected), len(expected) + 5):
+        found = [key(entry) for entry in tree.range_iter(window, limit=limit)]
+        assert len(found) == min(limit, len(expected))
+        assert set(found) <= expected
+
+
+def test_range_iter_stops_early(loaded):
+    tree, _ = loaded
+    tree.counters_enabled = True
+    window = (0, 0, 1, 1)
+    list(tree.range_iter(window))
+    full = tree.node_visits
+    tree.node_visits = 0
+    # Μόνο οι πρώτες εγγραφές: διαβάζεται μόνο η διαδρομή μέχρι το πρώτο φύλλο και λίγα ακόμα
+    first = list(itertools.islice(tree.range_iter(window), 5))
+    assert len(first) == 5
+    assert tree.node_visits <= tree.height + 5
+    assert tree.node_visits < full / 10
+
+
+def test_range_iter_with_the_query_cache(loaded):
+    tree, records = loaded
+    tree.query_cache = QueryCache(1024 * 1024)
+    window = (0.3, 0.3, 0.5, 0.5)
+    expected = brute_range(tree, records, window)
+    # Με όριο το αποτέλεσμα δεν αποθηκεύεται, χωρίς όριο αποθηκεύεται και το επόμενο όριο το χρησιμοποιεί
+    assert len(list(tree.range_iter(window, limit=3))) == 3
+    assert tree.query_cache.stats()['entries'] == 0
+    assert sorted(key(entry) for entry in tree.range_iter(window)) == expected
+    limited = [key(entry) for entry in tree.range_iter(window, limit=3)]
+    assert tree.query_cache.stats()['hits'] == 1
+    assert len(limited) == 3 and set(limited) <= set(expected)
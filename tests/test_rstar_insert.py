@@ -0,0 +1,172 @@
+import math
+import random
+
+import pytest
+
+from Node import Node, mbr_area, mbr_margin, mbr_union, overlap_area
+from RStarTree import RStarTree
+
+
+def point_records(count, seed, block_id=1):
+    rng = random.Random(seed)
+    records = []
+    for slot in range(count):
+        x, y = rng.random(), rng.random()
+        records.append({'mbr': (x, y, x, y), 'block_id': block_id, 'slot': slot})
+    return records
+
+
+def box_records(count, seed):
+    rng = random.Random(seed)
+    records = []
+    for slot in range(count):
+        x, y = rng.random(), rng.random()
+        records.append({'mbr': (x, y, x + rng.random() * 0.05, y + rng.random() * 0.05), 'block_id': 1, 'slot': slot})
+    return records
+
+
+def key(record):
+    return (tuple(record['mbr']), record['block_id'], record['slot'])
+
+
+def union_all(mbrs):
+    result = mbrs[0]
+    for mbr in mbrs[1:]:
+        result = mbr_union(result, mbr)
+    return result
+
+
+def leaf_node(mbrs):
+    node = Node(is_leaf=True, max_entries=len(mbrs) - 1)
+    for slot, mbr in enumerate(mbrs):
+        node.add_entry({'mbr': mbr, 'block_id': 1, 'slot': slot})
+    return node
+
+
+def check_structure(tree, records):
+    leaf_depths = set()
+
+    def visit(node, depth):
+        if node.is_leaf:
+            leaf_depths.add(depth)
+            return [key(entry) for entry in node.entries]
+        found = []
+        for i in range(len(node)):
+            child = node.child(i)
+            assert node.entry_mbr(i) == child.mbr
+            assert node.counts[i] == child.subtree_count
+            assert tree._min_entries(child) <= len(child) <= child.max_entries
+            found.extend(visit(child, depth + 1))
+        return found
+
+    assert sorted(visit(tree.root, 0)) == sorted(map(key, records))
+    assert leaf_depths == {tree.height - 1}
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_rstar_split_picks_the_best_distribution(seed):
+    mbrs = [rec['mbr'] for rec in box_records(9, seed)]
+    min_entries = 3
+    group1, group2 = Node._rstar_split(mbrs, min_entries)
+    assert sorted(group1 + group2) == list(range(len(mbrs)))
+    assert min(len(group1), len(group2)) >= min_entries
+
+    # Εξαντλητικά όλες οι κατανομές των ταξινομήσεων κάθε άξονα (κατά κάτω και κατά πάνω όριο)
+    margins = {}
+    candidates = {}
+    for axis in range(2):
+        margins[axis] = 0.0
+        candidates[axis] = []
+        for bound in (axis, axis + 2):
+            ordered = sorted(range(len(mbrs)), key=lambda i: (mbrs[i][bound], mbrs[i][(bound + 2) % 4]))
+            for k in range(min_entries, len(mbrs) - min_entries + 1):
+                left = union_all([mbrs[i] for i in ordered[:k]])
+                right = union_all([mbrs[i] for i in ordered[k:]])
+                margins[axis] += mbr_margin(left) + mbr_margin(right)
+                candidates[axis].append((overlap_area(left, right), mbr_area(left) + mbr_area(right)))
+    axis = min(margins, key=margins.get)
+    left = union_all([mbrs[i] for i in group1])
+    right = union_all([mbrs[i] for i in group2])
+    assert (overlap_area(left, right), mbr_area(left) + mbr_area(right)) == pytest.approx(min(candidates[axis]))
+
+
+@pytest.mark.parametrize('policy', ['rstar', 'quadratic', 'linear'])
+def test_every_split_policy_partitions_the_node(policy):
+    for seed in range(20):
+        mbrs = [rec['mbr'] for rec in box_records(9, seed)]
+        node = leaf_node(mbrs)
+        node1, node2 = node.split(policy, min_entries=3)
+        assert sorted(map(key, node1.entries + node2.entries)) == sorted(map(key, node.entries))
+        assert min(len(node1), len(node2)) >= 3
+        for part in (node1, node2):
+            assert part.mbr == union_all([entry['mbr'] for entry in part.entries])
+
+
+def test_least_overlap_child_matches_brute_force(tmp_path):
+    tree = RStarTree(max_entries_per_node=8, index_filename=str(tmp_path / 'index.dat'))
+    for record in box_records(400, seed=3):
+        tree.insert(record)
+    rng = random.Random(4)
+    parents = []
+    stack = [tree.root]
+    while stack:
+        node = stack.pop()
+        if not node.is_leaf:
+            if node.child(0).is_leaf:
+                parents.append(node)
+            else:
+                stack.extend(node.child(i) for i in range(len(node)))
+
+    def cost(node, i, mbr):
+        child_mbr = node.entry_mbr(i)
+        grown = mbr_union(child_mbr, mbr)
+        others = [node.entry_mbr(j) for j in range(len(node)) if j != i]
+        overlap_increase = sum(overlap_area(grown, other) - overlap_area(child_mbr, other) for other in others)
+        return overlap_increase, mbr_area(grown) - mbr_area(child_mbr)
+
+    for _ in range(200):
+        node = rng.choice(parents)
+        x, y = rng.random(), rng.random()
+        mbr = (x, y, x + 0.01, y + 0.01)
+        chosen = node.index_of_child(tree.least_overlap_child(node, mbr))
+        inside = [i for i in range(len(node)) if mbr_union(node.entry_mbr(i), mbr) == node.entry_mbr(i)]
+        if inside:
+            # Ένα παιδί που περιέχει ήδη το MBR δεν αλλάζει την επικάλυψη: επιλέγεται το μικρότερο
+            assert chosen in inside
+            assert mbr_area(node.entry_mbr(chosen)) == min(mbr_area(node.entry_mbr(i)) for i in inside)
+        else:
+            best = min(cost(node, i, mbr) for i in range(len(node)))
+            assert cost(node, chosen, mbr) == pytest.approx(best, abs=1e-12)
+    tree.close()
+
+
+@pytest.mark.parametrize('records', [point_records(3000, seed=5), box_records(2000, seed=6)])
+def test_rstar_inserts_split_and_reinsert_and_match_brute_force(tmp_path, records):
+    tree = RStarTree(max_entries_per_node=6, index_filename=str(tmp_path / 'index.dat'))
+    for record in records:
+        tree.insert(record)
+    assert tree.splits > 0 and tree.reinserts > 0
+    check_structure(tree, records)
+
+    rng = random.Random(len(records))
+    for _ in range(30):
+        x, y = rng.random() * 0.9, rng.random() * 0.9
+        window = (x, y, x + 0.1, y + 0.1)
+        expected = [key(record) for record in records if tree.overlap(record['mbr'], window)]
+        assert sorted(map(key, tree.range_query(window))) == sorted(expected)
+        point = (rng.random(), rng.random())
+        expected = sorted(tree.distance(point, record['mbr']) for record in records)[:5]
+        assert [tree.distance(point, e['mbr']) for e in tree.k_nearest_neighbors(point, 5)] == pytest.approx(expected)
+    tree.close()
+
+
+def test_rstar_handles_many_identical_points(tmp_path):
+    # Όλες οι εγγραφές στο ίδιο σημείο: οι επανεισαγωγές δεν μπορούν να τις μοιράσουν αλλού
+    records = [{'mbr': (0.5, 0.5, 0.5, 0.5), 'block_id': 1, 'slot': slot} for slot in range(300)]
+    tree = RStarTree(max_entries_per_node=4, index_filename=str(tmp_path / 'index.dat'))
+    for record in records:
+        tree.insert(record)
+    check_structure(tree, records)
+    assert len(tree.k_nearest_neighbors((0, 0), 10)) == 10
+    assert math.isclose(tree.distance((0, 0), tree.root.mbr), math.dist((0, 0), (0.5, 0.5)))
+    tree.close()
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+
+from RStarTree import RStarTree
+from Server import RStarTreeServer
+
+
+def make_tree(tmp_path, concurrent):
+    tree = RStarTree(max_entries_per_node=8, index_filename=str(tmp_path / 'index.dat'), concurrent=concurrent)
+    for slot in range(50):
+        tree.insert({'mbr': (slot / 50, slot / 50, slot / 50, slot / 50), 'block_id': 1, 'slot': slot})
+    return tree
+
+
+def run_requests(server, requests):
+    async def run():
+        return [await server.execute(request) for request in requests]
+
+    try:
+        return asyncio.run(run())
+    finally:
+        server.close()
+
+
+def record_threads(tree, names):
+    # Καταγραφή του νήματος στο οποίο εκτελείται κάθε λειτουργία του δέντρου
+    for name in names:
+        method = getattr(tree, name)
+
+        def traced(*args, method=method, name=name, **kwargs):
+            tree.threads.append((name, threading.current_thread().name))
+            return method(*args, **kwargs)
+
+        setattr(tree, name, traced)
+    tree.threads = []
+
+
+def test_writes_run_serialized_off_the_event_loop(tmp_path):
+    tree = make_tree(tmp_path, concurrent=True)
+    server = RStarTreeServer(tree)
+    record_threads(tree, ['insert', 'delete'])
+    results = run_requests(server, [
+        {'op': 'insert', 'mbr': [0.5, 0.5, 0.5, 0.5], 'block_id': 2, 'slot': 0},
+        {'op': 'delete', 'mbr': [0.5, 0.5, 0.5, 0.5], 'block_id': 2, 'slot': 0},
+        {'op': 'count', 'mbr': [0, 0, 1, 1]},
+    ])
+    assert results == [True, True, 50]
+    assert [thread for _, thread in tree.threads] == ['rstar-writer_0', 'rstar-writer_0']
+
+
+def test_trees_without_snapshots_run_queries_on_the_writer(tmp_path):
+    tree = make_tree(tmp_path, concurrent=False)
+    server = RStarTreeServer(tree)
+    assert server.executor is None
+    record_threads(tree, ['insert', 'range_iter', 'range_count'])
+    results = run_requests(server, [
+        {'op': 'insert', 'mbr': [0.5, 0.5, 0.5, 0.5], 'block_id': 2, 'slot': 0},
+        {'op': 'range', 'mbr': [0.49, 0.49, 0.51, 0.51]},
+        {'op': 'count', 'mbr': [0, 0, 1, 1]},
+    ])
+    assert results[0] is True
+    assert {'mbr': [0.5, 0.5, 0.5, 0.5], 'block_id': 2, 'slot': 0} in results[1]
+    assert results[2] == 51
+    assert {thread for _, thread in tree.threads} == {'rstar-writer_0'}
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from RStarTree import RStarTree
+
+
+def point_records(count, seed, dims=2, grid=None):
+    rng = random.Random(seed)
+    records = []
+    for slot in range(count):
+        # Με πλέγμα πολλά σημεία μοιράζονται συντεταγμένες ή συμπίπτουν
+        point = tuple(rng.randrange(grid) / grid if grid else rng.random() for _ in range(dims))
+        records.append({'mbr': point + point, 'block_id': 1, 'slot': slot})
+    return records
+
+
+def brute_skyline(records, dims, region=None):
+    if region is not None:
+        records = [r for r in records
+                   if all(region[d] <= r['mbr'][d] <= region[dims + d] for d in range(dims))]
+    points = [r['mbr'][:dims] for r in records]
+    return sorted(
+        r['slot'] for r, p in zip(records, points)
+        if not any(q != p and all(a <= b for a, b in zip(q, p)) for q in points)
+    )
+
+
+def build(tmp_path, records, dims):
+    tree = RStarTree(max_entries_per_node=6, index_filename=str(tmp_path / 'index.dat'), dims=dims)
+    for record in records:
+        tree.insert(record)
+    return tree
+
+
+@pytest.mark.parametrize('dims', [2, 3])
+@pytest.mark.parametrize('grid', [None, 20])
+def test_skyline_matches_brute_force(tmp_path, dims, grid):
+    records = point_records(1500, seed=dims, dims=dims, grid=grid)
+    tree = build(tmp_path, records, dims)
+    skyline = tree.skyline_query()
+    assert sorted(entry['slot'] for entry in skyline) == brute_skyline(records, dims)
+    # Τα σημεία βρίσκονται με αύξουσα απόσταση L1 από την αρχή των αξόνων (progressive)
+    sums = [sum(entry['mbr'][:dims]) for entry in skyline]
+    assert sums == sorted(sums)
+    tree.close()
+
+
+def test_constrained_skyline_matches_brute_force(tmp_path):
+    records = point_records(1500, seed=5)
+    tree = build(tmp_path, records, 2)
+    rng = random.Random(6)
+    for _ in range(20):
+        x, y = rng.random() * 0.7, rng.random() * 0.7
+        region = (x, y, x + 0.3, y + 0.3)
+        assert sorted(entry['slot'] for entry in tree.skyline_query(region)) == brute_skyline(records, 2, region)
+    tree.close()
+
+
+def test_skyline_iter_reads_fewer_nodes_when_stopped_early(tmp_path):
+    records = point_records(3000, seed=7)
+    tree = build(tmp_path, records, 2)
+    tree.counters_enabled = True
+    tree.skyline_query()
+    full = tree.node_visits
+    tree.node_visits = 0
+    first = next(tree.skyline_iter())
+    assert first['slot'] in brute_skyline(records, 2)
+    assert tree.node_visits < full
+    tree.close()
+
+
+def test_skyline_of_an_empty_tree(tmp_path):
+    tree = build(tmp_path, [], 2)
+    assert tree.skyline_query() == []
+    tree.close()
@@ -0,0 +1,193 @@
+import random
+import sys
+import threading
+
+import pytest
+
+from QueryCache import QueryCache
+from RStarTree import RStarTree
+
+
+def point_records(count, seed, block_id=1):
+    rng = random.Random(seed)
+    records = []
+    for slot in range(count):
+        x, y = rng.random(), rng.random()
+        records.append({'mbr': (x, y, x, y), 'block_id': block_id, 'slot': slot})
+    return records
+
+
+def run_threads(targets):
+    errors = []
+    # Συχνές εναλλαγές νημάτων, ώστε οι αναγνώστες να διακόπτονται και στη μέση της φόρτωσης ενός κόμβου
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+
+    def guard(target):
+        try:
+            target()
+        except Exception as error:  # Τα σφάλματα των νημάτων ελέγχονται στο κύριο νήμα
+            errors.append(error)
+
+    threads = [threading.Thread(target=guard, args=(target,)) for target in targets]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert not errors, errors
+
+
+def test_concurrent_child_loads_return_the_stored_node(tmp_path):
+    index_filename = str(tmp_path / 'index.dat')
+    tree = RStarTree(max_entries_per_node=8, index_filename=index_filename)
+    for record in point_records(200, seed=2):
+        tree.insert(record)
+    tree.close()
+
+    tree = RStarTree.open(index_filename, concurrent=True)
+    index_file = tree.index_file
+    read_node = index_file.read_node
+    both_reading = threading.Barrier(2, timeout=5)
+
+    def racing_read_node(page_id):
+        # Και τα δύο νήματα διαβάζουν τη σελίδα πριν αποθηκεύσει κάποιο τον κόμβο
+        node = read_node(page_id)
+        both_reading.wait()
+        return node
+
+    index_file.read_node = racing_read_node
+    loaded = []
+    run_threads([lambda: loaded.append(tree.root.child(0)) for _ in range(2)])
+    index_file.read_node = read_node
+    assert loaded[0] is loaded[1] is tree.root.children[0]
+
+
+def test_readers_and_writer_share_lazily_loaded_nodes(tmp_path):
+    index_filename = str(tmp_path / 'index.dat')
+    initial = point_records(2000, seed=1)
+    tree = RStarTree(max_entries_per_node=8, index_filename=index_filename)
+    for record in initial:
+        tree.insert(record)
+    tree.close()
+
+    for round_number in range(3):
+        # Κάθε γύρος ξεκινά από ένα δέντρο που έχει φορτωμένη μόνο τη ρίζα
+        tree = RStarTree.open(index_filename, concurrent=True)
+        added = point_records(300, seed=100 + round_number, block_id=2 + round_number)
+        removed = initial[round_number * 300:(round_number + 1) * 300]
+        done = threading.Event()
+
+        def writer():
+            try:
+                for record in added:
+                    tree.insert(record)
+                for record in removed:
+                    assert tree.delete(record['mbr'], record['block_id'], record['slot'])
+            finally:
+                done.set()
+
+        def reader(seed):
+            rng = random.Random(seed)
+            while not done.is_set():
+                x, y = rng.random() * 0.9, rng.random() * 0.9
+                with tree.snapshot() as view:
+                    window = (x, y, x + 0.1, y + 0.1)
+                    assert len(view.range_query(window)) == view.range_count(window)
+
+        run_threads([writer] + [lambda seed=seed: reader(seed) for seed in range(6)])
+        with tree.snapshot() as view:
+            assert len(view.range_query((0, 0, 1, 1))) == 2000
+        tree.close()
+
+
+def all_slots(tree):
+    return sorted((entry['block_id'], entry['slot']) for entry in tree.range_query((0, 0, 1, 1)))
+
+
+def test_snapshot_is_isolated_from_concurrent_writes(tmp_path):
+    index_filename = str(tmp_path / 'index.dat')
+    initial = point_records(1000, seed=3)
+    tree = RStarTree(max_entries_per_node=8, index_filename=index_filename)
+    for record in initial:
+        tree.insert(record)
+    tree.close()
+
+    # Το στιγμιότυπο έχει φορτωμένη μόνο τη ρίζα, οπότε διαβάζει τις παλιές σελίδες αφού ο writer τις αντικαταστήσει
+    tree = RStarTree.open(index_filename, concurrent=True)
+    added = point_records(500, seed=4, block_id=2)
+    with tree.snapshot() as view:
+        before = all_slots(view)
+        started = threading.Event()
+
+        def writer():
+            started.set()
+            for i, record in enumerate(added):
+                tree.insert(record)
+                if i % 100 == 99:
+                    tree.save()
+            for record in initial[:400]:
+                assert tree.delete(record['mbr'], record['block_id'], record['slot'])
+            tree.save()
+
+        def reader():
+            started.wait()
+            for _ in range(20):
+                assert all_slots(view) == before
+
+        run_threads([writer, reader])
+        assert all_slots(view) == before == [(1, slot) for slot in range(1000)]
+        assert view.range_count((0, 0, 1, 1)) == 1000
+
+    expected = sorted([(1, slot) for slot in range(400, 1000)] + [(2, slot) for slot in range(500)])
+    with tree.snapshot() as view:
+        assert all_slots(view) == expected
+    tree.close()
+    assert all_slots(RStarTree.open(index_filename)) == expected
+
+
+def test_snapshots_do_not_see_newer_cached_results(tmp_path):
+    tree = RStarTree(max_entries_per_node=8, index_filename=str(tmp_path / 'index.dat'), concurrent=True)
+    tree.query_cache = QueryCache(1024 * 1024)
+    for record in point_records(300, seed=5):
+        tree.insert(record)
+    window = (0.25, 0.25, 0.75, 0.75)
+    with tree.snapshot() as old:
+        before = old.range_query(window)
+        tree.insert({'mbr': (0.5, 0.5, 0.5, 0.5), 'block_id': 9, 'slot': 0})
+        with tree.snapshot() as new:
+            assert len(new.range_query(window)) == len(before) + 1
+        assert old.range_query(window) == before
+        assert old.k_nearest_neighbors((0.5, 0.5), 1)[0]['block_id'] != 9
+
+
+def test_snapshot_views_have_their_own_state(tmp_path):
+    tree = RStarTree(max_entries_per_node=8, index_filename=str(tmp_path / 'index.dat'), concurrent=True)
+    for record in point_records(500, seed=6):
+        tree.insert(record)
+    tree.enable_locator()
+    tree.counters_enabled = True
+    splits = tree.splits
+    tree.node_visits = 0
+    with tree.snapshot() as view:
+        view.range_query((0, 0, 1, 1))
+        assert view.node_visits > 0
+        assert tree.node_visits == 0
+        assert view.splits == view.reinserts == 0
+        assert view.locator is None and view.wal is None
+        assert view._overflowed_levels is not tree._overflowed_levels
+        with pytest.raises(ValueError):
+            view.insert({'mbr': (0.5, 0.5, 0.5, 0.5), 'block_id': 9, 'slot': 0})
+        with pytest.raises(ValueError):
+            with view.snapshot():
+                pass
+        # Οι εγγραφές του writer δεν αλλάζουν τους μετρητές του στιγμιοτύπου
+        view_visits = view.node_visits
+        for record in point_records(200, seed=7, block_id=2):
+            tree.insert(record)
+        assert view.node_visits == view_visits
+        assert view.splits == 0 and tree.splits > splits
+        assert len(view.range_query((0, 0, 1, 1))) == 500
+    tree.close()
@@ -0,0 +1,174 @@
+import os
+import random
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+
+from DataFile import DataFile, DataFileReader
+from RStarTree import RStarTree
+from WriteAheadLog import WriteAheadLog
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Εισαγωγή 500 εγγραφών, save, εισαγωγή άλλων 500 και διακοπή της διεργασίας (os._exit) μετά από
+# crash_after εγγραφές σελίδων της δεύτερης save. Κάθε εγγραφή σελίδας φτάνει στο λειτουργικό,
+# ώστε να μένουν στον δίσκο όσες σελίδες γράφτηκαν πριν από τη διακοπή. Με μικρό buffer pool
+# οι σελίδες που άλλαξαν γράφονται και όταν αφαιρούνται από αυτό, πριν από τη save.
+CRASH_SCRIPT = textwrap.dedent("""
+    import os
+    import random
+    import sys
+
+    sys.path.insert(0, {root!r})
+    from BufferPool import BufferPool
+    from IndexFile import IndexFile
+    from RStarTree import RStarTree
+
+    index_filename, wal_filename = sys.argv[1], sys.argv[2]
+    crash_after, pool_bytes = int(sys.argv[3]), int(sys.argv[4])
+    rng = random.Random(7)
+    index_file = IndexFile(index_filename, 8, buffer_pool=BufferPool(pool_bytes))
+    tree = RStarTree(max_entries_per_node=8, index_file=index_file, wal_filename=wal_filename)
+    for i in range(1000):
+        x, y = rng.random(), rng.random()
+        tree.insert({{'mbr': (x, y, x, y), 'block_id': i // 100 + 1, 'slot': i % 100}})
+        if i == 499:
+            tree.save()
+    tree.commit()
+
+    write_page = IndexFile.write_page
+    writes = 0
+
+    def crashing_write_page(self, page_id, data):
+        global writes
+        if writes == crash_after:
+            os._exit(3)
+        writes += 1
+        write_page(self, page_id, data)
+        self.file.flush()
+
+    IndexFile.write_page = crashing_write_page
+    tree.save()
+    print(writes)
+""")
+
+
+def run_crash(tmp_path, crash_after, pool_bytes=64 * 1024 * 1024):
+    index_filename = str(tmp_path / 'index.dat')
+    wal_filename = str(tmp_path / 'index.wal')
+    script = CRASH_SCRIPT.format(root=ROOT)
+    result = subprocess.run([sys.executable, '-c', script, index_filename, wal_filename, str(crash_after),
+                             str(pool_bytes)],
+                            capture_output=True, text=True)
+    return result, index_filename, wal_filename
+
+
+def all_entries(tree):
+    return sorted((entry['block_id'], entry['slot']) for entry in tree.range_query((0, 0, 1, 1)))
+
+
+def test_save_without_crash_writes_pages(tmp_path):
+    result, index_filename, wal_filename = run_crash(tmp_path, 10 ** 9)
+    assert result.returncode == 0, result.stderr
+    assert int(result.stdout) > 10
+    tree = RStarTree.open(index_filename, wal_filename=wal_filename)
+    assert len(all_entries(tree)) == 1000
+
+
+@pytest.mark.parametrize('pool_bytes', [64 * 1024 * 1024, 8 * 1024])
+@pytest.mark.parametrize('crash_after', [0, 1, 3, 10, 40])
+def test_recovery_after_partial_save(tmp_path, crash_after, pool_bytes):
+    result, index_filename, wal_filename = run_crash(tmp_path, crash_after, pool_bytes)
+    assert result.returncode == 3, result.stderr
+    tree = RStarTree.open(index_filename, wal_filename=wal_filename)
+    assert all_entries(tree) == [(i // 100 + 1, i % 100) for i in range(1000)]
+    tree.save()
+    assert all_entries(RStarTree.open(index_filename, wal_filename=wal_filename)) == all_entries(tree)
+
+
+def test_group_commit_syncs_after_interval(tmp_path):
+    wal = WriteAheadLog(str(tmp_path / 'log.wal'), group_size=1000, group_interval=0.02)
+    wal.log_insert({'mbr': (0.5, 0.5, 0.5, 0.5), 'block_id': 1, 'slot': 0})
+    assert wal.pending == 1
+    deadline = time.monotonic() + 5
+    while wal.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert wal.pending == 0
+    wal.close()
+    assert not wal.flusher.is_alive()
+
+
+def test_recovery_replays_deletes(tmp_path):
+    index_filename = str(tmp_path / 'index.dat')
+    wal_filename = str(tmp_path / 'index.wal')
+    rng = random.Random(3)
+    records = []
+    for i in range(600):
+        x, y = rng.random(), rng.random()
+        records.append({'mbr': (x, y, x, y), 'block_id': 1, 'slot': i})
+    tree = RStarTree(max_entries_per_node=8, index_filename=index_filename, wal_filename=wal_filename)
+    for record in records[:400]:
+        tree.insert(record)
+    tree.save()
+    for record in records[400:]:
+        tree.insert(record)
+    for record in records[:150]:
+        assert tree.delete(record['mbr'], record['block_id'], record['slot'])
+    tree.commit()
+
+    recovered = RStarTree.open(index_filename, wal_filename=wal_filename)
+    assert all_entries(recovered) == [(1, i) for i in range(150, 600)]
+
+
+# Το ίδιο για το datafile: διακοπή κατά το δεύτερο checkpoint, μετά από crash_after εγγραφές blocks
+DATAFILE_CRASH_SCRIPT = textwrap.dedent("""
+    import os
+    import sys
+
+    sys.path.insert(0, {root!r})
+    from DataFile import DataFile
+
+    data_filename, wal_filename, crash_after = sys.argv[1], sys.argv[2], int(sys.argv[3])
+    datafile = DataFile(data_filename, wal_filename=wal_filename)
+    for i in range(10000):
+        datafile.add_record({{'id': i, 'lat': i / 1000, 'lon': -i / 1000}})
+        if i == 4999:
+            datafile.checkpoint()
+    datafile.wal.commit()
+
+    write_page = DataFile.write_page
+    writes = 0
+
+    def crashing_write_page(self, block_id, data):
+        global writes
+        if writes == crash_after:
+            os._exit(3)
+        writes += 1
+        write_page(self, block_id, data)
+        self.file.flush()
+
+    DataFile.write_page = crashing_write_page
+    datafile.checkpoint()
+""")
+
+
+@pytest.mark.parametrize('crash_after', [0, 1, 2, 3])
+def test_datafile_recovery_after_partial_checkpoint(tmp_path, crash_after):
+    data_filename = str(tmp_path / 'data.dat')
+    wal_filename = str(tmp_path / 'data.wal')
+    script = DATAFILE_CRASH_SCRIPT.format(root=ROOT)
+    result = subprocess.run([sys.executable, '-c', script, data_filename, wal_filename, str(crash_after)],
+                            capture_output=True, text=True)
+    assert result.returncode == 3, result.stderr
+
+    datafile = DataFile(data_filename, create=False, wal_filename=wal_filename)
+    datafile.checkpoint()
+    datafile.close()
+    with DataFileReader(data_filename) as reader:
+        assert len(reader) == 10000
+        records_per_block = reader.format.records_per_block
+        ids = [reader.read_record(i // records_per_block + 1, i % records_per_block)['id'] for i in range(10000)]
+    assert ids == list(range(10000))